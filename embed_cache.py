@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Content-addressed embedding cache shared by the indexers and the server
+═══════════════════════════════════════════════════════════════════════
+The same text always embeds to the same vector, yet the office lines
+are embedded by tools/index_pdf.py, by the MCP server's _build_index
+and by warmup_models.py — on every run.  This cache maps
+blake2b(text) → vector on disk, so repeated builds and restarts skip
+model inference for anything seen before.
+
+Layout (one directory per model name)
+-------------------------------------
+  <EMBED_CACHE_DIR>/<model>/vectors.f32   float32 rows, memory-mapped
+  <EMBED_CACHE_DIR>/<model>/keys.bin      16-byte text hash per row
+  <EMBED_CACHE_DIR>/<model>/meta.json     model name and dimension
+
+Row i of vectors.f32 belongs to key i of keys.bin.  A writer stores the
+vectors first and appends their keys afterwards, so a row becomes
+visible only once complete.  Writers serialise on an fcntl lock on
+keys.bin; readers pick up rows added by other processes by reading the
+new tail of keys.bin when they miss.
+
+Configuration
+-------------
+  EMBED_CACHE_DIR   cache root (default ./embed_cache next to this file;
+                    an empty string disables caching)
+
+On platforms without fcntl (Windows) concurrent writers from several
+processes are not safe; a single process is.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence
+
+# ── 3rd-party ───────────────────────────────────────────────────────
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:                     # Windows — no cross-process lock
+    fcntl = None
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR",
+                            str(Path(__file__).parent / "embed_cache"))
+
+KEY_BYTES = 16
+_SAFE_RE  = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  On-disk cache                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class EmbeddingCache:
+    """Append-only key → float32 vector store for one embedding model."""
+
+    def __init__(self, model: str, root: str | Path = EMBED_CACHE_DIR):
+        self.model = model
+        self.dir = Path(root) / _SAFE_RE.sub("_", model)
+        self.dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._keys_path = self.dir / "keys.bin"
+        self._vec_path = self.dir / "vectors.f32"
+        self._meta_path = self.dir / "meta.json"
+        self.dim: Optional[int] = None
+        if self._meta_path.exists():
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+
+        self._index: dict[bytes, int] = {}
+        self._rows = 0                          # committed rows seen so far
+        self._mm: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        with self._lock:
+            self._refresh()
+
+    # ─── reading ──────────────────────────────────────────────────
+    def _refresh(self) -> None:
+        """Index keys appended since we last looked (by anyone)."""
+        try:
+            rows = self._keys_path.stat().st_size // KEY_BYTES
+        except FileNotFoundError:
+            return
+        if rows <= self._rows:
+            return
+        with open(self._keys_path, "rb") as fh:
+            fh.seek(self._rows * KEY_BYTES)
+            data = fh.read((rows - self._rows) * KEY_BYTES)
+        for i in range(len(data) // KEY_BYTES):
+            self._index.setdefault(data[i * KEY_BYTES:(i + 1) * KEY_BYTES], self._rows + i)
+        self._rows += len(data) // KEY_BYTES
+        if self.dim is None and self._meta_path.exists():
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+
+    def _mapped(self, rows: int) -> np.memmap:
+        """A read-only mapping covering at least `rows` rows."""
+        if self._mm is None or self._mm.shape[0] < rows:
+            capacity = self._vec_path.stat().st_size // (4 * self.dim)
+            self._mm = np.memmap(self._vec_path, dtype=np.float32, mode="r",
+                                 shape=(capacity, self.dim))
+        return self._mm
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """Cached vectors (copies) for `keys`, None where missing."""
+        with self._lock:
+            rows = [self._index.get(k) for k in keys]
+            if None in rows:
+                self._refresh()                 # another process may have added them
+                rows = [self._index.get(k) for k in keys]
+            found = sum(r is not None for r in rows)
+            self.hits += found
+            self.misses += len(rows) - found
+            if not found:
+                return [None] * len(rows)
+            mm = self._mapped(max(r for r in rows if r is not None) + 1)
+            return [np.array(mm[r]) if r is not None else None for r in rows]
+
+    # ─── writing ──────────────────────────────────────────────────
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        fd = os.open(self._keys_path,
+                     os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)                        # releases the flock
+
+    def put_many(self, keys: Sequence[bytes], vectors: Sequence) -> None:
+        """Store vectors for keys not cached yet."""
+        block = np.asarray(vectors, dtype=np.float32)
+        if block.ndim != 2 or not len(block):
+            return
+        with self._lock, self._exclusive():
+            self._refresh()
+            if self.dim is None:
+                self.dim = block.shape[1]
+                self._meta_path.write_text(json.dumps({"model": self.model,
+                                                       "dim": self.dim}))
+            elif block.shape[1] != self.dim:
+                raise ValueError(f"{self.model}: expected {self.dim}-d vectors, "
+                                 f"got {block.shape[1]}")
+            fresh: dict[bytes, int] = {}
+            for i, key in enumerate(keys):
+                if key not in self._index and key not in fresh:
+                    fresh[key] = i
+            if not fresh:
+                return
+            start = self._rows
+            with open(self._vec_path, "ab") as fh:   # create if missing
+                pass
+            with open(self._vec_path, "r+b") as fh:
+                fh.seek(start * 4 * self.dim)       # overwrites any torn tail
+                fh.write(block[list(fresh.values())].tobytes())
+            with open(self._keys_path, "ab") as fh:
+                fh.write(b"".join(fresh))
+            for n, key in enumerate(fresh):
+                self._index[key] = start + n
+            self._rows += len(fresh)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"model": self.model, "vectors": self._rows, "dim": self.dim,
+                "hits": self.hits, "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0}
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Caching wrapper for any embedding function                   ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class CachedEmbeddings:
+    """
+    Wrap `embed_fn` (list of texts → list of vectors) so that only texts
+    missing from the cache reach the model, in one batch.
+
+    Callable like a Chroma embedding function: returns float32 arrays.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], Sequence], model: str,
+                 root: str | Path | None = None):
+        self.embed_fn = embed_fn
+        self.model = model
+        root = EMBED_CACHE_DIR if root is None else root
+        self.cache = EmbeddingCache(model, root) if root else None
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        texts = list(input)
+        if self.cache is None:
+            return [np.asarray(v, dtype=np.float32) for v in self.embed_fn(texts)]
+        keys = [text_key(t) for t in texts]
+        vectors = self.cache.get_many(keys)
+        missing = {keys[i]: texts[i] for i, v in enumerate(vectors) if v is None}
+        if missing:
+            computed = np.asarray(self.embed_fn(list(missing.values())), dtype=np.float32)
+            self.cache.put_many(list(missing), computed)
+            by_key = dict(zip(missing, computed))
+            vectors = [v if v is not None else by_key[k] for k, v in zip(keys, vectors)]
+        return vectors
+
+    def stats(self) -> dict:
+        stats = self.cache.stats() if self.cache else {"model": self.model, "disabled": True}
+        return {**stats, **getattr(self.embed_fn, "counters", {})}
+
+
+def default_embedder(backend: Optional[str] = None) -> CachedEmbeddings:
+    """
+    The configured MiniLM backend (see embedders.py) behind the cache;
+    misses go to the embedding daemon when one serves the same model.
+    """
+    from embed_daemon import SharedEmbedder
+    from embedders import get_embedder
+
+    embedder = get_embedder(backend)
+    return CachedEmbeddings(SharedEmbedder(embedder), embedder.name)
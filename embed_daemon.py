@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Resident embedding service shared by every process on the host
+═══════════════════════════════════════════════════════════════════════
+The MCP server (each worker), the agent's stdio server, tools/search.py,
+the indexers and warmup_models.py all embed with MiniLM, and each used
+to load its own copy — some of them on every invocation.  This daemon
+loads the model once and serves it over a Unix socket:
+
+    python embed_daemon.py          # foreground; Ctrl-C / SIGTERM stops it
+    python embed_daemon.py --stats  # batches, sentences, cache hit ratio
+
+Requests are micro-batched: the daemon waits up to EMBED_MAX_WAIT_MS
+after the first pending request (and keeps collecting while a batch
+runs), then embeds up to EMBED_MAX_BATCH sentences from many clients in
+one model call.  Results also land in the embedding cache.
+
+Clients go through SharedEmbedder (embed_cache.default_embedder() wraps
+every backend in one): texts go to the daemon when its socket answers
+and it serves the same model, otherwise they are embedded in-process
+as before.  After a failed connection the daemon is retried at most
+every RETRY_SECONDS, so a missing daemon costs one stat() per call.
+A hung daemon costs at most one request timeout (REQUEST_TIMEOUT plus
+PER_TEXT_TIMEOUT per sentence) before the call is embedded locally.
+
+Wire format (both directions): 4-byte big-endian length + JSON header;
+an embed reply is followed by n × dim float32 values.
+
+Configuration
+-------------
+  EMBED_SOCKET        socket path (default <tmp>/mcp-embed-<uid>/embed.sock;
+                      empty string disables the daemon for clients)
+  EMBED_MAX_BATCH     sentences per model call (default 64)
+  EMBED_MAX_WAIT_MS   how long a request may wait for company (default 2)
+
+The socket is private to the user that runs the daemon: its directory
+is created mode 0700, the socket itself is 0600, and clients only talk
+to a daemon running as their own uid.  Its vectors go straight into the
+embedding cache, so a daemon planted by another user would poison every
+later search.
+
+Unix sockets are required; elsewhere clients always embed locally.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+# ── 3rd-party ───────────────────────────────────────────────────────
+import numpy as np
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+_UID        = getattr(os, "getuid", lambda: 0)()
+SOCKET_PATH = os.getenv("EMBED_SOCKET",
+                        str(Path(tempfile.gettempdir()) / f"mcp-embed-{_UID}" / "embed.sock"))
+MAX_BATCH   = int(os.getenv("EMBED_MAX_BATCH", "64"))
+MAX_WAIT    = float(os.getenv("EMBED_MAX_WAIT_MS", "2")) / 1000
+
+RETRY_SECONDS    = 5.0          # back-off after the daemon could not be reached
+CONNECT_TIMEOUT  = 0.5          # connect / stats ping to a local socket
+REQUEST_TIMEOUT  = 1.0          # per embed request, plus ...
+PER_TEXT_TIMEOUT = 0.05         # ... this per sentence in the batch
+
+_LEN = struct.Struct("!I")
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Framing                                                      ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def _frame(header: dict, payload: bytes = b"") -> bytes:
+    data = json.dumps(header).encode()
+    return _LEN.pack(len(data)) + data + payload
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("embedding daemon closed the connection")
+        buf += chunk
+    return bytes(buf)
+
+def _recv_header(sock: socket.socket) -> dict:
+    (n,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    return json.loads(_recv_exact(sock, n))
+
+async def _read_header(reader: asyncio.StreamReader) -> dict:
+    (n,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+    return json.loads(await reader.readexactly(n))
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Daemon                                                       ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class EmbedDaemon:
+    """Collects requests from all connections and embeds them in batches."""
+
+    def __init__(self, embed_fn, model: str, max_batch: int = MAX_BATCH,
+                 max_wait: float = MAX_WAIT):
+        self.embed_fn = embed_fn
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: Optional[asyncio.Queue] = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self.started = time.monotonic()
+        self.counters = {"requests": 0, "sentences": 0, "batches": 0,
+                         "errors": 0, "model_seconds": 0.0}
+
+    # ─── batching ─────────────────────────────────────────────────
+    async def _batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            size = len(batch[0][0])
+            await asyncio.sleep(self.max_wait)            # let others join
+            while size < self.max_batch and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+                size += len(batch[-1][0])
+
+            texts = [t for item, _ in batch for t in item]
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self._pool, self.embed_fn, texts)
+            except Exception as e:
+                self.counters["errors"] += 1
+                for _, fut in batch:
+                    if not fut.done():                  # client may have gone
+                        fut.set_exception(e)
+                continue
+            self.counters["model_seconds"] += time.perf_counter() - start
+            self.counters["batches"] += 1
+            self.counters["sentences"] += len(texts)
+            block = np.asarray(vectors, dtype=np.float32)
+            offset = 0
+            for item, fut in batch:
+                if not fut.done():
+                    fut.set_result(block[offset:offset + len(item)])
+                offset += len(item)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        fut = asyncio.get_running_loop().create_future()
+        await self._pending.put((texts, fut))
+        return await fut
+
+    # ─── connections ──────────────────────────────────────────────
+    async def _serve(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    req = await _read_header(reader)
+                except asyncio.IncompleteReadError:
+                    break                                   # client hung up
+                if req.get("op") == "stats":
+                    writer.write(_frame(self.stats()))
+                elif req.get("model") != self.model:
+                    writer.write(_frame({"error": f"daemon serves {self.model}"}))
+                else:
+                    self.counters["requests"] += 1
+                    try:
+                        block = await self.embed(req["texts"]) if req["texts"] else \
+                            np.empty((0, 0), dtype=np.float32)
+                        writer.write(_frame({"n": block.shape[0], "dim": block.shape[1]},
+                                            block.tobytes()))
+                    except Exception as e:
+                        writer.write(_frame({"error": f"{type(e).__name__}: {e}"}))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def run(self, path: str) -> None:
+        self._pending = asyncio.Queue()
+        _private_dir(Path(path).parent)
+        if os.path.lexists(path):
+            if _ping(path):
+                raise SystemExit(f"An embedding daemon is already listening on {path}")
+            os.unlink(path)                                 # stale socket
+        umask = os.umask(0o177)                             # socket is born 0600
+        try:
+            server = await asyncio.start_unix_server(self._serve, path=path)
+        finally:
+            os.umask(umask)
+        os.chmod(path, 0o600)
+        batcher = asyncio.create_task(self._batcher())
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        print(f"Embedding daemon ({self.model}) listening on {path}", file=sys.stderr)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            batcher.cancel()
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def stats(self) -> dict:
+        c = self.counters
+        return {"model": self.model, **c,
+                "mean_batch": round(c["sentences"] / c["batches"], 1) if c["batches"] else 0.0,
+                "uptime_seconds": round(time.monotonic() - self.started, 1),
+                **({"cache": self.embed_fn.stats()} if hasattr(self.embed_fn, "stats") else {})}
+
+
+def _private_dir(path: Path) -> None:
+    """
+    Create the socket's directory 0700, or make sure an existing one is
+    ours (or root's, like /tmp) — in the shared tmp dir another user
+    could have created it first and swap the socket under us.
+    """
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = path.lstat()
+    if hasattr(os, "getuid") and st.st_uid not in (_UID, 0):
+        raise SystemExit(f"{path} belongs to another user; set EMBED_SOCKET elsewhere")
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 4.  Client                                                       ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def _peer_uid(sock: socket.socket, path: str) -> int:
+    """Uid of the process behind a connected socket (owner of the path off Linux)."""
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", creds)[1]                # pid, uid, gid
+    return os.lstat(path).st_uid
+
+def _connect(path: str) -> socket.socket:
+    """Connect to the daemon, refusing one that runs as another user."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+        if hasattr(os, "getuid") and _peer_uid(sock, path) != _UID:
+            raise PermissionError(f"embedding daemon on {path} runs as another user")
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def _ping(path: str) -> Optional[dict]:
+    """The daemon's stats, or None if nothing answers on `path`."""
+    try:
+        with _connect(path) as sock:
+            sock.sendall(_frame({"op": "stats"}))
+            return _recv_header(sock)
+    except (OSError, ValueError):
+        return None
+
+def daemon_stats(path: str = SOCKET_PATH) -> Optional[dict]:
+    return _ping(path) if path and hasattr(socket, "AF_UNIX") else None
+
+class SharedEmbedder:
+    """
+    Embed through the daemon when it serves `local.name`, otherwise with
+    `local` (an embedders.Embedder) in this process.
+    """
+
+    def __init__(self, local, path: str = SOCKET_PATH):
+        self.local = local
+        self.name = local.name
+        self.path = path if hasattr(socket, "AF_UNIX") else ""
+        self._retry_at = 0.0
+        self._tls = threading.local()               # one connection per thread
+        self.counters = {"daemon": 0, "in_process": 0}   # sentences embedded
+
+    def _sock(self) -> socket.socket:
+        sock = getattr(self._tls, "sock", None)
+        if sock is None:
+            sock = self._tls.sock = _connect(self.path)
+        return sock
+
+    def _drop(self) -> None:
+        sock = getattr(self._tls, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._tls.sock = None
+
+    def _remote(self, texts: List[str]) -> Optional[List[np.ndarray]]:
+        if not self.path or time.monotonic() < self._retry_at:
+            return None
+        if getattr(self._tls, "sock", None) is None and not os.path.exists(self.path):
+            self._retry_at = time.monotonic() + RETRY_SECONDS
+            return None
+        for attempt in range(2):                    # a kept-alive socket may have gone stale
+            try:
+                sock = self._sock()
+                sock.settimeout(REQUEST_TIMEOUT + PER_TEXT_TIMEOUT * len(texts))
+                sock.sendall(_frame({"op": "embed", "model": self.name, "texts": texts}))
+                header = _recv_header(sock)
+                if "error" in header:
+                    raise ValueError(header["error"])
+                raw = _recv_exact(sock, header["n"] * header["dim"] * 4)
+                block = np.frombuffer(raw, dtype=np.float32).reshape(header["n"], header["dim"])
+                return list(block)
+            except (OSError, ValueError) as e:
+                self._drop()
+                # Retry only a stale kept-alive connection, never a hung
+                # or foreign daemon
+                if attempt or isinstance(e, (ValueError, socket.timeout, PermissionError)):
+                    self._retry_at = time.monotonic() + RETRY_SECONDS
+                    return None
+        return None
+
+    def load(self) -> "SharedEmbedder":
+        """Load the local model — unless the daemon will do the work."""
+        info = _ping(self.path) if self.path else None
+        if not info or info.get("model") != self.name:
+            self.local.load()
+        return self
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        texts = list(input)
+        if not texts:
+            return []
+        vectors = self._remote(texts)
+        if vectors is not None:
+            self.counters["daemon"] += len(texts)
+            return vectors
+        self.counters["in_process"] += len(texts)
+        return self.local(texts)
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 5.  Entry point                                                  ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def main() -> None:
+    from embed_cache import CachedEmbeddings
+    from embedders import BACKENDS, DEFAULT_BACKEND, get_embedder
+
+    ap = argparse.ArgumentParser(description="Serve MiniLM embeddings over a Unix socket")
+    ap.add_argument("--socket", default=SOCKET_PATH)
+    ap.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    ap.add_argument("--threads", type=int, default=None,
+                    help="model threads (default EMBED_THREADS)")
+    ap.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=MAX_WAIT * 1000)
+    ap.add_argument("--stats", action="store_true", help="print a running daemon's stats")
+    args = ap.parse_args()
+
+    if args.stats:
+        print(json.dumps(daemon_stats(args.socket) or {"error": "not running"}, indent=2))
+        return
+    if not hasattr(socket, "AF_UNIX"):
+        sys.exit("Unix sockets are not available on this platform")
+
+    embedder = get_embedder(args.backend, args.threads).load()
+    daemon = EmbedDaemon(CachedEmbeddings(embedder, embedder.name), embedder.name,
+                         args.max_batch, args.max_wait_ms / 1000)
+    asyncio.run(daemon.run(args.socket))
+    print(json.dumps(daemon.stats()), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
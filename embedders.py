@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Pluggable sentence embedders for all-MiniLM-L6-v2 on CPU
+════════════════════════════════════════════════════════
+One interface for every place that turns text into vectors — the MCP
+server, the indexing tools, tools/search.py and warmup_models.py — so
+they all use the same model build and agree on the vectors.
+
+Backends (EMBED_BACKEND)
+------------------------
+  onnx-int8               ONNX Runtime with int8 dynamically-quantized
+                          weights (default; built once from the fp32
+                          model, needs the `onnx` package for that step)
+  onnx                    ONNX Runtime, the fp32 model Chroma ships
+  chroma                  chromadb's DefaultEmbeddingFunction as-is
+  sentence-transformers   PyTorch through sentence_transformers
+
+The ONNX backends pad each batch to its longest sentence instead of to
+256 tokens (what Chroma's function does), sort a batch by length before
+splitting it, and run with a fixed number of intra-op threads — a short
+query costs a fraction of a padded one.
+
+Vectors from different backends are close but not identical, so each
+embedder has a `name` that keys the embedding cache; `onnx` and `chroma`
+run the same fp32 graph and share one.  tools/bench_embedders.py
+compares every backend against fp32 and reports sentences/sec and
+load time.
+
+Configuration
+-------------
+  EMBED_BACKEND    one of the backends above (default onnx-int8)
+  EMBED_THREADS    intra-op threads per process (default min(4, CPUs))
+  EMBED_MODEL_DIR  directory with model.onnx + tokenizer.json (default:
+                   Chroma's download folder, fetched on first use)
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ── 3rd-party ───────────────────────────────────────────────────────
+import numpy as np
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+MODEL_NAME      = "all-MiniLM-L6-v2"
+BACKENDS        = ("onnx-int8", "onnx", "chroma", "sentence-transformers")
+DEFAULT_BACKEND = os.getenv("EMBED_BACKEND", "onnx-int8")
+DEFAULT_THREADS = int(os.getenv("EMBED_THREADS", min(4, os.cpu_count() or 1)))
+MODEL_DIR       = os.getenv("EMBED_MODEL_DIR", "")
+
+MAX_TOKENS = 256        # sentence-transformers' max_seq_length for MiniLM
+BATCH_SIZE = 32
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Interface                                                    ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class Embedder:
+    """
+    Callable like a Chroma embedding function: list of texts in, list of
+    unit-length float32 vectors out.  Subclasses implement _load() and
+    _embed(); the model is loaded on first use or by load().
+    """
+
+    name = MODEL_NAME                   # identifies the vectors (cache key)
+    dim = 384
+
+    def __init__(self) -> None:
+        self.load_seconds: Optional[float] = None
+        self._load_lock = threading.Lock()
+
+    def load(self) -> "Embedder":
+        with self._load_lock:
+            if self.load_seconds is None:
+                start = time.perf_counter()
+                self._load()
+                self.load_seconds = time.perf_counter() - start
+        return self
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        texts = list(input)
+        if not texts:
+            return []
+        self.load()
+        return list(np.asarray(self._embed(texts), dtype=np.float32))
+
+    def _load(self) -> None:
+        raise NotImplementedError
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  ONNX Runtime backend (fp32 or int8)                          ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def model_dir() -> Path:
+    """Folder holding model.onnx / tokenizer.json, downloaded if needed."""
+    if MODEL_DIR:
+        return Path(MODEL_DIR)
+    from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+    chroma_fn = ONNXMiniLM_L6_V2()
+    chroma_fn._download_model_if_not_exists()
+    return Path(chroma_fn.DOWNLOAD_PATH) / chroma_fn.EXTRACTED_FOLDER_NAME
+
+def quantized_model(src: Path) -> Path:
+    """`src` with int8 weights (MatMul / Gemm), built next to it once."""
+    dst = src.with_name(src.stem + ".int8.onnx")
+    if dst.exists() and dst.stat().st_mtime >= src.stat().st_mtime:
+        return dst
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        raise ImportError("EMBED_BACKEND=onnx-int8 needs the `onnx` package to "
+                          "quantize the model once: pip install onnx") from e
+    print(f"Quantizing {src.name} to int8 (one-off)...", file=sys.stderr)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    quantize_dynamic(str(src), str(tmp), weight_type=QuantType.QInt8)
+    os.replace(tmp, dst)                # several processes may race here
+    return dst
+
+class OnnxEmbedder(Embedder):
+    """MiniLM through ONNX Runtime with dynamic padding and fixed threads."""
+
+    def __init__(self, quantized: bool = True, threads: int = DEFAULT_THREADS,
+                 batch_size: int = BATCH_SIZE):
+        super().__init__()
+        self.quantized = quantized
+        self.threads = threads
+        self.batch_size = batch_size
+        self.name = f"onnx-int8-{MODEL_NAME}" if quantized else f"onnx-{MODEL_NAME}"
+
+    def _load(self) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        folder = model_dir()
+        path = folder / "model.onnx"
+        if self.quantized:
+            path = quantized_model(path)
+
+        self.tokenizer = Tokenizer.from_file(str(folder / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_TOKENS)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")  # to longest
+
+        so = ort.SessionOptions()
+        so.log_severity_level = 3
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        so.intra_op_num_threads = self.threads
+        so.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(path), sess_options=so,
+                                            providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        # Similar lengths share a batch, so little is wasted on padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            out[idx] = self._forward([texts[i] for i in idx])
+        return out
+
+    def _forward(self, batch: List[str]) -> np.ndarray:
+        encoded = self.tokenizer.encode_batch(batch)
+        ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        feed = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feed["token_type_ids"] = np.zeros_like(ids)
+        hidden = self.session.run(None, feed)[0]
+
+        # Mean pooling over real tokens, then L2-normalise
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (hidden * weights).sum(1) / np.clip(weights.sum(1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.where(norms == 0, 1e-12, norms)
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 4.  Other backends                                               ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class ChromaEmbedder(Embedder):
+    """chromadb's DefaultEmbeddingFunction (fp32, pads to 256 tokens)."""
+
+    name = f"onnx-{MODEL_NAME}"         # same graph as OnnxEmbedder(quantized=False)
+
+    def _load(self) -> None:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        self.fn = DefaultEmbeddingFunction()
+        self.fn(["warm-up"])            # downloads / opens the model
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.fn(texts))
+
+class SentenceTransformerEmbedder(Embedder):
+    """all-MiniLM-L6-v2 through sentence_transformers (PyTorch)."""
+
+    name = f"sentence-transformers-{MODEL_NAME}"
+
+    def __init__(self, threads: int = DEFAULT_THREADS):
+        super().__init__()
+        self.threads = threads
+
+    def _load(self) -> None:
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        torch.set_num_threads(self.threads)
+        self.model = SentenceTransformer(MODEL_NAME, device="cpu")
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=BATCH_SIZE, convert_to_numpy=True,
+                                 normalize_embeddings=True)
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 5.  Factory                                                      ║
+# ╚══════════════════════════════════════════════════════════════════╝
+_instances: Dict[Tuple[str, int], Embedder] = {}
+_instances_lock = threading.Lock()
+
+def get_embedder(backend: Optional[str] = None,
+                 threads: Optional[int] = None) -> Embedder:
+    """
+    The process-wide embedder for `backend` (default EMBED_BACKEND).
+    The model itself is loaded lazily, on the first call or load().
+    """
+    backend = backend or DEFAULT_BACKEND
+    threads = threads or DEFAULT_THREADS
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; choose from {BACKENDS}")
+    with _instances_lock:
+        key = (backend, threads)
+        if key not in _instances:
+            if backend == "onnx-int8":
+                _instances[key] = OnnxEmbedder(quantized=True, threads=threads)
+            elif backend == "onnx":
+                _instances[key] = OnnxEmbedder(quantized=False, threads=threads)
+            elif backend == "chroma":
+                _instances[key] = ChromaEmbedder()
+            else:
+                _instances[key] = SentenceTransformerEmbedder(threads=threads)
+        return _instances[key]
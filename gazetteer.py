@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Offline gazetteer — first-tier geocoder for the MCP server
+═══════════════════════════════════════════════════════════════════════
+Resolves city names against a bundled table of world cities
+(data/world_cities.csv) without any network call.  geocode_location
+asks the gazetteer first and only falls through to the SQLite cache and
+the Open-Meteo API when nothing here matches.
+
+Layout
+------
+* Column arrays — names, normalised keys, country / region codes and
+  array('d') latitudes / longitudes, indexed by row id.
+* Prefix index — the normalised keys sorted once; bisect finds every
+  city whose name starts with the query ("hong" → "hong kong").
+* Deletion index — every key and each of its one-character deletions
+  mapped to row ids.  Two names within a couple of edits share an
+  entry, so typo candidates are found with a few dict lookups and then
+  confirmed with an edit-distance check.
+
+Matching order: exact name → typo-tolerant → whole-word prefix.  Ties
+go to the most populous city, so "Portland" is Oregon, not Maine.  A
+qualifier after a comma ("Paris, France", "Portland, OR", "London, UK")
+must match the country or region, otherwise the lookup is a miss and the
+API gets a chance.
+
+Configuration
+-------------
+  GAZETTEER_PATH   CSV to load (default data/world_cities.csv);
+                   set to an empty string to disable the tier
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import csv
+import os
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Optional
+
+# ── project ─────────────────────────────────────────────────────────
+from tool_cache import normalize_name
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH", str(Path(__file__).parent / "data" / "world_cities.csv"))
+
+MIN_FUZZY_LEN  = 5      # shorter names must match exactly ("Leon" ≠ "Lyon")
+MIN_FUZZY2_LEN = 9      # names this long may be two edits away
+MIN_PREFIX_LEN = 4      # "hong" → "hong kong", but "san" is too vague
+
+# Country names / common aliases accepted as qualifiers, by ISO code
+COUNTRY_NAMES: dict[str, tuple[str, ...]] = {
+    "AE": ("united arab emirates", "uae"), "AF": ("afghanistan",),
+    "AO": ("angola",), "AR": ("argentina",), "AT": ("austria",),
+    "AU": ("australia",), "BA": ("bosnia and herzegovina", "bosnia"),
+    "BD": ("bangladesh",), "BE": ("belgium",), "BG": ("bulgaria",),
+    "BH": ("bahrain",), "BO": ("bolivia",), "BR": ("brazil", "brasil"),
+    "BY": ("belarus",), "CA": ("canada",), "CD": ("congo", "drc"),
+    "CH": ("switzerland",), "CL": ("chile",), "CN": ("china",),
+    "CO": ("colombia",), "CR": ("costa rica",), "CU": ("cuba",),
+    "CZ": ("czechia", "czech republic"), "DE": ("germany", "deutschland"),
+    "DK": ("denmark",), "DZ": ("algeria",), "EC": ("ecuador",),
+    "EE": ("estonia",), "EG": ("egypt",), "ES": ("spain", "espana"),
+    "ET": ("ethiopia",), "FI": ("finland",), "FR": ("france",),
+    "GB": ("united kingdom", "uk", "great britain", "britain", "england",
+           "scotland", "wales", "northern ireland"),
+    "GH": ("ghana",), "GR": ("greece",), "GT": ("guatemala",),
+    "HK": ("hong kong",), "HR": ("croatia",), "HU": ("hungary",),
+    "ID": ("indonesia",), "IE": ("ireland",), "IL": ("israel",),
+    "IN": ("india",), "IQ": ("iraq",), "IR": ("iran",), "IS": ("iceland",),
+    "IT": ("italy", "italia"), "JO": ("jordan",), "JP": ("japan",),
+    "KE": ("kenya",), "KH": ("cambodia",), "KP": ("north korea",),
+    "KR": ("south korea", "korea"), "KW": ("kuwait",), "LA": ("laos",),
+    "LB": ("lebanon",), "LK": ("sri lanka",), "LT": ("lithuania",),
+    "LU": ("luxembourg",), "LV": ("latvia",), "MA": ("morocco",),
+    "MM": ("myanmar", "burma"), "MN": ("mongolia",), "MO": ("macau", "macao"),
+    "MX": ("mexico",), "MY": ("malaysia",), "NG": ("nigeria",),
+    "NL": ("netherlands", "holland", "the netherlands"), "NO": ("norway",),
+    "NP": ("nepal",), "NZ": ("new zealand",), "OM": ("oman",),
+    "PA": ("panama",), "PE": ("peru",), "PH": ("philippines",),
+    "PK": ("pakistan",), "PL": ("poland",), "PR": ("puerto rico",),
+    "PT": ("portugal",), "PY": ("paraguay",), "QA": ("qatar",),
+    "RO": ("romania",), "RS": ("serbia",), "RU": ("russia",),
+    "SA": ("saudi arabia",), "SE": ("sweden",), "SG": ("singapore",),
+    "SI": ("slovenia",), "SK": ("slovakia",), "SN": ("senegal",),
+    "TH": ("thailand",), "TN": ("tunisia",), "TR": ("turkey", "turkiye"),
+    "TW": ("taiwan",), "TZ": ("tanzania",), "UA": ("ukraine",),
+    "UG": ("uganda",),
+    "US": ("united states", "usa", "united states of america", "america"),
+    "UY": ("uruguay",), "VE": ("venezuela",), "VN": ("vietnam", "viet nam"),
+    "ZA": ("south africa",), "ZW": ("zimbabwe",),
+}
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Edit distance                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def _deletions(key: str) -> set[str]:
+    """`key` plus every string made by deleting one character from it."""
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal-string-alignment distance (Levenshtein + adjacent swaps)."""
+    if a == b:
+        return 0
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+def _max_edits(key: str) -> int:
+    if len(key) >= MIN_FUZZY2_LEN:
+        return 2
+    return 1 if len(key) >= MIN_FUZZY_LEN else 0
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Gazetteer                                                    ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class Gazetteer:
+    """
+    In-memory city table with exact, typo-tolerant and prefix lookup.
+
+    lookup() returns the same {"latitude", "longitude", "name"} dict as
+    the geocoding API, or None when the name is not covered.
+    """
+
+    def __init__(self, path: str | Path | None = GAZETTEER_PATH):
+        self.names: list[str] = []
+        self.keys: list[str] = []
+        self.countries: list[str] = []
+        self.regions: list[str] = []
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.populations = array("q")
+        self.counters = {"exact": 0, "fuzzy": 0, "prefix": 0, "misses": 0}
+
+        if path and Path(path).exists():
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    self.names.append(row["name"])
+                    self.keys.append(normalize_name(row["name"]))
+                    self.countries.append(row["country"].upper())
+                    self.regions.append(row["admin1"].upper())
+                    self.latitudes.append(float(row["latitude"]))
+                    self.longitudes.append(float(row["longitude"]))
+                    self.populations.append(int(row["population"] or 0))
+
+        # Prefix index: keys in sorted order, with their row ids alongside
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self._sorted_keys = [self.keys[i] for i in order]
+        self._sorted_ids = array("i", order)
+
+        # Exact + deletion index: variant → row ids
+        self._exact: dict[str, list[int]] = {}
+        self._variants: dict[str, list[int]] = {}
+        for i, key in enumerate(self.keys):
+            self._exact.setdefault(key, []).append(i)
+            for variant in _deletions(key):
+                self._variants.setdefault(variant, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ─── Matching helpers ──────────────────────────────────────────
+    def _qualifies(self, i: int, qualifiers: list[str]) -> bool:
+        """True if every qualifier names row i's country or region."""
+        country = self.countries[i]
+        accepted = {country.lower(), self.regions[i].lower(),
+                    *COUNTRY_NAMES.get(country, ())}
+        return all(q in accepted for q in qualifiers)
+
+    def _best(self, ids, qualifiers: list[str]) -> Optional[int]:
+        """Most populous row among `ids` that satisfies the qualifiers."""
+        ids = [i for i in ids if self._qualifies(i, qualifiers)]
+        return max(ids, key=self.populations.__getitem__) if ids else None
+
+    def _fuzzy(self, key: str, qualifiers: list[str]) -> Optional[int]:
+        limit = _max_edits(key)
+        if not limit:
+            return None
+        candidates = {i for v in _deletions(key) for i in self._variants.get(v, ())}
+        scored = [(edit_distance(key, self.keys[i]), i) for i in candidates]
+        scored = [(d, i) for d, i in scored if d <= limit]
+        if not scored:
+            return None
+        nearest = min(d for d, _ in scored)
+        return self._best((i for d, i in scored if d == nearest), qualifiers)
+
+    def _prefix(self, key: str, qualifiers: list[str]) -> Optional[int]:
+        """Cities whose name begins with `key` followed by a word break."""
+        if len(key) < MIN_PREFIX_LEN:
+            return None
+        lo = bisect_left(self._sorted_keys, key + " ")
+        hi = bisect_left(self._sorted_keys, key + "!")   # "!" sorts right after " "
+        return self._best(self._sorted_ids[lo:hi], qualifiers)
+
+    def _match(self, name: str) -> tuple[Optional[int], str]:
+        parts = [p.strip() for p in normalize_name(name).split(",")]
+        key, qualifiers = parts[0], [p for p in parts[1:] if p]
+        if not key:
+            return None, "misses"
+        i = self._best(self._exact.get(key, ()), qualifiers)
+        if i is not None:
+            return i, "exact"
+        i = self._fuzzy(key, qualifiers)
+        if i is not None:
+            return i, "fuzzy"
+        i = self._prefix(key, qualifiers)
+        if i is not None:
+            return i, "prefix"
+        return None, "misses"
+
+    # ─── Public API ────────────────────────────────────────────────
+    def __contains__(self, name: str) -> bool:
+        """Membership test that does not touch the counters."""
+        return self._match(name)[0] is not None
+
+    def lookup(self, name: str) -> Optional[dict]:
+        """Coordinates for `name`, or None if the gazetteer has no match."""
+        i, kind = self._match(name)
+        self.counters[kind] += 1
+        if i is None:
+            return None
+        return {
+            "latitude": self.latitudes[i],
+            "longitude": self.longitudes[i],
+            "name": self.names[i],
+        }
+
+    def stats(self) -> dict:
+        """Hits by match kind, misses and table size."""
+        c = self.counters
+        lookups = sum(c.values())
+        hits = lookups - c["misses"]
+        return {
+            **c,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "size": len(self),
+        }
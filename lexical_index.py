@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+BM25 inverted index and hybrid (lexical + vector) retrieval
+═══════════════════════════════════════════════════════════════════════
+Most search_offices queries are exact-token lookups — "HQ", "Southern
+office", "Chicago".  Embedding them and running a nearest-neighbour
+search costs a model call and still sometimes ranks the wrong line
+first.  This module keeps a BM25 index over the same chunks as the
+Chroma collection and decides per query:
+
+* **fast path** — the best BM25 hit contains the query terms carrying
+  at least FAST_PATH_COVERAGE of their IDF weight (so a missing
+  "office" hardly matters, a missing city or unknown word does) and
+  clearly beats the runner-up (FAST_PATH_MARGIN): return it without
+  embedding anything.
+* **hybrid**    — otherwise take the top CANDIDATES of both rankings
+  and fuse them with reciprocal-rank fusion (RRF), which needs no
+  calibration between BM25 scores and vector distances.
+
+Tokens are case-, accent- and punctuation-folded ("Champs-Élysées" →
+"champs", "elysees"), so lookups match the PDF however they are typed.
+
+A table's header row ("Office Name Address Number of Employees ...")
+shares a word with almost every query but answers none of them;
+is_table_header() spots it so it is neither indexed nor returned.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+K1, B              = 1.2, 0.75      # standard BM25 parameters
+CANDIDATES         = 10             # per ranking, before fusion
+RRF_K              = 60             # reciprocal-rank fusion constant
+FAST_PATH_COVERAGE = 0.8            # share of query IDF the best hit must contain
+FAST_PATH_MARGIN   = 1.5            # best BM25 score ÷ runner-up
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_WORD_RE  = re.compile(r"[^\W\d_]{4,}")
+STOPWORDS = frozenset("""
+    a an and any are at do does for from how i in is me of on or our show
+    tell the their there to we what where which who with you
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return _TOKEN_RE.findall(text)
+
+def is_table_header(text: str) -> bool:
+    """
+    A row of column titles: at least four words, no digits or commas
+    (rows have numbers, addresses and lists), and every word of four
+    letters or more capitalised ("Number of Employees").
+    """
+    words = _WORD_RE.findall(text)
+    return (len(text.split()) >= 4 and not any(ch.isdigit() or ch == "," for ch in text)
+            and bool(words) and all(w[0].isupper() for w in words))
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  BM25 index                                                   ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class BM25Index:
+    """In-memory inverted index: term → [(doc number, term frequency)]."""
+
+    def __init__(self, ids: Sequence[str], docs: Sequence[str]):
+        self.ids = list(ids)
+        self.docs = list(docs)
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lengths: List[int] = []
+        for n, doc in enumerate(self.docs):
+            terms = tokenize(doc)
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings[term].append((n, tf))
+        self.avg_len = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        total = len(self.docs)
+        self.idf = {term: math.log(1 + (total - len(p) + 0.5) / (len(p) + 0.5))
+                    for term, p in self.postings.items()}
+        self.unseen_idf = math.log(1 + (total + 0.5) / 0.5)   # term in no document
+        self.by_id = {cid: n for n, cid in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @staticmethod
+    def query_terms(query: str) -> List[str]:
+        """Informative terms of `query`: tokens minus stop words, deduplicated."""
+        terms = [t for t in tokenize(query) if t not in STOPWORDS]
+        return list(dict.fromkeys(terms))
+
+    def search(self, query: str, k: int = CANDIDATES) -> List[Tuple[int, float]]:
+        """Top `k` (doc number, score) pairs; documents sharing no term are left out."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in self.query_terms(query):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for n, tf in self.postings[term]:
+                norm = K1 * (1 - B + B * self.lengths[n] / self.avg_len)
+                scores[n] += idf * tf * (K1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda kv: -kv[1])[:k]
+
+    def confident(self, query: str, hits: List[Tuple[int, float]]) -> bool:
+        """Does the best hit answer `query` on its own (see module docstring)?"""
+        terms = self.query_terms(query)
+        if not hits or not terms:
+            return False
+        top_terms = set(tokenize(self.docs[hits[0][0]]))
+        weight = {t: self.idf.get(t, self.unseen_idf) for t in terms}
+        covered = sum(w for t, w in weight.items() if t in top_terms)
+        if covered < FAST_PATH_COVERAGE * sum(weight.values()):
+            return False
+        return len(hits) == 1 or hits[0][1] >= FAST_PATH_MARGIN * hits[1][1]
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Hybrid retrieval                                             ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def rrf(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> List[str]:
+    """Reciprocal-rank fusion of several ranked id lists."""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, cid in enumerate(ranking):
+            scores[cid] += 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda cid: -scores[cid])
+
+def hybrid_search(query: str, lexical: BM25Index,
+                  vector_search: Callable[[str, int], List[str]],
+                  top_k: int, docs: Optional[Mapping[str, str]] = None) -> Tuple[List[str], str]:
+    """
+    Documents for `query` and how they were found ("lexical" or
+    "hybrid").  `vector_search(query, n)` returns the ids of the `n`
+    nearest chunks and is only called off the fast path; `docs` gives
+    the text of vector hits the lexical index does not hold.
+    """
+    if not len(lexical):
+        return [], "hybrid"
+    hits = lexical.search(query, CANDIDATES)
+    if lexical.confident(query, hits):
+        return [lexical.docs[hits[0][0]]], "lexical"
+    fused = rrf([[lexical.ids[n] for n, _ in hits],
+                 vector_search(query, CANDIDATES)])
+    found = []
+    for cid in fused:
+        n = lexical.by_id.get(cid)
+        text = lexical.docs[n] if n is not None else (docs or {}).get(cid)
+        if text is not None and not is_table_header(text):
+            found.append(text)
+            if len(found) == top_k:
+                break
+    return found, "hybrid"
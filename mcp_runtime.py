@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Agent Runtime — long-lived pool of warm MCP sessions
+═══════════════════════════════════════════════════════════════════════
+The Lab 6 agent originally opened `Client(MCP_SERVER)` inside every call
+to run_agent().  With stdio transport that means a brand-new child
+process per question: Python start-up, importing the server, opening
+Chroma and loading the embedding model — seconds of cold start before
+the first tool call.
+
+This module keeps those sessions alive instead:
+
+1. resolve_target() — picks how the agent reaches the MCP server:
+                      "stdio" (subprocess), "http" (separate server) or
+                      "inprocess" (the FastMCP instance mounted directly
+                      in this process — no IPC, no JSON framing).
+2. MCPSessionPool   — owns N connected fastmcp Clients, leases them to
+                      concurrent queries, pings them in the background
+                      and respawns any that stop answering.
+3. AgentRuntime     — runs the pool on a dedicated event-loop thread so
+                      synchronous callers (Gradio, the CLI) can submit
+                      coroutines without paying asyncio.run() set-up or
+                      MCP start-up on every query.
+
+Configuration comes from the environment:
+
+  MCP_TRANSPORT        stdio | http | inprocess    (default stdio)
+  MCP_HTTP_URL         endpoint for http transport (default localhost:8000)
+  MCP_POOL_SIZE        number of warm sessions     (default 2)
+  MCP_HEALTH_INTERVAL  seconds between pings       (default 30)
+"""
+
+from __future__ import annotations
+
+# ────────────────────────── standard libs ───────────────────────────
+import asyncio
+import atexit
+import os
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+# ────────────────────────── third-party libs ────────────────────────
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport, StdioTransport
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                               ║
+# ╚══════════════════════════════════════════════════════════════════╝
+MCP_TRANSPORT   = os.getenv("MCP_TRANSPORT", "stdio").lower()
+MCP_HTTP_URL    = os.getenv("MCP_HTTP_URL", "http://127.0.0.1:8000/mcp/")
+MCP_STDIO_PATH  = str(Path(__file__).parent / "mcp_stdio_wrapper.py")
+TRANSPORTS      = ("stdio", "http", "inprocess")
+
+POOL_SIZE       = int(os.getenv("MCP_POOL_SIZE", "2"))
+HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "30"))
+PING_TIMEOUT    = 5.0        # seconds a session has to answer a ping
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Transport selection                                         ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def resolve_target(transport: str = MCP_TRANSPORT) -> Any:
+    """
+    Return what fastmcp's Client should connect to for `transport`.
+
+    * "stdio"     → a transport that spawns mcp_stdio_wrapper.py with
+                    this process's environment (the MCP SDK would
+                    otherwise pass only HOME, PATH, USER and the like,
+                    dropping every OPENMETEO_* / EMBED_* / ... setting)
+    * "http"      → MCP_HTTP_URL (server started separately)
+    * "inprocess" → the FastMCP("WeatherServer") object itself; Client
+                    talks to it over in-memory streams, so tool calls
+                    skip the subprocess, the pipe and JSON encoding.
+                    Use this when agent and server share a host.
+    """
+    transport = transport.lower()
+    if transport == "stdio":
+        return PythonStdioTransport(MCP_STDIO_PATH, env=dict(os.environ))
+    if transport == "http":
+        return MCP_HTTP_URL
+    if transport == "inprocess":
+        from mcp_server import mcp       # imported lazily: loads the server
+        return mcp
+    raise ValueError(f"Unknown MCP_TRANSPORT {transport!r}; expected one of {TRANSPORTS}")
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Session pool                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class MCPSessionPool:
+    """
+    A fixed-size pool of connected MCP clients.
+
+    `target` is anything fastmcp's Client accepts: a path to a server
+    script or a stdio transport, an HTTP URL, or a FastMCP instance.
+    Each pooled session gets its own Client — for stdio that is its own
+    warm server process, so concurrent queries never share one JSON-RPC
+    pipe.
+    """
+
+    def __init__(
+        self,
+        target: Any,
+        size: int = POOL_SIZE,
+        health_interval: float = HEALTH_INTERVAL,
+    ):
+        self.target = target
+        self.size = max(1, size)
+        self.health_interval = health_interval
+        self._idle: asyncio.Queue[Client] = asyncio.Queue()
+        self._health_task: Optional[asyncio.Task] = None
+        self.stats = {"leases": 0, "respawns": 0, "failed_pings": 0}
+
+    # ── Session lifecycle ───────────────────────────────────────────
+    async def _spawn(self) -> Client:
+        """Create and connect one Client (starts the subprocess for stdio)."""
+        target = self.target
+        if isinstance(target, StdioTransport):
+            # A transport holds one subprocess session: clone it per Client
+            target = StdioTransport(target.command, target.args, env=target.env,
+                                    cwd=target.cwd, keep_alive=target.keep_alive,
+                                    log_file=target.log_file)
+        client = Client(target)
+        await client.__aenter__()
+        return client
+
+    @staticmethod
+    async def _dispose(client: Client) -> None:
+        """Disconnect a Client, ignoring errors from an already-dead session."""
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception:
+            pass
+
+    async def _healthy(self, client: Client) -> bool:
+        """Return True if the session answers a ping in time."""
+        if not client.is_connected():
+            return False
+        try:
+            return bool(await asyncio.wait_for(client.ping(), PING_TIMEOUT))
+        except Exception:
+            return False
+
+    async def _respawn(self, client: Client) -> Client:
+        """Replace a broken session with a fresh one."""
+        self.stats["respawns"] += 1
+        await self._dispose(client)
+        return await self._spawn()
+
+    # ── Public API ──────────────────────────────────────────────────
+    async def start(self) -> None:
+        """Connect every session up front and begin health checking."""
+        results = await asyncio.gather(*(self._spawn() for _ in range(self.size)),
+                                       return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            for client in results:
+                if not isinstance(client, BaseException):
+                    await self._dispose(client)
+            raise errors[0]
+        for client in results:
+            self._idle.put_nowait(client)
+        if self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Client]:
+        """
+        Borrow a connected session for the duration of one query.
+
+        Waits if every session is busy.  If the query fails because the
+        session died (it is disconnected or no longer answers a ping), the
+        session is replaced before going back to the pool.
+
+        The slot always goes back to the pool, even when a respawn fails:
+        the dead client is returned and the next lease (or the health
+        loop) tries again, so a server that is down makes queries raise
+        instead of slowly draining the pool until lease() blocks forever.
+        """
+        client = await self._idle.get()
+        self.stats["leases"] += 1
+        if not client.is_connected():
+            try:
+                client = await self._respawn(client)
+            except BaseException:
+                self._idle.put_nowait(client)
+                raise
+        failed = False
+        try:
+            yield client
+        except Exception:
+            failed = True
+            raise
+        finally:
+            try:
+                if not client.is_connected() or (failed and not await self._healthy(client)):
+                    client = await self._respawn(client)
+            except Exception as e:
+                print(f"MCP pool: respawn failed ({type(e).__name__}: {e})")
+            finally:
+                self._idle.put_nowait(client)
+
+    async def _health_loop(self) -> None:
+        """Ping idle sessions periodically; respawn any that do not answer."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for _ in range(self._idle.qsize()):
+                try:
+                    client = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if not await self._healthy(client):
+                    self.stats["failed_pings"] += 1
+                    try:
+                        client = await self._respawn(client)
+                    except Exception as e:
+                        print(f"MCP pool: respawn failed ({type(e).__name__}: {e})")
+                self._idle.put_nowait(client)
+
+    async def close(self) -> None:
+        """Stop health checks and disconnect every idle session."""
+        if self._health_task:
+            self._health_task.cancel()
+        while not self._idle.empty():
+            await self._dispose(self._idle.get_nowait())
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 4.  Runtime — a background event loop that owns the pool        ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class AgentRuntime:
+    """
+    Run coroutines against a warm MCPSessionPool from synchronous code.
+
+    The pool lives on a daemon thread with its own event loop, started
+    lazily on the first run() call and closed at interpreter exit.
+    Several threads (e.g. concurrent Gradio requests) may call run() at
+    the same time; each coroutine leases its own session from the pool.
+    """
+
+    def __init__(self, target: Any, size: int = POOL_SIZE):
+        self.target = target
+        self.size = size
+        self.pool: Optional[MCPSessionPool] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever,
+                             name="mcp-runtime", daemon=True).start()
+            pool = MCPSessionPool(self.target, self.size)
+            try:
+                asyncio.run_coroutine_threadsafe(pool.start(), loop).result()
+            except BaseException:
+                loop.call_soon_threadsafe(loop.stop)    # don't leak the loop thread
+                raise
+            self._loop, self.pool = loop, pool
+            atexit.register(self.shutdown)
+
+    def run(self, fn: Callable[[MCPSessionPool], Awaitable[Any]]) -> Any:
+        """Call `fn(pool)` on the runtime loop and block for its result."""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(fn(self.pool), self._loop).result()
+
+    def shutdown(self) -> None:
+        """Close every pooled session and stop the background loop."""
+        with self._lock:
+            if self._loop is None:
+                return
+            loop, pool = self._loop, self.pool
+            self._loop, self.pool = None, None
+        try:
+            asyncio.run_coroutine_threadsafe(pool.close(), loop).result(timeout=10)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
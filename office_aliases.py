@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Alias / entity index for office lookups
+═══════════════════════════════════════════════════════════════════════
+The office PDF is a table: one row per office with name, address, city,
+state or country, headcount, revenue and services.  Most agent queries
+name one of those entities ("HQ", "Chicago office", "offices in
+Europe"), so instead of a nearest-neighbour search this index answers
+them with one dictionary lookup.
+
+At index time every chunk is parsed into a canonical record and each
+record contributes aliases:
+
+  office name          "Midwest Office", "midwest"
+  nicknames            "headquarters" for HQ, "windy city" for Chicago
+  city                 "chicago"
+  state / country      "il", "illinois", "usa", "united states"
+  region               "north america", "europe", "apac", "emea", ...
+
+A query is folded (case, accents, punctuation), filler words ("where
+is the ... office?") are dropped, and what remains must equal an alias.
+Anything else falls through to the BM25 / vector search — and so does
+an alias that names different entities picking different offices
+("la": Los Angeles or Louisiana), rather than guessing one of them.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+# ── our modules ─────────────────────────────────────────────────────
+from lexical_index import tokenize
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Vocabulary                                                   ║
+# ╚══════════════════════════════════════════════════════════════════╝
+# Words that carry no entity: "Where is the Chicago office?" → "chicago"
+FILLER = frozenset("""
+    a about all an any are at branch branches details do does for find give
+    hub in info information is location locations me of office offices on
+    our please show site sites tell the there we what where which who
+""".split())
+
+# Generic suffixes dropped from office names: "Midwest Office" → "midwest"
+NAME_SUFFIXES = ("office", "hub", "branch")
+
+NICKNAMES = {
+    "hq": ["headquarters", "head office", "head quarters", "main office", "corporate office"],
+    "new york": ["nyc", "big apple"],
+    "san francisco": ["sf", "bay area"],
+    "chicago": ["windy city"],
+    "los angeles": ["la"],
+    "sao paulo": ["sp"],
+    "mexico city": ["cdmx"],
+}
+
+US_STATES = dict(line.split(" ", 1) for line in """
+AL alabama|AK alaska|AZ arizona|AR arkansas|CA california|CO colorado
+CT connecticut|DE delaware|FL florida|GA georgia|HI hawaii|ID idaho
+IL illinois|IN indiana|IA iowa|KS kansas|KY kentucky|LA louisiana|ME maine
+MD maryland|MA massachusetts|MI michigan|MN minnesota|MS mississippi
+MO missouri|MT montana|NE nebraska|NV nevada|NH new hampshire|NJ new jersey
+NM new mexico|NY new york|NC north carolina|ND north dakota|OH ohio
+OK oklahoma|OR oregon|PA pennsylvania|RI rhode island|SC south carolina
+SD south dakota|TN tennessee|TX texas|UT utah|VT vermont|VA virginia
+WA washington|WV west virginia|WI wisconsin|WY wyoming|DC washington dc
+""".replace("\n", "|").strip("|").split("|"))
+
+# Country → (other names, regions)
+COUNTRIES = {
+    "usa":          (["us", "united states", "america"], ["north america", "americas", "amer"]),
+    "canada":       ([], ["north america", "americas", "amer"]),
+    "mexico":       ([], ["north america", "latin america", "americas", "amer"]),
+    "brazil":       ([], ["south america", "latin america", "americas", "amer"]),
+    "uk":           (["united kingdom", "britain", "great britain", "england"], ["europe", "emea"]),
+    "germany":      ([], ["europe", "emea"]),
+    "france":       ([], ["europe", "emea"]),
+    "netherlands":  (["holland"], ["europe", "emea"]),
+    "spain":        ([], ["europe", "emea"]),
+    "uae":          (["united arab emirates", "emirates"], ["middle east", "emea"]),
+    "south africa": ([], ["africa", "emea"]),
+    "india":        ([], ["asia", "apac"]),
+    "japan":        ([], ["asia", "apac"]),
+    "south korea":  (["korea"], ["asia", "apac"]),
+    "singapore":    ([], ["asia", "apac"]),
+    "australia":    ([], ["oceania", "apac"]),
+}
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Record extraction                                            ║
+# ╚══════════════════════════════════════════════════════════════════╝
+# "<name> <street>, <city>[, <state|country>] <employees> <revenue>M <services>"
+_ROW_RE = re.compile(r"^(?P<office>\D+?) (?P<street>\d[^,]*), (?P<place>.+)$")
+_TAIL_RE = re.compile(r"^(?P<place>.+?) (?P<employees>\d+) (?P<revenue>\d+(?:\.\d+)?M) "
+                      r"(?P<services>.+)$")
+_TANGLED_RE = re.compile(r"^(?P<place>.+?) (?P<revenue>\d+(?:\.\d+)?M) (?P<services>.+)$")
+
+def _strip_digits(word: str) -> str:
+    """"Afr7ic0a" → "Africa"; words without letters are kept as they are."""
+    if any(ch.isalpha() for ch in word):
+        return "".join(ch for ch in word if not ch.isdigit())
+    return word
+
+def parse_record(text: str) -> Optional[dict]:
+    """Canonical record for one table row, or None (header, prose...)."""
+    row = _ROW_RE.match(text)
+    if not row:
+        return None
+    tail = _TAIL_RE.match(row["place"])
+    if tail:
+        place, employees = tail["place"], int(tail["employees"])
+    else:
+        # Text extraction sometimes scatters the headcount's digits into
+        # the words before it ("South Afr7ic0a 5M"): the place is matched
+        # on its digit-stripped form and the headcount is unknown
+        tail = _TANGLED_RE.match(row["place"])
+        if not tail:
+            return None
+        place = " ".join(_strip_digits(w) for w in tail["place"].split(" "))
+        employees = None
+    city, _, area = place.partition(", ")
+    record = {"office": row["office"], "address": f"{row['street']}, {place}",
+              "city": city, "employees": employees, "revenue": tail["revenue"],
+              "services": [s.strip() for s in tail["services"].split(",")]}
+    if area.upper() in US_STATES:
+        record.update(state=area.upper(), country="USA")
+    else:
+        record["country"] = area or city                 # city-states: "Singapore"
+    return record
+
+def _key(text: str) -> str:
+    return " ".join(tokenize(text))
+
+def aliases_for(record: dict) -> Dict[str, str]:
+    """Every alias of a record → the entity it names ("city:chicago")."""
+    office, city = _key(record["office"]), _key(record["city"])
+    names = {office: f"office:{office}", city: f"city:{city}"}
+    words = office.split()
+    if len(words) > 1 and words[-1] in NAME_SUFFIXES:
+        names[" ".join(words[:-1])] = f"office:{office}"
+    for name, entity in list(names.items()):
+        names.update(dict.fromkeys(NICKNAMES.get(name, []), entity))
+    if "state" in record:
+        entity = f"state:{record['state']}"
+        names.update(dict.fromkeys([record["state"].lower(), US_STATES[record["state"]]], entity))
+    country = _key(record["country"])
+    other_names, regions = COUNTRIES.get(country, ([], []))
+    names.update(dict.fromkeys([country, *other_names], f"country:{country}"))
+    names.update({region: f"region:{region}" for region in regions})
+    return {n: entity for n, entity in names.items() if n}
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Alias index                                                  ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class AliasIndex:
+    """
+    alias → chunk ids, plus the canonical record of every chunk.  An
+    alias whose entities pick different chunks is left out of the table
+    and listed in `ambiguous`.
+    """
+
+    def __init__(self, ids: Sequence[str], docs: Sequence[str]):
+        self.docs: Dict[str, str] = {}
+        self.records: Dict[str, dict] = {}
+        named: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for cid, doc in zip(ids, docs):
+            record = parse_record(doc)
+            if record is None:
+                continue
+            self.docs[cid] = doc
+            self.records[cid] = record
+            for alias, entity in aliases_for(record).items():
+                named[alias][entity].append(cid)
+        self.table: Dict[str, List[str]] = {}
+        self.ambiguous: set[str] = set()
+        for alias, entities in named.items():
+            if len({tuple(cids) for cids in entities.values()}) > 1:
+                self.ambiguous.add(alias)
+            else:
+                self.table[alias] = next(iter(entities.values()))
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @staticmethod
+    def query_key(query: str) -> str:
+        """Folded query without filler words: "Where's the NYC office?" → "nyc"."""
+        return " ".join(t for t in tokenize(query) if t not in FILLER)
+
+    def lookup(self, query: str) -> Optional[List[str]]:
+        """Chunk ids for `query` if it names an alias, else None."""
+        ids = self.table.get(self.query_key(query))
+        if ids is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return ids
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"aliases": len(self.table), "ambiguous": len(self.ambiguous),
+                "records": len(self.records),
+                "hits": self.hits, "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0}
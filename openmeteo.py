@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Open-Meteo HTTP client — shared, async and connection-pooled
+═══════════════════════════════════════════════════════════════════════
+Used by the MCP server's get_weather and geocode_location tools.
+
+The earlier tools built a new requests.Session() for every attempt (a
+fresh TCP + TLS handshake each time) and slept with time.sleep() between
+retries, blocking the server worker.  This module replaces that with:
+
+1. One httpx.AsyncClient per event loop with keep-alive pooling, so
+   repeated calls to api.open-meteo.com reuse warm connections.
+2. Configurable pool limits and timeout (environment variables below).
+3. Non-blocking back-off with asyncio.sleep(), so one server process can
+   serve many concurrent tool calls without head-of-line blocking.
+4. A deadline budget per call (or per tool, via `with deadline(s):`)
+   that caps attempt timeouts and back-off sleeps, so a dead upstream
+   costs at most OPENMETEO_DEADLINE seconds instead of ~15 s.
+5. Full-jitter back-off, so retries from many callers do not arrive in
+   lock-step and turn one 429 into a storm.
+6. A circuit breaker per host: after repeated failures calls fail fast
+   for a cool-down period, then a single probe decides whether to close
+   it again.  stats() exposes every breaker's state.
+7. A token bucket shared by all server workers on the host
+   (ratelimit.py), so requests queue smoothly at OPENMETEO_RATE instead
+   of bursting into 429s.
+
+Configuration
+-------------
+  OPENMETEO_FORECAST_URL      forecast endpoint  (default: the public API)
+  OPENMETEO_GEOCODING_URL     geocoding endpoint (default: the public API)
+  OPENMETEO_MAX_CONNECTIONS   total open connections           (default 20)
+  OPENMETEO_MAX_KEEPALIVE     idle connections kept alive      (default 10)
+  OPENMETEO_TIMEOUT           per-attempt timeout, seconds     (default 15)
+  OPENMETEO_DEADLINE          total budget per call, seconds   (default 8)
+  OPENMETEO_BREAKER_FAILURES  failures in a row that open it   (default 5)
+  OPENMETEO_BREAKER_RESET     seconds open before a probe      (default 30)
+  OPENMETEO_RATE / _BURST     shared rate limit (see ratelimit.py)
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import asyncio
+import contextvars
+import os
+import random
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+
+# ── 3rd-party ───────────────────────────────────────────────────────
+import httpx
+
+# ── project ─────────────────────────────────────────────────────────
+import tool_metrics
+from ratelimit import TokenBucket
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Endpoints, retry and pool configuration                      ║
+# ╚══════════════════════════════════════════════════════════════════╝
+# Overridable so benchmarks can point at tools/fake_openmeteo.py
+FORECAST_URL  = os.getenv("OPENMETEO_FORECAST_URL",
+                          "https://api.open-meteo.com/v1/forecast")
+GEOCODING_URL = os.getenv("OPENMETEO_GEOCODING_URL",
+                          "https://geocoding-api.open-meteo.com/v1/search")
+
+# Shared retry settings for all external API calls
+MAX_RETRIES   = 3        # Total attempts (1 original + 2 retries)
+BACKOFF_BASE  = 0.5      # Full jitter: sleep U(0, min(CAP, BASE·2^attempt))
+BACKOFF_CAP   = 4.0
+MIN_ATTEMPT   = 0.25     # Don't start an attempt with less budget than this
+TRANSIENT_CODES = {429, 500, 502, 503, 504}  # HTTP codes worth retrying
+DEADLINE      = float(os.getenv("OPENMETEO_DEADLINE", "8"))
+
+# Circuit breaker settings (one breaker per upstream host)
+BREAKER_FAILURES = int(os.getenv("OPENMETEO_BREAKER_FAILURES", "5"))
+BREAKER_RESET    = float(os.getenv("OPENMETEO_BREAKER_RESET", "30"))
+
+# Connection pool settings
+MAX_CONNECTIONS = int(os.getenv("OPENMETEO_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE   = int(os.getenv("OPENMETEO_MAX_KEEPALIVE", "10"))
+TIMEOUT         = float(os.getenv("OPENMETEO_TIMEOUT", "15"))
+
+
+class UpstreamError(Exception):
+    """All retries failed; the message is the last error seen (e.g. "HTTP 503")."""
+
+class CircuitOpenError(UpstreamError):
+    """The host's breaker is open — the call was rejected without a request."""
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Shared client (one per event loop)                           ║
+# ╚══════════════════════════════════════════════════════════════════╝
+# httpx pools are bound to the loop that opened their connections, so we
+# keep one client per running loop (normally there is exactly one).
+# Loops that end without aclose() — asyncio.run() in the batch tools and
+# benchmarks — are pruned on the next call, so their clients can be freed.
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = \
+    weakref.WeakKeyDictionary()
+
+def get_client() -> httpx.AsyncClient:
+    """Return the keep-alive client for the current event loop."""
+    loop = asyncio.get_running_loop()
+    for old in [old for old in list(_clients.keys()) if old.is_closed()]:
+        del _clients[old]
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+async def aclose() -> None:
+    """Close the client for the current event loop (e.g. on shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Deadline budget                                              ║
+# ╚══════════════════════════════════════════════════════════════════╝
+# Absolute time.monotonic() deadline of the current tool call, if any.
+# Context variables follow the call into tasks it starts (asyncio.gather,
+# single-flight executions), so one budget covers all its requests.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "openmeteo_deadline", default=None)
+
+@contextmanager
+def deadline(seconds: float = DEADLINE) -> Iterator[None]:
+    """Bound every get_json() inside the block to `seconds` in total."""
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(at, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def current_deadline() -> float:
+    """Absolute deadline of the current scope, or DEADLINE from now."""
+    at = _deadline.get()
+    return time.monotonic() + DEADLINE if at is None else at
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 4.  Per-host circuit breaker                                     ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class CircuitBreaker:
+    """
+    closed → (BREAKER_FAILURES failures in a row) → open
+    open   → (BREAKER_RESET seconds later) → half-open: one probe call
+    probe succeeds → closed;  probe fails → open for another period
+
+    Only network errors and 5xx count as failures — a 429 means the host
+    is up but busy, and a 4xx is the caller's fault.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, reset: float = BREAKER_RESET):
+        self.failures = failures
+        self.reset = reset
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """May a request go out now?  Lets a single probe through when half-open."""
+        if self.state == "closed":
+            return True
+        if time.monotonic() - self.opened_at >= self.reset:
+            # Half-open: this caller probes; re-arm so others keep failing fast
+            self.state = "half_open"
+            self.opened_at = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failures:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        retry_in = self.reset - (time.monotonic() - self.opened_at)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in": round(max(retry_in, 0.0), 1) if self.state != "closed" else 0.0,
+        }
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+def breaker(url: str) -> CircuitBreaker:
+    """The circuit breaker for `url`'s host."""
+    host = urlsplit(url).netloc
+    return _breakers.setdefault(host, CircuitBreaker())
+
+# One bucket for every Open-Meteo endpoint — the quota is per client IP
+rate_limiter = TokenBucket()
+
+# Process-wide request counters (per-tool counts go to tool_metrics)
+counters = {"requests": 0, "retries": 0, "failed_calls": 0}
+
+def stats() -> dict:
+    """Request counters, breaker state per upstream host and rate-limiter counters."""
+    return {
+        "requests": dict(counters),
+        "breakers": {host: b.stats() for host, b in _breakers.items()},
+        "rate_limit": rate_limiter.stats(),
+    }
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 5.  GET with retries                                             ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def _backoff(attempt: int, resp: Optional[httpx.Response]) -> float:
+    """Full-jitter delay, or the server's Retry-After when it sends one."""
+    if resp is not None:
+        try:
+            return float(resp.headers["Retry-After"])
+        except (KeyError, ValueError):
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+async def get_json(url: str, params: Optional[dict[str, Any]] = None) -> Any:
+    """
+    GET `url` on the shared client and return the decoded JSON body.
+
+    Retry policy
+    ------------
+    * Up to MAX_RETRIES total attempts on the pooled connections, all
+      inside the current deadline budget (see deadline()).
+    * Retries on network errors **or** HTTP 429/5xx; other 4xx fail fast.
+    * Full-jitter back-off with asyncio.sleep (honouring Retry-After) —
+      the event loop keeps serving other tool calls while this one waits.
+    * Fails fast without a request while the host's breaker is open.
+    * Every attempt first waits for a token from the shared rate limiter
+      (only as long as the budget allows).
+
+    Raises
+    ------
+    CircuitOpenError
+        If the host's circuit breaker is open.
+    UpstreamError
+        If every attempt failed or the budget ran out.
+    ValueError
+        If the body is not valid JSON (not retried).
+    """
+    client = get_client()
+    circuit = breaker(url)
+    expires = current_deadline()
+    last_error: Optional[str] = None
+
+    for attempt in range(MAX_RETRIES):
+        budget = expires - time.monotonic()
+        if budget < MIN_ATTEMPT:
+            last_error = f"deadline exceeded after {attempt} attempt(s)"
+            break
+        if not circuit.allow():
+            counters["failed_calls"] += 1
+            raise CircuitOpenError(f"circuit open for {urlsplit(url).netloc}")
+        if not await rate_limiter.acquire(max_wait=budget - MIN_ATTEMPT):
+            last_error = "rate-limit queue longer than the deadline"
+            break
+        budget = expires - time.monotonic()
+
+        resp: Optional[httpx.Response] = None
+        try:
+            counters["requests"] += 1
+            tool_metrics.note("upstream_requests")
+            if attempt:
+                counters["retries"] += 1
+                tool_metrics.note("upstream_retries")
+            # httpx timeouts are per phase; wait_for bounds the whole attempt
+            resp = await asyncio.wait_for(
+                client.get(url, params=params, timeout=min(TIMEOUT, budget)),
+                budget)
+            if resp.status_code not in TRANSIENT_CODES:
+                circuit.record_success()
+                resp.raise_for_status()
+                return resp.json()
+            # Rate limiting or server error — worth another try
+            last_error = f"HTTP {resp.status_code}"
+            if resp.status_code == 429:
+                circuit.record_success()      # alive, just busy
+            else:
+                circuit.record_failure()
+
+        except httpx.HTTPStatusError as e:
+            # Non-transient 4xx — retrying will not help
+            counters["failed_calls"] += 1
+            raise UpstreamError(f"HTTP {e.response.status_code}") from e
+
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            # Network errors (timeout, connection refused, etc.)
+            last_error = type(e).__name__
+            circuit.record_failure()
+
+        if attempt < MAX_RETRIES - 1:
+            delay = _backoff(attempt, resp)
+            if delay > expires - time.monotonic() - MIN_ATTEMPT:
+                last_error = f"{last_error}; no budget left to retry"
+                break
+            await asyncio.sleep(delay)
+
+    counters["failed_calls"] += 1
+    raise UpstreamError(last_error or "unknown error")
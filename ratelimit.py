@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiter shared by every server worker on the host
+═══════════════════════════════════════════════════════════════════════
+With several MCP server workers each retrying independently, Open-Meteo
+sees bursts well above its limit and answers with 429s.  This limiter
+keeps ONE bucket for the whole machine: its state (tokens, timestamp)
+lives in a 16-byte file that every process updates under an exclusive
+fcntl lock, so all workers draw from the same budget.
+
+Callers reserve a token up front and are told how long to wait for it.
+Tokens may go negative, which turns a burst into an orderly queue with
+one request every 1/rate seconds instead of a pile of rejections.
+
+Configuration
+-------------
+  OPENMETEO_RATE        requests per second across all workers (default 8;
+                        0 disables limiting)
+  OPENMETEO_BURST       bucket size — requests allowed back-to-back (default 10)
+  OPENMETEO_RATE_FILE   shared state file (default
+                        <tmp>/openmeteo-ratelimit-<uid>.bin, mode 0600)
+
+On platforms without fcntl (Windows) the bucket is per process, and so
+is it when the state file cannot be opened (e.g. it belongs to another
+user): the limiter then warns once and keeps limiting this process
+rather than failing the tool call.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import asyncio
+import math
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:                     # Windows — fall back to per-process
+    fcntl = None
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+RATE      = float(os.getenv("OPENMETEO_RATE", "8"))
+BURST     = float(os.getenv("OPENMETEO_BURST", "10"))
+RATE_FILE = Path(os.getenv(
+    "OPENMETEO_RATE_FILE",
+    Path(tempfile.gettempdir()) / f"openmeteo-ratelimit-{getattr(os, 'getuid', lambda: 0)()}.bin"))
+
+_STATE = struct.Struct("dd")            # tokens, wall-clock timestamp
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Shared token bucket                                          ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def _open_private(path: Path) -> int:
+    """
+    Open (or create) the state file readable and writable by this user
+    only.  The default lives in the shared tmp dir, so refuse symlinks
+    and files another user planted there — they could drain or reset
+    the bucket.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    if hasattr(os, "getuid"):
+        st = os.fstat(fd)
+        if st.st_uid != os.getuid():
+            os.close(fd)
+            raise PermissionError(f"{path} belongs to another user")
+        if st.st_mode & 0o077:
+            os.fchmod(fd, 0o600)                # ours, created before this check
+    return fd
+
+class TokenBucket:
+    """
+    `rate` tokens per second, at most `burst` banked, shared through `path`.
+
+    The lock is held only for a read-modify-write of 16 bytes, so taking
+    it from the event loop thread is fine.
+    """
+
+    def __init__(self, rate: float = RATE, burst: float = BURST,
+                 path: Path = RATE_FILE):
+        self.rate = rate
+        self.burst = burst
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._unshared: Optional[str] = None        # why the file is not used
+        self._state = _STATE.pack(burst, time.time())  # used without the file
+        self._lock = threading.Lock()
+        self.counters = {"acquired": 0, "delayed": 0, "rejected": 0,
+                         "wait_seconds": 0.0}
+
+    def _open(self) -> Optional[int]:
+        """The state file's descriptor, or None to keep the bucket in memory."""
+        if self._fd is None and self._unshared is None:
+            try:
+                self._fd = _open_private(self.path)
+            except OSError as e:
+                self._unshared = f"{type(e).__name__}: {e}"
+                print(f"rate limit: cannot use {self.path} ({self._unshared}); "
+                      "limiting this process only", file=sys.stderr)
+        return self._fd
+
+    @contextmanager
+    def _locked(self) -> Iterator[Optional[int]]:
+        """Exclusive access to the state across threads (and processes, via the file)."""
+        with self._lock:
+            fd = self._open()
+            if fd is not None and fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                yield fd
+            finally:
+                if fd is not None and fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def reserve(self, max_wait: float = math.inf) -> Optional[float]:
+        """
+        Take one token and return how many seconds to wait before using
+        it, or None — taking nothing — if that wait would exceed max_wait.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._locked() as fd:
+            if fd is None:
+                raw = self._state
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                raw = os.read(fd, _STATE.size)
+            now = time.time()
+            tokens, stamp = (_STATE.unpack(raw) if len(raw) == _STATE.size
+                             else (self.burst, now))
+            tokens = min(self.burst, tokens + max(0.0, now - stamp) * self.rate)
+            wait = max(0.0, (1.0 - tokens) / self.rate)
+            if wait > max_wait:
+                self.counters["rejected"] += 1
+                return None
+            if fd is None:
+                self._state = _STATE.pack(tokens - 1.0, now)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, _STATE.pack(tokens - 1.0, now))
+
+        self.counters["acquired"] += 1
+        if wait:
+            self.counters["delayed"] += 1
+            self.counters["wait_seconds"] += wait
+        return wait
+
+    async def acquire(self, max_wait: float = math.inf) -> bool:
+        """Wait (without blocking the loop) for a token; False if not within max_wait."""
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+    def stats(self) -> dict:
+        c = self.counters
+        return {
+            **c,
+            "wait_seconds": round(c["wait_seconds"], 3),
+            "rate": self.rate,
+            "burst": self.burst,
+            "shared": fcntl is not None and self._unshared is None,
+            **({"unshared_reason": self._unshared} if self._unshared else {}),
+        }
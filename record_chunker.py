@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Layout-aware record chunking for table-like PDFs
+═══════════════════════════════════════════════════════════════════════
+Indexing every PDF line as its own chunk spreads one office over as many
+vectors as its row has lines: a wrapped "Services Offered" cell ends up
+as a fragment like "Tech Support, HR" that matches a query but says
+nothing about which office it belongs to, and TOP_K fills up with such
+pieces.  This module groups the lines of a page back into records using
+their position on the page:
+
+* an **indented** line (x0 right of the page's left margin) continues
+  the record above it — that is what a wrapped table cell looks like,
+  also across a page break;
+* on a page whose line gaps are **bimodal** (blocks separated by wider
+  gaps, e.g. one card or paragraph per office) a line after a tight
+  gap continues the record and a wide gap starts the next one;
+* otherwise every line at the margin starts a new record, so a PDF with
+  one row per line still gets one chunk per row.
+
+A document's first record is dropped when it is a table header
+(lexical_index.is_table_header): it names every column, so it would
+match any query and answer none.  Every other record is kept.
+
+The record (lines joined with spaces) is the **parent** chunk: it is
+what gets embedded and what searches return.  Multi-line records can
+also index each line as a **child** chunk (RECORD_CHILDREN=1, off by
+default) with a `parent` metadata entry, so a query matching one line
+well still finds the record; search resolves a child hit to its parent
+and never returns the fragment itself.
+
+pdfplumber is imported on first use, like everywhere else in the server.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# ── our modules ─────────────────────────────────────────────────────
+from lexical_index import is_table_header
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+RECORD_CHILDREN  = os.getenv("RECORD_CHILDREN", "0") not in ("", "0")
+INDENT_POINTS    = 2.0      # x0 this far right of the margin = continuation
+GAP_RATIO        = 1.5      # widest ÷ tightest gap above which a page is bimodal
+MAX_RECORD_LINES = 12       # a record never grows past this (runaway prose)
+
+
+def chunking_params(children: bool = RECORD_CHILDREN, embedder: Optional[str] = None) -> dict:
+    """
+    How an index was chunked and which embedder (embedders.py name, e.g.
+    "onnx-int8-all-MiniLM-L6-v2", default the configured backend) wrote
+    its vectors.  Stored in the Chroma collection's metadata (and
+    index_pdf.py's manifest); a mismatch means rebuild.
+    """
+    if embedder is None:
+        from embedders import get_embedder
+        embedder = get_embedder().name
+    return {"chunking": "record", "record_children": children, "embedder": embedder}
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Lines and records                                            ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class Line(NamedTuple):
+    """One text line of a page with its bounding box (PDF points)."""
+    text: str
+    x0: float
+    top: float
+    bottom: float
+
+class Record(NamedTuple):
+    lines: Tuple[str, ...]
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.lines)
+
+    def children(self, enabled: bool = RECORD_CHILDREN) -> Tuple[str, ...]:
+        """
+        Line-level child chunks when enabled.  A one-line record has
+        none: its only line is already the record's own chunk.
+        """
+        return self.lines if enabled and len(self.lines) > 1 else ()
+
+def page_lines(page) -> List[Line]:
+    """Non-blank lines of a pdfplumber page, in reading order."""
+    return [Line(ln["text"], ln["x0"], ln["top"], ln["bottom"])
+            for ln in page.extract_text_lines(strip=True) if ln["text"]]
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Grouping                                                     ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class RecordChunker:
+    """
+    Feed the pages of one document in order; records come out as soon
+    as the next one starts, the last one from close().  A table header
+    opening the document is left out.
+    """
+
+    def __init__(self):
+        self._open: List[str] = []
+        self._first = True                      # next record opens the document
+
+    def _emit(self, done: List[Record]) -> None:
+        record = Record(tuple(self._open))
+        self._open = []
+        if not (self._first and is_table_header(record.text)):
+            done.append(record)
+        self._first = False
+
+    def feed(self, lines: Sequence[Line]) -> List[Record]:
+        """Group one page's lines; returns the records it completed."""
+        if not lines:
+            return []
+        margin = min(ln.x0 for ln in lines)
+        gaps = [max(0.0, cur.top - prev.bottom) for prev, cur in zip(lines, lines[1:])]
+        tight = min(gaps, default=0.0)
+        bimodal = bool(gaps) and max(gaps) > GAP_RATIO * tight + 1.0
+
+        done: List[Record] = []
+        for i, line in enumerate(lines):
+            indented = line.x0 > margin + INDENT_POINTS
+            if i and bimodal:
+                continues = gaps[i - 1] <= GAP_RATIO * tight + 1.0
+            else:
+                continues = indented                     # also across a page break
+            if self._open and (not continues or len(self._open) >= MAX_RECORD_LINES):
+                self._emit(done)
+            self._open.append(line.text)
+        return done
+
+    def close(self) -> List[Record]:
+        """The document's last record; the chunker is then ready for the next one."""
+        done: List[Record] = []
+        if self._open:
+            self._emit(done)
+        self._first = True
+        return done
+
+def extract_records(path: Path) -> List[Record]:
+    """Every record of a PDF file, in document order."""
+    import pdfplumber
+
+    chunker = RecordChunker()
+    records: List[Record] = []
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            records += chunker.feed(page_lines(page))
+            page.flush_cache()
+    return records + chunker.close()
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 4.  Parent resolution at query time                              ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class ParentIndex:
+    """
+    The parent chunks of a collection and child id → parent id, built
+    from `coll.get(include=["documents", "metadatas"])`.  Chunks without
+    a `parent` entry (records, or a collection indexed line by line) are
+    their own parent.
+    """
+
+    def __init__(self, ids: Sequence[str], docs: Sequence[str],
+                 metadatas: Iterable[Optional[dict]]):
+        self.ids: List[str] = []
+        self.docs: List[str] = []
+        self.doc_of: Dict[str, str] = {}            # parent id → its text
+        self.parent_of: Dict[str, str] = {}
+        for cid, doc, meta in zip(ids, docs, metadatas):
+            parent = (meta or {}).get("parent")
+            self.parent_of[cid] = parent or cid
+            if not parent:
+                self.ids.append(cid)
+                self.docs.append(doc)
+                self.doc_of[cid] = doc
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def children(self) -> int:
+        return len(self.parent_of) - len(self.ids)
+
+    def resolve(self, hits: Iterable[str], n: int) -> List[str]:
+        """First `n` distinct parents of ranked chunk ids."""
+        out: List[str] = []
+        for cid in hits:
+            parent = self.parent_of.get(cid, cid)
+            if parent not in out:
+                out.append(parent)
+                if len(out) == n:
+                    break
+        return out
@@ -18,7 +18,22 @@
 #   - guardrails.py       (Prompt-injection detection)
 #   - mcp_server.py       (MCP weather/geocoding/RAG tools)
 #   - mcp_stdio_wrapper.py (Starts MCP server in stdio transport mode)
+#   - mcp_runtime.py      (Warm MCP session pool used by the agent)
+#   - openmeteo.py        (Pooled async Open-Meteo client used by the server)
+#   - ratelimit.py        (Token bucket shared by all server workers)
+#   - tool_cache.py       (Geocode / weather caches used by the server)
+#   - tool_metrics.py     (Per-tool latency / error metrics middleware)
+#   - singleflight.py     (Coalesces concurrent identical tool calls)
+#   - worker_stats.py     (Per-worker stats for multi-worker serving)
+#   - gazetteer.py        (Offline first-tier geocoder)
+#   - lexical_index.py    (BM25 fast path / hybrid office search)
+#   - office_aliases.py   (Alias table: office/city/region → office rows)
+#   - record_chunker.py   (Per-office record chunks, child → parent lookup)
+#   - embed_cache.py      (On-disk embedding cache used to build the index)
+#   - embedders.py        (Int8 ONNX MiniLM embedder used by the server)
+#   - embed_daemon.py     (Optional shared embedding service client/daemon)
 #   - data/offices.pdf    (Source PDF — indexed into ChromaDB on first run)
+#   - data/world_cities.csv (City table loaded by gazetteer.py)
 #   - requirements.txt    (Python dependencies for HF Spaces)
 #   - README.md           (HF Spaces metadata and description)
 #   - .gitignore          (Git ignore rules)
@@ -62,6 +77,20 @@ cp "$PROJECT_ROOT/llm_provider.py" "$OUTPUT_DIR/"
 cp "$PROJECT_ROOT/guardrails.py" "$OUTPUT_DIR/"
 cp "$PROJECT_ROOT/mcp_server.py" "$OUTPUT_DIR/"
 cp "$PROJECT_ROOT/mcp_stdio_wrapper.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/mcp_runtime.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/openmeteo.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/ratelimit.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/tool_cache.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/tool_metrics.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/singleflight.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/worker_stats.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/gazetteer.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/lexical_index.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/office_aliases.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/record_chunker.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/embed_cache.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/embedders.py" "$OUTPUT_DIR/"
+cp "$PROJECT_ROOT/embed_daemon.py" "$OUTPUT_DIR/"
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Copy PDF data (the MCP server indexes it on first run)
@@ -75,6 +104,8 @@ if [ -f "$PROJECT_ROOT/data/offices.pdf" ]; then
 else
     echo -e "${YELLOW}  Warning: data/offices.pdf not found.${NC}"
 fi
+cp "$PROJECT_ROOT/data/world_cities.csv" "$OUTPUT_DIR/data/"
+echo "  Copied data/world_cities.csv"
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Create minimal requirements.txt for HF Spaces
@@ -91,8 +122,9 @@ huggingface_hub>=0.20.0
 # Vector database for RAG
 chromadb>=1.0.0
 
-# Embeddings model
-sentence-transformers>=5.0.0
+# Embeddings model: int8 ONNX MiniLM (onnxruntime comes with chromadb;
+# onnx is only needed to quantize the model once)
+onnx>=1.16.0
 
 # PDF text extraction (for on-the-fly indexing)
 pdfplumber>=0.10.0
@@ -100,8 +132,8 @@ pdfplumber>=0.10.0
 # MCP framework (server + stdio transport)
 fastmcp>=2.0.0
 
-# HTTP requests for weather APIs
-requests>=2.31.0
+# Async, connection-pooled HTTP client for weather APIs
+httpx>=0.27.0
 EOF
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Single-flight request coalescing for MCP tools
+═══════════════════════════════════════════════════════════════════════
+When several agents ask about the same office at the same moment, the
+server would otherwise run N identical geocode / weather / search calls.
+With @single_flight, concurrent calls that map to the same key await ONE
+in-flight execution and all receive its result.  Nothing is cached
+after the call finishes — that is the job of tool_cache.py.
+
+Usage
+-----
+    @mcp.tool
+    @single_flight(key=lambda name: normalize_name(name))
+    async def geocode_location(name: str) -> dict: ...
+
+    @mcp.tool
+    @single_flight()            # key = the call's arguments
+    def search_offices(query: str) -> str: ...   # sync → run in a thread
+
+stats() reports, per wrapped function, how many calls arrived, how many
+actually executed and how many were collapsed onto another call.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Coalescing group                                             ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class SingleFlight:
+    """Deduplicate concurrent executions that share a key."""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn()` unless a call with the same key is already running, in
+        which case wait for that one.  The shared execution is shielded,
+        so a cancelled caller does not cancel it for the others.
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._inflight),
+        }
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Decorator + registry                                         ║
+# ╚══════════════════════════════════════════════════════════════════╝
+_groups: dict[str, SingleFlight] = {}
+
+def single_flight(key: Optional[Callable[..., Hashable]] = None,
+                  name: Optional[str] = None):
+    """
+    Decorate a tool so concurrent identical calls share one execution.
+
+    `key` maps the call's arguments to the coalescing key (defaults to
+    the positional and keyword arguments themselves).  `name` labels the
+    counters in stats() (defaults to the function name).  Sync functions
+    are run in a worker thread, so the wrapped tool is always async.
+    """
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+        group = _groups.setdefault(name or fn.__name__, SingleFlight())
+        is_async = inspect.iscoroutinefunction(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            if is_async:
+                return await group.do(k, lambda: fn(*args, **kwargs))
+            return await group.do(k, lambda: asyncio.to_thread(fn, *args, **kwargs))
+
+        return wrapper
+    return decorate
+
+def stats() -> dict:
+    """Per-function call / execution / collapsed counters."""
+    return {name: group.stats() for name, group in _groups.items()}
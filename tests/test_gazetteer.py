@@ -0,0 +1,79 @@
+"""Checks for the offline gazetteer in gazetteer.py."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from gazetteer import Gazetteer, edit_distance
+
+CITIES = """\
+name,country,admin1,latitude,longitude,population
+Portland,US,OR,45.5152,-122.6784,652503
+Portland,US,ME,43.6591,-70.2568,68408
+Paris,FR,IDF,48.8566,2.3522,2148000
+Paris,US,TX,33.6609,-95.5555,24171
+Hong Kong,HK,,22.3193,114.1694,7482500
+Lyon,FR,ARA,45.7640,4.8357,513275
+Leon,MX,GUA,21.1250,-101.6860,1579803
+Philadelphia,US,PA,39.9526,-75.1652,1584064
+São Paulo,BR,SP,-23.5505,-46.6333,12325232
+"""
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = tmp_path / "cities.csv"
+    path.write_text(CITIES, encoding="utf-8")
+    return Gazetteer(path)
+
+
+def test_exact_match_prefers_the_most_populous(gazetteer):
+    assert gazetteer.lookup("Portland") == {"latitude": 45.5152, "longitude": -122.6784,
+                                            "name": "Portland"}
+    assert gazetteer.lookup("sao paulo")["name"] == "São Paulo"
+
+
+def test_qualifiers_pick_or_reject_a_row(gazetteer):
+    assert gazetteer.lookup("Portland, ME")["latitude"] == 43.6591
+    assert gazetteer.lookup("Paris, France")["latitude"] == 48.8566
+    assert gazetteer.lookup("Paris, TX")["latitude"] == 33.6609
+    assert gazetteer.lookup("Paris, Japan") is None
+
+
+def test_typos_within_the_edit_budget(gazetteer):
+    assert gazetteer.lookup("Philadelpia")["name"] == "Philadelphia"      # one edit
+    assert gazetteer.lookup("Philadelpiha")["name"] == "Philadelphia"     # two, long name
+    assert gazetteer.lookup("Pairs")["name"] == "Paris"                   # swap
+    assert gazetteer.lookup("Lyon")["name"] == "Lyon"
+    assert gazetteer.lookup("Lyin") is None                               # short: exact only
+
+
+def test_whole_word_prefix(gazetteer):
+    assert gazetteer.lookup("Hong")["name"] == "Hong Kong"
+    assert gazetteer.lookup("Hon") is None
+    assert gazetteer.lookup("Ho") is None
+
+
+def test_counters_and_misses(gazetteer):
+    gazetteer.lookup("Portland")
+    gazetteer.lookup("Philadelpia")
+    gazetteer.lookup("Hong")
+    gazetteer.lookup("Atlantis")
+    assert "Atlantis" not in gazetteer
+    stats = gazetteer.stats()
+    assert (stats["exact"], stats["fuzzy"], stats["prefix"], stats["misses"]) == (1, 1, 1, 1)
+    assert stats["size"] == 9
+
+
+def test_missing_file_gives_an_empty_table(tmp_path):
+    gazetteer = Gazetteer(tmp_path / "nope.csv")
+    assert len(gazetteer) == 0
+    assert gazetteer.lookup("Paris") is None
+
+
+def test_edit_distance():
+    assert edit_distance("paris", "pairs") == 1
+    assert edit_distance("lyon", "leon") == 1
+    assert edit_distance("kitten", "sitting") == 3
@@ -0,0 +1,54 @@
+"""Regression checks for tools/index_code.py."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+index_code = pytest.importorskip("index_code")
+
+
+class _CharEncoder:
+    """One token per character — enough to check the memo bookkeeping."""
+
+    def encode_ordinary_batch(self, texts, num_threads=1):
+        return [list(text) for text in texts]
+
+
+def test_count_tokens_survives_memo_eviction(monkeypatch):
+    monkeypatch.setattr(index_code, "_encoder", lambda: _CharEncoder())
+    monkeypatch.setattr(index_code, "_TOKEN_MEMO", {})
+    monkeypatch.setattr(index_code, "TOKEN_MEMO_MAX", 5)
+
+    assert index_code.count_tokens(["a", "b", "c"]) == {"a": 2, "b": 2, "c": 2}
+    # "a" is a hit, but memoizing d/e/f overflows the memo and clears it
+    assert index_code.count_tokens(["a", "d", "e", "ff"]) == {"a": 2, "d": 2, "e": 2, "ff": 3}
+    assert len(index_code._TOKEN_MEMO) <= 5
+
+
+def _fail_on_two(n):
+    time.sleep(0.05)
+    if n == 2:
+        raise ValueError("worker failed")
+    return n
+
+
+def test_bounded_map_cancels_pending_tasks_on_error():
+    from concurrent.futures import ThreadPoolExecutor
+
+    submitted = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        real_submit = pool.submit
+
+        def submit(fn, item):
+            future = real_submit(fn, item)
+            submitted.append(future)
+            return future
+
+        pool.submit = submit
+        with pytest.raises(ValueError):
+            list(index_code._bounded_map(pool, _fail_on_two, range(10), window=4))
+    assert len(submitted) < 10
+    assert any(f.cancelled() for f in submitted)     # queued, never started
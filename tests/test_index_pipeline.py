@@ -0,0 +1,60 @@
+"""Checks for tools/index_pipeline.py that need no model or database."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+index_pipeline = pytest.importorskip("index_pipeline")
+
+
+class _Collection:
+    class _client:
+        @staticmethod
+        def get_max_batch_size():
+            return 100
+
+    def __init__(self):
+        self.upserted, self.updated = [], []
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.upserted += ids
+
+    def update(self, ids, metadatas):
+        self.updated += ids
+
+
+def _fake_embedder(monkeypatch):
+    class Embed:
+        def __call__(self, texts):
+            return [[float(len(t))] for t in texts]
+
+        def stats(self):
+            return {}
+
+    monkeypatch.setattr(index_pipeline, "default_embedder", Embed)
+
+
+def test_close_writes_everything(monkeypatch):
+    _fake_embedder(monkeypatch)
+    coll = _Collection()
+    pipe = index_pipeline.EmbedPipeline(coll, batch_size=2)
+    for n in range(5):
+        pipe.add(f"c{n}", f"text {n}", {})
+    pipe.move("m0", {"chunk_index": 1})
+    stats = pipe.close()
+    assert sorted(coll.upserted) == [f"c{n}" for n in range(5)]
+    assert coll.updated == ["m0"]
+    assert (stats["embedded"], stats["moved"]) == (5, 1)
+
+
+def test_abort_stops_the_stages_without_writing_buffered_chunks(monkeypatch):
+    _fake_embedder(monkeypatch)
+    coll = _Collection()
+    pipe = index_pipeline.EmbedPipeline(coll, batch_size=10)
+    pipe.add("c0", "text", {})
+    pipe.abort()
+    assert coll.upserted == []
+    assert not any(stage.is_alive() for stage in pipe._stages)
+    assert "error" not in pipe.stats
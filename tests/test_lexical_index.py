@@ -0,0 +1,75 @@
+"""Checks for the BM25 index and rank fusion in lexical_index.py."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lexical_index import BM25Index, hybrid_search, is_table_header, rrf, tokenize
+
+HEADER = "Office Name Address Number of Employees Annual Revenue Services"
+ROWS = {
+    "c0": HEADER,
+    "c1": "Midwest Office 233 Wacker Dr, Chicago, IL 120 25M Sales, Support",
+    "c2": "Bay Area Hub 1 Market St, San Francisco, CA 250 45M Engineering, Research",
+    "c3": "Harbour Office 10 Pier Rd, Sydney, Australia 80 12M Sales",
+    "c4": "Gateway Office 5 Fifth Ave, New York, NY 380 62M Finance, Legal",
+}
+
+
+def _index(rows=ROWS):
+    return BM25Index(list(rows), list(rows.values()))
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("São Paulo, BR-2") == ["sao", "paulo", "br", "2"]
+
+
+def test_is_table_header():
+    assert is_table_header(HEADER)
+    assert not is_table_header(ROWS["c1"])
+    assert not is_table_header("Sales and Support")           # too short for a header
+
+
+def test_search_ranks_matching_rows_and_skips_the_rest():
+    index = _index()
+    hits = index.search("engineering in San Francisco")
+    assert index.ids[hits[0][0]] == "c2"
+    assert {index.ids[n] for n, _ in hits} == {"c2"}
+    assert index.search("tokyo") == []
+
+
+def test_confident_only_for_a_clear_winner():
+    index = _index()
+    assert index.confident("Sydney", index.search("Sydney"))
+    assert not index.confident("sales", index.search("sales"))       # two rows tie
+    assert not index.confident("Sydney weather", index.search("Sydney weather"))
+
+
+def test_rrf_rewards_agreement():
+    fused = rrf([["a", "b", "c"], ["b", "c", "d"]])
+    assert fused[0] == "b"
+    assert set(fused) == {"a", "b", "c", "d"}
+
+
+def test_hybrid_fast_path_skips_vector_search():
+    def vector_search(query, n):
+        raise AssertionError("vector search called on the fast path")
+
+    assert hybrid_search("Sydney", _index(), vector_search, top_k=3) == ([ROWS["c3"]], "lexical")
+
+
+def test_hybrid_fuses_drops_headers_and_stops_at_top_k():
+    index = _index({k: v for k, v in ROWS.items() if k != "c0"})
+    extra = {"c0": HEADER, "c9": "Summit Office 9 Alpine Way, Zurich, Switzerland 40 9M Sales"}
+
+    def vector_search(query, n):
+        return ["c0", "c9", "c3"]
+
+    found, how = hybrid_search("sales", index, vector_search, top_k=2, docs=extra)
+    assert how == "hybrid"
+    # fused: c3 (both lists), c0 (header, dropped), c1, then c9 past top_k
+    assert found == [ROWS["c3"], ROWS["c1"]]
+
+
+def test_hybrid_on_an_empty_index():
+    assert hybrid_search("x", BM25Index([], []), lambda q, n: ["a"], top_k=3) == ([], "hybrid")
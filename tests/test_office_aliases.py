@@ -0,0 +1,69 @@
+"""Checks for record parsing and the alias index in office_aliases.py."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from office_aliases import AliasIndex, parse_record
+
+ROWS = {
+    "c1": "Midwest Office 233 Wacker Dr, Chicago, IL 120 25M Sales, Support",
+    "c2": "West Coast Hub 200 Spring St, Los Angeles, CA 90 18M Media",
+    "c3": "Gulf Office 1 Canal St, New Orleans, LA 40 6M Logistics",
+    "c4": "Harbour Office 10 Pier Rd, Sydney, Australia 80 12M Sales",
+    "c5": "Lion Office 1 Bree St, Cape Town, South Afr7ic0a 5M Consulting",
+}
+
+
+def _index():
+    docs = ["Office Name Address Number of Employees Annual Revenue Services",
+            *ROWS.values()]
+    return AliasIndex(["c0", *ROWS], docs)
+
+
+def test_parse_record():
+    record = parse_record(ROWS["c1"])
+    assert record == {"office": "Midwest Office", "address": "233 Wacker Dr, Chicago, IL",
+                      "city": "Chicago", "employees": 120, "revenue": "25M",
+                      "services": ["Sales", "Support"], "state": "IL", "country": "USA"}
+    assert parse_record(ROWS["c4"])["country"] == "Australia"
+    assert parse_record("Office Name Address Number of Employees") is None
+
+
+def test_parse_record_with_scattered_headcount_digits():
+    record = parse_record(ROWS["c5"])
+    assert record["country"] == "South Africa"
+    assert record["employees"] is None
+    assert record["services"] == ["Consulting"]
+
+
+def test_lookup_by_city_office_state_country_and_region():
+    index = _index()
+    assert index.lookup("Where is the Chicago office?") == ["c1"]
+    assert index.lookup("midwest") == ["c1"]
+    assert index.lookup("Illinois") == ["c1"]
+    assert index.lookup("offices in South Africa") == ["c5"]
+    assert index.lookup("APAC") == ["c4"]
+    assert index.lookup("usa") == ["c1", "c2", "c3"]
+
+
+def test_nicknames():
+    index = _index()
+    assert index.lookup("windy city") == ["c1"]
+    assert index.lookup("Los Angeles") == ["c2"]
+
+
+def test_alias_naming_different_offices_is_ambiguous():
+    index = _index()
+    # "LA" is both Los Angeles (c2) and Louisiana (c3)
+    assert "la" in index.ambiguous
+    assert index.lookup("LA office") is None
+    assert index.stats()["ambiguous"] >= 1
+
+
+def test_unknown_query_misses():
+    index = _index()
+    assert index.lookup("tokyo") is None
+    assert index.lookup("sales offices in Chicago") is None    # not a bare alias
+    assert index.stats()["records"] == 5
+    assert index.stats()["misses"] == 2
@@ -0,0 +1,74 @@
+"""Circuit breaker and fail-fast checks for openmeteo.py (no network)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+openmeteo = pytest.importorskip("openmeteo")
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = openmeteo.CircuitBreaker(failures=3, reset=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = openmeteo.CircuitBreaker(failures=2, reset=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = openmeteo.CircuitBreaker(failures=1, reset=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    breaker.opened_at -= 0.1                      # reset period is over
+    assert breaker.allow()                        # the probe
+    assert breaker.state == "half_open"
+    assert not breaker.allow()                    # everyone else still fails fast
+
+
+def test_failed_probe_reopens_and_successful_probe_closes():
+    breaker = openmeteo.CircuitBreaker(failures=1, reset=0.05)
+    breaker.record_failure()
+    breaker.opened_at -= 0.1
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.stats()["times_opened"] == 2
+    breaker.opened_at -= 0.1
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_get_json_fails_fast_while_the_breaker_is_open(monkeypatch):
+    url = "https://breaker-test.invalid/v1/forecast"
+    monkeypatch.setattr(openmeteo, "_breakers", {})
+    circuit = openmeteo.breaker(url)
+    for _ in range(circuit.failures):
+        circuit.record_failure()
+    requests = openmeteo.counters["requests"]
+    with pytest.raises(openmeteo.CircuitOpenError):
+        asyncio.run(openmeteo.get_json(url))
+    assert openmeteo.counters["requests"] == requests     # nothing was sent
+
+
+def test_deadline_scopes_nest_to_the_earliest():
+    with openmeteo.deadline(10):
+        outer = openmeteo.current_deadline()
+        with openmeteo.deadline(60):
+            assert openmeteo.current_deadline() == outer
+        with openmeteo.deadline(1):
+            assert openmeteo.current_deadline() < outer
@@ -0,0 +1,37 @@
+"""Checks for ratelimit.TokenBucket (no network)."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ratelimit
+
+
+def test_bucket_allows_a_burst_then_spaces_requests(tmp_path):
+    bucket = ratelimit.TokenBucket(rate=10, burst=2, path=tmp_path / "state.bin")
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.2, abs=0.02)
+    assert bucket.reserve(max_wait=0.05) is None                # would wait ~0.3 s
+    assert bucket.stats()["rejected"] == 1
+
+
+def test_buckets_on_one_file_share_the_budget(tmp_path):
+    a = ratelimit.TokenBucket(rate=10, burst=1, path=tmp_path / "state.bin")
+    b = ratelimit.TokenBucket(rate=10, burst=1, path=tmp_path / "state.bin")
+    assert a.reserve() == 0.0
+    assert b.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+@pytest.mark.skipif(not hasattr(os, "O_NOFOLLOW"), reason="needs O_NOFOLLOW")
+def test_unusable_state_file_falls_back_to_this_process(tmp_path):
+    (tmp_path / "elsewhere").write_bytes(b"")
+    (tmp_path / "state.bin").symlink_to(tmp_path / "elsewhere")   # refused
+    bucket = ratelimit.TokenBucket(rate=10, burst=1, path=tmp_path / "state.bin")
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.stats()["shared"] is False
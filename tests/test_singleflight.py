@@ -0,0 +1,89 @@
+"""Checks for singleflight.py."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from singleflight import SingleFlight, single_flight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    group = SingleFlight()
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"temperature": 21}
+
+    async def main():
+        return await asyncio.gather(*(group.do("paris", fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert results == [{"temperature": 21}] * 5
+    assert len(runs) == 1
+    assert group.stats() == {"calls": 5, "executions": 1, "collapsed": 4, "in_flight": 0}
+
+
+def test_different_keys_and_later_calls_run_again():
+    group = SingleFlight()
+
+    async def value(v):
+        await asyncio.sleep(0)
+        return v
+
+    async def main():
+        first = await asyncio.gather(group.do("a", lambda: value(1)),
+                                     group.do("b", lambda: value(2)))
+        later = await group.do("a", lambda: value(3))   # nothing cached afterwards
+        return first, later
+
+    assert asyncio.run(main()) == ([1, 2], 3)
+    assert group.executions == 3
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    group = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(group.do("k", slow))
+        second = asyncio.ensure_future(group.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_errors_reach_every_waiter():
+    group = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0)
+        raise ValueError("upstream")
+
+    async def main():
+        return await asyncio.gather(group.do("k", boom), group.do("k", boom),
+                                    return_exceptions=True)
+
+    assert [type(r) for r in asyncio.run(main())] == [ValueError, ValueError]
+
+
+def test_decorator_coalesces_sync_functions_by_key():
+    runs = []
+
+    @single_flight(key=lambda name: name.lower(), name="test_lookup")
+    def lookup(name):
+        runs.append(name)
+        return name.lower()
+
+    async def main():
+        return await asyncio.gather(lookup("Paris"), lookup("PARIS"))
+
+    assert asyncio.run(main()) == ["paris", "paris"]
+    assert len(runs) == 1
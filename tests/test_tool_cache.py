@@ -0,0 +1,124 @@
+"""Checks for the grid-cell WeatherCache in tool_cache.py."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from tool_cache import WeatherCache, normalize_name
+
+
+class _Upstream:
+    """Records the cell centres it is asked for."""
+
+    def __init__(self, error=False):
+        self.calls = []
+        self.error = error
+
+    async def fetch(self, lat, lon):
+        self.calls.append((lat, lon))
+        if self.error:
+            return {"error": "upstream down"}
+        return {"temperature": len(self.calls), "latitude": lat, "longitude": lon}
+
+    async def fetch_many(self, coords):
+        return [await self.fetch(lat, lon) for lat, lon in coords]
+
+
+def _age(cache, seconds):
+    """Pretend every entry was stored `seconds` earlier."""
+    for cell, (stored_at, result) in list(cache._entries.items()):
+        cache._entries[cell] = (stored_at - seconds, result)
+
+
+def test_nearby_points_share_one_cell():
+    cache, upstream = WeatherCache(grid_deg=0.1, ttl=60), _Upstream()
+
+    async def main():
+        first = await cache.get_or_fetch(48.8566, 2.3322, upstream.fetch)
+        second = await cache.get_or_fetch(48.8600, 2.3290, upstream.fetch)   # ~500 m away
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first is second
+    assert upstream.calls == [(48.9, 2.3)]                # fetched at the cell centre
+    assert cache.stats()["fresh_hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_stale_entry_is_served_while_it_refreshes():
+    cache, upstream = WeatherCache(ttl=10, max_stale=100), _Upstream()
+
+    async def main():
+        await cache.get_or_fetch(10.0, 20.0, upstream.fetch)
+        _age(cache, 50)
+        stale = await cache.get_or_fetch(10.0, 20.0, upstream.fetch)
+        await asyncio.sleep(0)                            # let the refresh run
+        await asyncio.sleep(0)
+        fresh = await cache.get_or_fetch(10.0, 20.0, upstream.fetch)
+        return stale, fresh
+
+    stale, fresh = asyncio.run(main())
+    assert stale["temperature"] == 1
+    assert fresh["temperature"] == 2
+    assert cache.counters["stale_hits"] == 1 and cache.counters["refreshes"] == 1
+
+
+def test_expired_entry_is_fetched_again():
+    cache, upstream = WeatherCache(ttl=10, max_stale=10), _Upstream()
+
+    async def main():
+        await cache.get_or_fetch(10.0, 20.0, upstream.fetch)
+        _age(cache, 100)
+        return await cache.get_or_fetch(10.0, 20.0, upstream.fetch)
+
+    assert asyncio.run(main())["temperature"] == 2
+    assert cache.counters["misses"] == 2
+
+
+def test_errors_are_not_cached():
+    cache, upstream = WeatherCache(), _Upstream(error=True)
+
+    async def main():
+        for _ in range(2):
+            await cache.get_or_fetch(10.0, 20.0, upstream.fetch)
+
+    asyncio.run(main())
+    assert len(upstream.calls) == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_get_or_fetch_many_batches_distinct_missing_cells():
+    cache, upstream = WeatherCache(grid_deg=0.1, ttl=60), _Upstream()
+    batches = []
+
+    async def fetch_many(coords):
+        batches.append(list(coords))
+        return await upstream.fetch_many(coords)
+
+    async def main():
+        await cache.get_or_fetch(51.5, -0.12, upstream.fetch)      # London already cached
+        return await cache.get_or_fetch_many(
+            [(40.71, -74.0), (51.5, -0.12), (40.72, -74.01), (35.68, 139.69)], fetch_many)
+
+    results = asyncio.run(main())
+    assert batches == [[(40.7, -74.0), (35.7, 139.7)]]             # one call, two cells
+    assert results[0] is results[2]
+    assert results[1]["latitude"] == 51.5
+    assert results[3]["latitude"] == 35.7
+
+
+def test_lru_bound():
+    cache, upstream = WeatherCache(ttl=60, max_entries=2), _Upstream()
+
+    async def main():
+        for lat in (1.0, 2.0, 3.0):
+            await cache.get_or_fetch(lat, 0.0, upstream.fetch)
+
+    asyncio.run(main())
+    assert cache.stats()["size"] == 2
+    assert cache.cell(1.0, 0.0) not in cache._entries
+
+
+def test_normalize_name():
+    assert normalize_name("  São  Paulo ") == "sao paulo"
+    assert normalize_name("Paris,France") == "paris, france"
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Tool caches for the MCP server
+═══════════════════════════════════════════════════════════════════════
+Caches that let the server answer common tool calls without leaving the
+box.
+
+1. GeocodeCache — persistent SQLite cache of geocoding results.  City
+   coordinates never change, so entries have no TTL; the table is kept
+   to a maximum size by evicting the least-recently-used rows.
+2. WeatherCache — in-memory TTL cache of current weather keyed on a
+   lat/lon grid cell, so nearby lookups share one upstream call.  Stale
+   entries are returned immediately while a background task refreshes
+   them (stale-while-revalidate).
+3. QueryCache — in-memory LRU for search_offices: normalised query →
+   query embedding and query → result, so the same handful of agent
+   queries skip the model and the search.
+
+Every cache keeps hit/miss counters and reports them via .stats().
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+GEOCODE_CACHE_PATH = Path(os.getenv(
+    "GEOCODE_CACHE_PATH", Path(__file__).parent / "geocode_cache.db"))
+GEOCODE_CACHE_MAX  = int(os.getenv("GEOCODE_CACHE_MAX", "10000"))
+GEOCODE_TOUCH_SECS = 3600.0        # last_used is refreshed at most this often
+
+WEATHER_GRID_DEG   = float(os.getenv("WEATHER_GRID_DEG", "0.1"))   # ≈ 11 km cells
+WEATHER_TTL        = float(os.getenv("WEATHER_TTL", "600"))        # fresh for 10 min
+WEATHER_MAX_STALE  = float(os.getenv("WEATHER_MAX_STALE", "3600")) # then serve stale ≤ 1 h
+WEATHER_CACHE_MAX  = int(os.getenv("WEATHER_CACHE_MAX", "1024"))
+
+SEARCH_CACHE_MAX   = int(os.getenv("SEARCH_CACHE_MAX", "1024"))     # queries remembered
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Key normalisation                                            ║
+# ╚══════════════════════════════════════════════════════════════════╝
+_SPACE_RE = re.compile(r"\s+")
+
+def normalize_name(name: str) -> str:
+    """
+    Canonical cache key for a place name.
+
+    "  São  Paulo " → "sao paulo",  "Paris,France" → "paris, france"
+    """
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold().replace(",", ", ")
+    return _SPACE_RE.sub(" ", text).strip(" .,")
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical key for a search query — only changes MiniLM (an uncased,
+    accent-stripping model) cannot see, so the embedding is unaffected.
+
+    "  Chicago   OFFICE " → "chicago office"
+    """
+    text = unicodedata.normalize("NFKD", query)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _SPACE_RE.sub(" ", text.casefold()).strip()
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Persistent geocode cache                                     ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class GeocodeCache:
+    """
+    SQLite-backed name → {"latitude", "longitude", "name"} cache.
+
+    Reads are a few microseconds and guarded by a lock, so the cache
+    can be used directly from async tool functions: a hit writes only
+    when its LRU timestamp is older than GEOCODE_TOUCH_SECS, and commits
+    run with synchronous=NORMAL (no fsync per commit under WAL).
+    """
+
+    def __init__(self, path: Path = GEOCODE_CACHE_PATH,
+                 max_entries: int = GEOCODE_CACHE_MAX):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        # WAL lets several server workers read while one of them writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")     # durable enough for a cache
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " key TEXT PRIMARY KEY,"
+            " latitude REAL NOT NULL,"
+            " longitude REAL NOT NULL,"
+            " name TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS geocode_last_used ON geocode(last_used)")
+        self._db.commit()
+
+    def __contains__(self, name: str) -> bool:
+        """Membership test that does not touch the hit/miss counters."""
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM geocode WHERE key = ?",
+                                   (normalize_name(name),)).fetchone()
+        return row is not None
+
+    def get(self, name: str) -> Optional[dict]:
+        """Return the cached result for `name`, or None on a miss."""
+        key = normalize_name(name)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT latitude, longitude, name, last_used FROM geocode WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            if now - row[3] > GEOCODE_TOUCH_SECS:      # coarse LRU: hourly is plenty
+                self._db.execute("UPDATE geocode SET last_used = ? WHERE key = ?",
+                                 (now, key))
+                self._db.commit()
+        return {"latitude": row[0], "longitude": row[1], "name": row[2]}
+
+    def put(self, name: str, result: dict) -> None:
+        """Store a successful geocode result, evicting LRU rows if full."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)",
+                (normalize_name(name), result["latitude"], result["longitude"],
+                 result.get("name", name), time.time()))
+            self._db.execute(
+                "DELETE FROM geocode WHERE key IN ("
+                " SELECT key FROM geocode ORDER BY last_used DESC"
+                " LIMIT -1 OFFSET ?)", (self.max_entries,))
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Hit/miss counters plus current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": len(self),
+            "max_entries": self.max_entries,
+        }
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 4.  Grid-cell weather cache with stale-while-revalidate          ║
+# ╚══════════════════════════════════════════════════════════════════╝
+WeatherFetch     = Callable[[float, float], Awaitable[dict]]
+WeatherFetchMany = Callable[[list[tuple[float, float]]], Awaitable[list[dict]]]
+
+class WeatherCache:
+    """
+    lat/lon → current-weather dict, shared by every point in a grid cell.
+
+    Lookups are resolved against the cell centre, so two requests a few
+    hundred metres apart (e.g. the office vs. the city centre) hit the
+    same entry.  Ages are classified as:
+
+    * fresh  (age ≤ ttl)              → returned as-is
+    * stale  (ttl < age ≤ ttl+stale)  → returned at once, refreshed in
+                                        the background
+    * expired / missing               → fetched before returning
+
+    Results containing "error" are never cached.
+    """
+
+    def __init__(self, grid_deg: float = WEATHER_GRID_DEG,
+                 ttl: float = WEATHER_TTL,
+                 max_stale: float = WEATHER_MAX_STALE,
+                 max_entries: int = WEATHER_CACHE_MAX):
+        self.grid_deg = grid_deg
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, int], tuple[float, dict]] = OrderedDict()
+        self._refreshing: dict[tuple[int, int], asyncio.Task] = {}
+        self.counters = {"fresh_hits": 0, "stale_hits": 0, "misses": 0,
+                         "refreshes": 0, "refresh_errors": 0}
+
+    def cell(self, lat: float, lon: float) -> tuple[int, int]:
+        """Grid cell index containing (lat, lon)."""
+        return (round(lat / self.grid_deg), round(lon / self.grid_deg))
+
+    def cell_center(self, cell: tuple[int, int]) -> tuple[float, float]:
+        return (round(cell[0] * self.grid_deg, 4), round(cell[1] * self.grid_deg, 4))
+
+    def _store(self, cell: tuple[int, int], result: dict) -> None:
+        if "error" in result:
+            return
+        self._entries[cell] = (time.monotonic(), result)
+        self._entries.move_to_end(cell)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _refresh(self, cell: tuple[int, int], fetch: WeatherFetch) -> None:
+        """Background revalidation; a failure keeps the stale entry."""
+        self.counters["refreshes"] += 1
+        try:
+            result = await fetch(*self.cell_center(cell))
+            if "error" in result:
+                self.counters["refresh_errors"] += 1
+            self._store(cell, result)
+        except Exception:
+            self.counters["refresh_errors"] += 1
+        finally:
+            self._refreshing.pop(cell, None)
+
+    def _lookup(self, cell: tuple[int, int], fetch: WeatherFetch) -> Optional[dict]:
+        """Fresh or stale cached result for `cell` (scheduling a refresh if stale)."""
+        entry = self._entries.get(cell)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        age = time.monotonic() - stored_at
+        if age <= self.ttl:
+            self.counters["fresh_hits"] += 1
+            self._entries.move_to_end(cell)
+            return result
+        if age <= self.ttl + self.max_stale:
+            self.counters["stale_hits"] += 1
+            if cell not in self._refreshing:
+                self._refreshing[cell] = asyncio.create_task(
+                    self._refresh(cell, fetch))
+            return result
+        return None
+
+    async def get_or_fetch(self, lat: float, lon: float, fetch: WeatherFetch) -> dict:
+        """Return weather for the cell containing (lat, lon), using `fetch` on a miss."""
+        cell = self.cell(lat, lon)
+        result = self._lookup(cell, fetch)
+        if result is not None:
+            return result
+
+        self.counters["misses"] += 1
+        result = await fetch(*self.cell_center(cell))
+        self._store(cell, result)
+        return result
+
+    async def get_or_fetch_many(self, coords: list[tuple[float, float]],
+                                fetch_many: WeatherFetchMany) -> list[dict]:
+        """
+        Batch form of get_or_fetch: results aligned with `coords`.
+
+        Every distinct cell that is not cached is fetched with ONE call
+        to `fetch_many`, which receives cell centres and must return
+        results in the same order.
+        """
+        async def fetch_one(lat: float, lon: float) -> dict:
+            return (await fetch_many([(lat, lon)]))[0]
+
+        cells = [self.cell(lat, lon) for lat, lon in coords]
+        found: dict[tuple[int, int], dict] = {}
+        for cell in dict.fromkeys(cells):
+            result = self._lookup(cell, fetch_one)
+            if result is not None:
+                found[cell] = result
+
+        missing = [cell for cell in dict.fromkeys(cells) if cell not in found]
+        if missing:
+            self.counters["misses"] += len(missing)
+            fetched = await fetch_many([self.cell_center(c) for c in missing])
+            for cell, result in zip(missing, fetched):
+                self._store(cell, result)
+                found[cell] = result
+        return [found[cell] for cell in cells]
+
+    def stats(self) -> dict:
+        """Hit/miss/refresh counters plus current size and settings."""
+        c = self.counters
+        lookups = c["fresh_hits"] + c["stale_hits"] + c["misses"]
+        hits = c["fresh_hits"] + c["stale_hits"]
+        return {
+            **c,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._entries),
+            "grid_deg": self.grid_deg,
+            "ttl": self.ttl,
+        }
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 5.  Office-search query cache                                    ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class QueryCache:
+    """
+    Two bounded LRUs keyed on normalize_query():
+
+    * embeddings — query → vector; valid as long as the model is
+    * results    — query → result; valid as long as the index is
+
+    Both live for the whole server process.  The server opens its office
+    index once and never reloads it, so a rebuilt index (index_pdf.py)
+    is only picked up by a restart, which also starts an empty cache.
+
+    Thread-safe: search_offices may run in worker threads.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX):
+        self.max_entries = max_entries
+        self._embeddings: OrderedDict[str, object] = OrderedDict()
+        self._results: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"embedding_hits": 0, "embedding_misses": 0,
+                         "result_hits": 0, "result_misses": 0}
+
+    def _get(self, table: OrderedDict, key, counter: str):
+        with self._lock:
+            if key in table:
+                table.move_to_end(key)
+                self.counters[f"{counter}_hits"] += 1
+                return table[key]
+            self.counters[f"{counter}_misses"] += 1
+            return None
+
+    def _put(self, table: OrderedDict, key, value) -> None:
+        with self._lock:
+            table[key] = value
+            table.move_to_end(key)
+            while len(table) > self.max_entries:
+                table.popitem(last=False)
+
+    def get_embedding(self, query: str):
+        return self._get(self._embeddings, query, "embedding")
+
+    def put_embedding(self, query: str, vector) -> None:
+        self._put(self._embeddings, query, vector)
+
+    def get_result(self, query: str):
+        return self._get(self._results, query, "result")
+
+    def put_result(self, query: str, result) -> None:
+        self._put(self._results, query, result)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and hit ratios for both tables, plus sizes."""
+        c = self.counters
+        out = dict(c)
+        for name in ("embedding", "result"):
+            lookups = c[f"{name}_hits"] + c[f"{name}_misses"]
+            out[f"{name}_hit_ratio"] = round(c[f"{name}_hits"] / lookups, 3) if lookups else 0.0
+        out.update(embeddings=len(self._embeddings), results=len(self._results),
+                   max_entries=self.max_entries)
+        return out
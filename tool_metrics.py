@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Per-tool metrics for the MCP server
+═══════════════════════════════════════════════════════════════════════
+ToolMetricsMiddleware wraps every tool call (no per-tool decorator
+needed) and records, per tool:
+
+* calls and errors (exceptions or {"error": ...} results)
+* a latency histogram
+* request / response payload sizes (JSON bytes)
+* upstream requests and retries made on the call's behalf — openmeteo
+  reports them through note(), attributed via a context variable
+
+Extra gauges (cache hit ratios, breaker state, …) come from collectors:
+functions returning nested dicts of numbers, registered with
+add_collector().
+
+Everything is available as a dict (snapshot(), for the `metrics` tool)
+or in Prometheus text format (render_prometheus(), for GET /metrics).
+Metrics are per process: with --workers N each scrape sees one worker.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import contextvars
+import json
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Callable, Optional
+
+# ── 3rd-party ───────────────────────────────────────────────────────
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Histogram                                                    ║
+# ╚══════════════════════════════════════════════════════════════════╝
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)                   # seconds
+SIZE_BUCKETS    = (64, 256, 1024, 4096, 16384, 65536, 262144)        # bytes
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: bucket i counts ≤ bounds[i])."""
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)        # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lo = self.bounds[i - 1] if i else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lo + (hi - lo) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(le, cumulative count) pairs for Prometheus, ending with +Inf."""
+        out, total = [], 0
+        for bound, n in zip((*self.bounds, "+Inf"), self.counts):
+            total += n
+            out.append((str(bound), total))
+        return out
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Per-call attribution of upstream work                        ║
+# ╚══════════════════════════════════════════════════════════════════╝
+_current: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "tool_metrics_current", default=None)
+
+def note(key: str, n: int = 1) -> None:
+    """Count `key` (e.g. "upstream_retries") against the tool call in progress."""
+    current = _current.get()
+    if current is not None:
+        current[key] = current.get(key, 0) + n
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 3.  Registry                                                     ║
+# ╚══════════════════════════════════════════════════════════════════╝
+class _ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.noted: dict[str, int] = defaultdict(int)
+
+class ToolMetrics:
+    """Per-tool statistics plus named collectors of extra gauges."""
+
+    def __init__(self):
+        self.tools: dict[str, _ToolStats] = defaultdict(_ToolStats)
+        self.collectors: dict[str, Callable[[], dict]] = {}
+        self.started = time.time()
+
+    def add_collector(self, name: str, fn: Callable[[], dict]) -> None:
+        self.collectors[name] = fn
+
+    def record(self, tool: str, seconds: float, ok: bool,
+               request_bytes: int, response_bytes: int, noted: dict) -> None:
+        stats = self.tools[tool]
+        stats.calls += 1
+        stats.errors += not ok
+        stats.latency.observe(seconds)
+        stats.request_bytes.observe(request_bytes)
+        stats.response_bytes.observe(response_bytes)
+        for key, n in noted.items():
+            stats.noted[key] += n
+
+    def snapshot(self) -> dict:
+        """Summary for the `metrics` tool: percentiles in ms, mean sizes."""
+        ms = lambda s: round(s * 1000, 2)
+        tools = {}
+        for name, s in sorted(self.tools.items()):
+            tools[name] = {
+                "calls": s.calls,
+                "errors": s.errors,
+                "latency_ms": {
+                    "mean": ms(s.latency.sum / s.calls) if s.calls else 0.0,
+                    "p50": ms(s.latency.quantile(0.50)),
+                    "p95": ms(s.latency.quantile(0.95)),
+                    "p99": ms(s.latency.quantile(0.99)),
+                },
+                "total_seconds": round(s.latency.sum, 3),
+                "mean_request_bytes": round(s.request_bytes.sum / s.calls) if s.calls else 0,
+                "mean_response_bytes": round(s.response_bytes.sum / s.calls) if s.calls else 0,
+                **dict(s.noted),
+            }
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "tools": tools,
+            **{name: fn() for name, fn in self.collectors.items()},
+        }
+
+    # ─── Prometheus text exposition ────────────────────────────────
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("mcp_tool_calls_total", "counter", "Tool calls by outcome.")
+        for tool, s in sorted(self.tools.items()):
+            lines.append(f'mcp_tool_calls_total{{tool="{tool}",outcome="ok"}} {s.calls - s.errors}')
+            lines.append(f'mcp_tool_calls_total{{tool="{tool}",outcome="error"}} {s.errors}')
+
+        for metric, attr, help_text in (
+            ("mcp_tool_latency_seconds", "latency", "Tool call latency."),
+            ("mcp_tool_request_bytes", "request_bytes", "JSON size of tool arguments."),
+            ("mcp_tool_response_bytes", "response_bytes", "Size of tool results."),
+        ):
+            family(metric, "histogram", help_text)
+            for tool, s in sorted(self.tools.items()):
+                hist: Histogram = getattr(s, attr)
+                for le, n in hist.cumulative():
+                    lines.append(f'{metric}_bucket{{tool="{tool}",le="{le}"}} {n}')
+                lines.append(f'{metric}_sum{{tool="{tool}"}} {hist.sum}')
+                lines.append(f'{metric}_count{{tool="{tool}"}} {hist.count}')
+
+        noted_keys = sorted({k for s in self.tools.values() for k in s.noted})
+        for key in noted_keys:
+            family(f"mcp_tool_{key}_total", "counter", f"{key.replace('_', ' ')} per tool.")
+            for tool, s in sorted(self.tools.items()):
+                lines.append(f'mcp_tool_{key}_total{{tool="{tool}"}} {s.noted.get(key, 0)}')
+
+        for name, fn in self.collectors.items():
+            for path, value in _flatten(fn(), f"mcp_{name}"):
+                lines.append(f"# TYPE {path} gauge")
+                lines.append(f"{path} {value}")
+        return "\n".join(lines) + "\n"
+
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+def _flatten(data: Any, prefix: str):
+    """Yield (metric_name, number) for every numeric leaf of nested dicts."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _flatten(value, f"{prefix}_{_NAME_RE.sub('_', str(key))}")
+    elif isinstance(data, bool):
+        yield prefix, int(data)
+    elif isinstance(data, (int, float)):
+        yield prefix, data
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 4.  Middleware                                                   ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def _payload_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+class ToolMetricsMiddleware(Middleware):
+    """Record every tools/call into a ToolMetrics registry."""
+
+    def __init__(self, registry: ToolMetrics):
+        self.registry = registry
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        params = context.message
+        noted: dict[str, int] = {}
+        token = _current.set(noted)
+        start = time.perf_counter()
+        ok, response_bytes = False, 0
+        try:
+            result = await call_next(context)
+            structured = result.structured_content
+            ok = not (isinstance(structured, dict) and "error" in structured)
+            response_bytes = sum(len(getattr(block, "text", "") or "")
+                                 for block in result.content)
+            return result
+        finally:
+            _current.reset(token)
+            self.registry.record(
+                params.name, time.perf_counter() - start, ok,
+                _payload_size(params.arguments or {}), response_bytes, noted)
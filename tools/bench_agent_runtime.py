@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+bench_agent_runtime.py
+────────────────────────────────────────────────────────────────────
+Measure the **per-query MCP overhead** of the deployable agent, with
+and without the warm session pool from `mcp_runtime.py`.
+
+Each simulated "query" does what the agent does before and around the
+LLM: connect to the MCP server and call one cheap tool
+(`convert_c_to_f`).  No LLM is involved, so the numbers isolate the
+transport / server start-up cost.
+
+Modes
+-----
+* **cold**   – `async with Client(MCP_SERVER)` per query, i.e. a new
+  `mcp_stdio_wrapper.py` subprocess each time (the old behaviour).
+* **pooled** – `AgentRuntime.run()` leasing a warm session.
+
+Usage
+-----
+    python tools/bench_agent_runtime.py              # 5 queries each
+    python tools/bench_agent_runtime.py -n 20 -c 4   # 20 queries, 4 at a time
+"""
+
+# ───────────────────── standard-library imports ────────────────────
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Allow `python tools/bench_agent_runtime.py` to import top-level modules
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# ───────────────────── 3rd-party / project imports ─────────────────
+from fastmcp import Client
+from mcp_runtime import MCP_STDIO_PATH, AgentRuntime, resolve_target
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  One simulated query per mode                                 ║
+# ╚════════════════════════════════════════════════════════════════╝
+async def _query(mcp) -> None:
+    await mcp.call_tool("convert_c_to_f", {"c": 21.0})
+
+def cold_query() -> float:
+    """Start a fresh server subprocess, call one tool, shut it down."""
+    async def _run() -> None:
+        async with Client(resolve_target("stdio")) as mcp:
+            await _query(mcp)
+    start = time.perf_counter()
+    asyncio.run(_run())
+    return time.perf_counter() - start
+
+def make_pooled_query(runtime: AgentRuntime):
+    """Return a callable that runs one query on a leased warm session."""
+    async def _run(pool) -> None:
+        async with pool.lease() as mcp:
+            await _query(mcp)
+    def pooled_query() -> float:
+        start = time.perf_counter()
+        runtime.run(_run)
+        return time.perf_counter() - start
+    return pooled_query
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Driver + report                                              ║
+# ╚════════════════════════════════════════════════════════════════╝
+def bench(label: str, fn, n: int, concurrency: int) -> None:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        times = list(ex.map(lambda _: fn(), range(n)))
+    wall = time.perf_counter() - start
+    times.sort()
+    print(
+        f"{label:<8} n={n:<4} mean={statistics.mean(times)*1000:9.1f} ms  "
+        f"p50={times[len(times)//2]*1000:9.1f} ms  "
+        f"max={times[-1]*1000:9.1f} ms  "
+        f"throughput={n/wall:6.2f} q/s"
+    )
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, default=5, help="queries per mode")
+    ap.add_argument("-c", "--concurrency", type=int, default=1)
+    ap.add_argument("--pool-size", type=int, default=2)
+    args = ap.parse_args()
+
+    print(f"MCP server: {MCP_STDIO_PATH}\n")
+    bench("cold", cold_query, args.n, args.concurrency)
+
+    runtime = AgentRuntime(resolve_target("stdio"), size=args.pool_size)
+    warm_start = time.perf_counter()
+    runtime.run(lambda pool: asyncio.sleep(0))         # spawn the pool once
+    print(f"(pool of {args.pool_size} started in "
+          f"{(time.perf_counter() - warm_start)*1000:.0f} ms — paid once)")
+    bench("pooled", make_pooled_query(runtime), args.n, args.concurrency)
+    runtime.shutdown()
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Script entry-point                                           ║
+# ╚════════════════════════════════════════════════════════════════╝
+if __name__ == "__main__":
+    main()
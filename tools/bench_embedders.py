@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+bench_embedders.py
+────────────────────────────────────────────────────────────────────
+Compare the **embedding backends** of `embedders.py` on this machine:
+
+* **load**     – seconds from nothing imported to the first vector
+  (each backend runs in a fresh child process, so imports count)
+* **query/s**  – one sentence per call, the `search_offices` path
+* **batch/s**  – `--sentences` sentences in one call, the indexing path
+* **parity**   – cosine similarity of every vector with the fp32 `onnx`
+  reference (min / mean); a backend below `--min-cosine` fails the run
+
+Sentences are office descriptions and questions built from
+`data/offices.csv` and `data/world_cities.csv`, so their lengths look
+like what the server really embeds.
+
+Usage
+-----
+    python tools/bench_embedders.py
+    python tools/bench_embedders.py --backends onnx onnx-int8 --threads 1 2 4
+    python tools/bench_embedders.py --sentences 2000 --min-cosine 0.98
+"""
+
+# ───────────────────── standard-library imports ────────────────────
+import argparse
+import csv
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Allow `python tools/bench_embedders.py` to import top-level modules
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# ───────────────────── 3rd-party / project imports ─────────────────
+import numpy as np
+
+from embedders import BACKENDS, DEFAULT_THREADS, get_embedder
+
+REFERENCE = "onnx"
+QUERY_CALLS = 200
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Sentences                                                    ║
+# ╚════════════════════════════════════════════════════════════════╝
+def sentences(n: int) -> list[str]:
+    with open(ROOT_DIR / "data" / "offices.csv", newline="") as fh:
+        offices = list(csv.DictReader(fh))
+    with open(ROOT_DIR / "data" / "world_cities.csv", newline="") as fh:
+        cities = list(csv.DictReader(fh))
+    out = [f"{o['city']} office with {o['employees']} employees and "
+           f"${o['revenue_million']}M revenue, opened in {o['opened_year']}"
+           for o in offices]
+    templates = ["Which office is closest to {name}?",
+                 "{name}, {country} regional office",
+                 "What is the weather like at our {name} site today?",
+                 "Office in {name} ({admin1}, {country}) serving {population} people"]
+    i = 0
+    while len(out) < n:
+        city = cities[i % len(cities)]
+        out.append(templates[i % len(templates)].format(**city))
+        i += 1
+    return out[:n]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  One backend, in a child process                              ║
+# ╚════════════════════════════════════════════════════════════════╝
+def measure(backend: str, threads: int, n: int, out: Path) -> dict:
+    """Runs in the child: load, time queries and a batch, save vectors."""
+    start = time.perf_counter()
+    embed = get_embedder(backend, threads)
+    embed(["warm-up"])
+    load = time.perf_counter() - start
+
+    texts = sentences(n)
+    start = time.perf_counter()
+    for i in range(QUERY_CALLS):
+        embed([texts[i % len(texts)]])
+    query_rate = QUERY_CALLS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    vectors = np.asarray(embed(texts), dtype=np.float32)
+    batch_rate = len(texts) / (time.perf_counter() - start)
+    np.save(out, vectors)
+    return {"load": load, "query": query_rate, "batch": batch_rate}
+
+def run_child(backend: str, threads: int, n: int, out: Path) -> dict:
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", backend, str(threads), str(n), str(out)],
+        capture_output=True, text=True)
+    if proc.returncode:
+        tail = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+        return {"error": tail}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Script entry-point                                           ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main() -> None:
+    if len(sys.argv) == 6 and sys.argv[1] == "--child":
+        backend, threads, n, out = sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), sys.argv[5]
+        print(json.dumps(measure(backend, threads, n, Path(out))))
+        return
+
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backends", nargs="+", choices=BACKENDS,
+                    default=["chroma", "onnx", "onnx-int8"])
+    ap.add_argument("--threads", type=int, nargs="+", default=[DEFAULT_THREADS])
+    ap.add_argument("--sentences", type=int, default=1000)
+    ap.add_argument("--min-cosine", type=float, default=0.99,
+                    help="fail if any vector is less similar to fp32 than this")
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_embedders_"))
+    try:
+        ref_path = tmp / "reference.npy"
+        ref = run_child(REFERENCE, max(args.threads), args.sentences, ref_path)
+        if "error" in ref:
+            sys.exit(f"fp32 reference ({REFERENCE}) failed: {ref['error']}")
+        reference = np.load(ref_path)
+
+        print(f"{'backend':<22} {'threads':>7} {'load s':>7} {'query/s':>9} "
+              f"{'batch/s':>9} {'min cos':>8} {'mean cos':>9}")
+        failed = False
+        for backend in args.backends:
+            for threads in args.threads:
+                path = tmp / f"{backend}-{threads}.npy"
+                res = run_child(backend, threads, args.sentences, path)
+                if "error" in res:
+                    print(f"{backend:<22} {threads:>7}  skipped ({res['error']})")
+                    continue
+                cos = (np.load(path) * reference).sum(1)    # both unit length
+                failed |= bool(cos.min() < args.min_cosine)
+                print(f"{backend:<22} {threads:>7} {res['load']:>7.2f} {res['query']:>9.0f} "
+                      f"{res['batch']:>9.0f} {cos.min():>8.4f} {cos.mean():>9.4f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    if failed:
+        sys.exit(f"parity check failed: some vectors below cosine {args.min_cosine}")
+
+if __name__ == "__main__":
+    main()
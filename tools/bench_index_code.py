@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+bench_index_code.py
+────────────────────────────────────────────────────────────────────
+Benchmark `index_code.py` on a **synthetic repository** (100k files by
+default) — the scale where the per-file tokenizer and one-chunk-at-a-time
+writes of the original indexer hurt.
+
+The tree gets a `.gitignore` (`build/`, `*_generated.py`) plus a
+`node_modules/` folder, so listing also shows ignored files being
+dropped.  Unless `--no-git` is given it is `git init`-ed (nothing is
+committed; `git ls-files --others` still applies the ignore rules).
+
+Phases
+------
+* **list**   – `list_sources()` (git or walk + .gitignore)
+* **legacy** – the original chunker (tokenizer built per file, one
+  `encode` per line) on a `--legacy-sample` of files, extrapolated
+* **chunk**  – `index_python_sources(dry_run=True)` for each `--chunker`
+  and `--workers` value: read + hash + chunk everything, write nothing
+  (the chunk count is the number of vectors a real run would store)
+* **embed**  – with `--embed`: a real index run into a temp Chroma DB,
+  a no-op re-run (mtime skip), and a re-run after editing 0.1 % of files.
+  Embedding 100k files takes a while — combine with `--files 5000`.
+
+Usage
+-----
+    python tools/bench_index_code.py
+    python tools/bench_index_code.py --files 5000 --workers 1 4 --embed
+    python tools/bench_index_code.py --chunker ast --workers 8
+"""
+
+# ───────────────────── standard-library imports ────────────────────
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Allow `python tools/bench_index_code.py` to import the indexer
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# ───────────────────── 3rd-party / project imports ─────────────────
+from tiktoken import encoding_for_model
+
+import index_code
+
+FILES_PER_DIR = 500
+WORDS = ["office", "weather", "city", "vector", "chunk", "token", "cache",
+         "client", "server", "index", "query", "agent", "forecast", "report"]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Synthetic repository                                         ║
+# ╚════════════════════════════════════════════════════════════════╝
+def synth_module(rng: random.Random, i: int) -> str:
+    """A plausible ~60-line module: imports, functions, maybe a class."""
+    out = [f'"""Synthetic module {i}: {rng.choice(WORDS)} helpers."""',
+           "import os", "from typing import List", ""]
+    for f in range(rng.randint(3, 7)):
+        a, b = rng.sample(WORDS, 2)
+        out += [
+            f"def {a}_{b}_{i}_{f}(items: List[int], scale: int = {rng.randint(1, 9)}) -> int:",
+            f'    """Combine {a} values into a {b} score."""',
+            "    total = 0",
+            "    for item in items:",
+            f"        if item % {rng.randint(2, 7)} == 0:",
+            "            total += item * scale",
+            "        else:",
+            f"            total -= {rng.randint(1, 100)}",
+            f"    return total  # {rng.choice(WORDS)}",
+            "",
+        ]
+    if rng.random() < 0.5:
+        name = rng.choice(WORDS).title()
+        out += [f"class {name}{i}:", f'    """Holds {name.lower()} state."""', "",
+                "    def __init__(self, path: str):", "        self.path = path",
+                "        self.items: List[str] = []", "",
+                "    def load(self) -> int:",
+                "        with open(self.path) as fh:",
+                "            self.items = fh.read().splitlines()",
+                "        return len(self.items)", ""]
+    return "\n".join(out) + "\n"
+
+def build_tree(root: Path, files: int, seed: int, git: bool) -> None:
+    rng = random.Random(seed)
+    (root / ".gitignore").write_text("build/\n*_generated.py\n")
+    for i in range(files):
+        d = root / f"pkg_{i // FILES_PER_DIR:04d}"
+        if i % FILES_PER_DIR == 0:
+            d.mkdir(parents=True, exist_ok=True)
+        (d / f"mod_{i}.py").write_text(synth_module(rng, i))
+    # Noise that must not be indexed
+    for sub in ("build", "node_modules/pkg"):
+        (root / sub).mkdir(parents=True, exist_ok=True)
+        for i in range(max(1, files // 100)):
+            (root / sub / f"junk_{i}.py").write_text(synth_module(rng, i))
+    for i in range(max(1, files // 100)):
+        (root / "pkg_0000" / f"schema_{i}_generated.py").write_text(synth_module(rng, i))
+    if git:
+        subprocess.run(["git", "init", "-q", str(root)], check=True)
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Phases                                                       ║
+# ╚════════════════════════════════════════════════════════════════╝
+def legacy_chunk(code: str, max_tokens: int = 500) -> int:
+    """The original chunk_python_code loop; returns the chunk count."""
+    enc = encoding_for_model("gpt-3.5-turbo")            # per file, as before
+    chunks, current, count = 0, 0, 0
+    for line in code.splitlines():
+        n = len(enc.encode(line + "\n"))
+        if current and count + n > max_tokens:
+            chunks, current, count = chunks + 1, 0, 0
+        if not line.strip() and current:
+            chunks, current, count = chunks + 1, 0, 0
+            continue
+        current, count = current + 1, count + n
+    return chunks + (1 if current else 0)
+
+def run_quietly(**kwargs) -> dict:
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        return index_code.index_python_sources(**kwargs)
+
+def row(label: str, files: int, seconds: float, extra: str = "") -> None:
+    print(f"{label:<26} {files:>8} {seconds:>9.2f} {files / max(seconds, 1e-9):>10.0f}  {extra}")
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Script entry-point                                           ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--files", type=int, default=100_000)
+    ap.add_argument("--workers", type=int, nargs="+",
+                    default=sorted({1, os.cpu_count() or 1}))
+    ap.add_argument("--legacy-sample", type=int, default=1000,
+                    help="files timed with the original chunker (0 = skip)")
+    ap.add_argument("--chunker", nargs="+", choices=index_code.CHUNKERS,
+                    default=list(index_code.CHUNKERS))
+    ap.add_argument("--embed", action="store_true",
+                    help="also run real, incremental index runs")
+    ap.add_argument("--dir", type=Path, help="reuse / keep the tree here")
+    ap.add_argument("--no-git", action="store_true", help="don't git init the tree")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_index_code_"))
+    root = args.dir or tmp / "repo"
+    try:
+        if not (root / ".gitignore").exists():
+            start = time.perf_counter()
+            root.mkdir(parents=True, exist_ok=True)
+            build_tree(root, args.files, args.seed, git=not args.no_git)
+            print(f"Built {args.files} files in {root} ({time.perf_counter() - start:.1f}s)\n")
+
+        print(f"{'phase':<26} {'files':>8} {'seconds':>9} {'files/s':>10}")
+        start = time.perf_counter()
+        sources = index_code.list_sources(root)
+        row("list", len(sources), time.perf_counter() - start,
+            "(git ls-files)" if (root / ".git").exists() else "(walk + .gitignore)")
+
+        if args.legacy_sample:
+            sample = sources[:args.legacy_sample]
+            start = time.perf_counter()
+            for path in sample:
+                legacy_chunk(path.read_text(encoding="utf-8", errors="ignore"))
+            row("legacy chunk (sample)", len(sample), time.perf_counter() - start)
+
+        for chunker in args.chunker:
+            for workers in args.workers:
+                stats = run_quietly(root=root, db_path=tmp / "unused", workers=workers,
+                                    dry_run=True, full=True, chunker=chunker)
+                row(f"chunk {chunker}, {workers}w", stats["files"], stats["seconds"],
+                    f"{stats['chunks']} chunks")
+
+        if args.embed:
+            db = tmp / "chroma_db"
+            workers, chunker = max(args.workers), args.chunker[-1]
+            stats = run_quietly(root=root, db_path=db, workers=workers, full=True,
+                                chunker=chunker)
+            row(f"index {chunker}", stats["files"], stats["seconds"],
+                f"{stats['embedded']} chunks embedded")
+            stats = run_quietly(root=root, db_path=db, workers=workers, chunker=chunker)
+            row("re-run, nothing changed", stats["files"], stats["seconds"])
+            edited = sources[::1000]
+            for path in edited:
+                with open(path, "a") as fh:
+                    fh.write("\n\ndef added_later():\n    return 42\n")
+            stats = run_quietly(root=root, db_path=db, workers=workers, chunker=chunker)
+            row(f"re-run, {len(edited)} files edited", stats["files"], stats["seconds"],
+                f"{stats['embedded']} chunks embedded")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
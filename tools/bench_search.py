@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+bench_search.py
+────────────────────────────────────────────────────────────────────
+Latency and hit quality of office search on `data/offices.pdf`, for
+the three retrieval strategies `search_offices` can use:
+
+* **vector**  – embed the query, nearest TOP_K lines (the old tool)
+* **bm25**    – `lexical_index.BM25Index` alone
+* **hybrid**  – `lexical_index.hybrid_search`: BM25 fast path for
+  confident exact-token hits, RRF fusion of BM25 + vector otherwise
+
+Queries are generated from the PDF itself — office names, cities and
+phrasings like "Where is the Chicago office?" — plus a hand-written set
+of paraphrases that share no token with their office ("Windy City"),
+where only the vector side can help.  Each query has one right line.
+
+Reported per strategy: hit@1 (right line ranked first), recall@k
+(right line returned at all), lines returned per query (what the agent
+has to read), mean / p95 latency, and for hybrid the share of queries
+answered by the fast path.  Query embeddings are not cached, so vector
+latency is the real model cost.
+
+Usage
+-----
+    python tools/bench_search.py
+    python tools/bench_search.py --repeat 20 --backend onnx
+"""
+
+# ───────────────────── standard-library imports ────────────────────
+import argparse
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Allow `python tools/bench_search.py` to import top-level modules
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# ───────────────────── 3rd-party / project imports ─────────────────
+import chromadb
+import pdfplumber
+
+from embedders import BACKENDS, DEFAULT_BACKEND, get_embedder
+from lexical_index import BM25Index, hybrid_search
+
+OFFICE_PDF = ROOT_DIR / "data" / "offices.pdf"
+LINE_RE    = re.compile(r"[^\S\r\n]*\r?\n[^\S\r\n]*")
+TOP_K      = 3
+
+# (query, office name) pairs with no lexical overlap with the right line
+PARAPHRASES = [
+    ("headquarters", "HQ"),
+    ("Windy City branch", "Midwest Office"),
+    ("Bay Area location", "West Coast Hub"),
+    ("Lone Star State office", "Southern Office"),
+    ("our Japanese team", "Tokyo Office"),
+    ("German site", "Berlin Office"),
+    ("Brazilian branch", "Sao Paulo Office"),
+    ("Dutch team", "Amsterdam Office"),
+    ("Korean branch", "Seoul Office"),
+    ("Emirates location", "Dubai Office"),
+]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Corpus and labelled queries                                  ║
+# ╚════════════════════════════════════════════════════════════════╝
+def office_lines() -> list[str]:
+    lines = []
+    with pdfplumber.open(OFFICE_PDF) as pdf:
+        for page in pdf.pages:
+            for raw in LINE_RE.split(page.extract_text() or ""):
+                if raw.strip():
+                    lines.append(raw.strip())
+    return lines
+
+def labelled_queries(lines: list[str]) -> list[tuple[str, str, int]]:
+    """(query, kind, index of the right line)."""
+    queries, by_name = [], {}
+    for idx, line in enumerate(lines):
+        m = re.match(r"(?P<name>\D+?) \d", line)
+        parts = line.split(", ")
+        if not m or len(parts) < 2:
+            continue                                   # header row
+        name = m["name"]
+        city = re.sub(r" \d.*", "", parts[1])
+        by_name[name] = idx
+        queries += [(name, "name", idx), (city, "city", idx),
+                    (f"office in {city}", "city", idx),
+                    (f"Where is the {city} office?", "city", idx),
+                    (f"How many employees work at {name}?", "name", idx)]
+    queries += [(q, "paraphrase", by_name[name]) for q, name in PARAPHRASES if name in by_name]
+    return queries
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Strategies                                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+def build(lines: list[str], backend: str, db: Path):
+    embed = get_embedder(backend)
+    ids = [f"offices.pdf-{i}" for i in range(len(lines))]
+    coll = chromadb.PersistentClient(path=str(db)).get_or_create_collection("codebase")
+    coll.add(ids=ids, documents=lines, embeddings=embed(lines))
+    return coll, embed, BM25Index(ids, lines)
+
+def strategies(coll, embed, lexical: BM25Index) -> dict:
+    def nearest(query: str, n: int) -> list[str]:
+        res = coll.query(query_embeddings=[embed([query])[0]],
+                         n_results=min(n, len(lexical)), include=[])
+        return res["ids"][0]
+
+    def vector(query):
+        return [lexical.docs[lexical.by_id[c]] for c in nearest(query, TOP_K)], "vector"
+
+    def bm25(query):
+        return [lexical.docs[n] for n, _ in lexical.search(query, TOP_K)], "bm25"
+
+    def hybrid(query):
+        return hybrid_search(query, lexical, nearest, TOP_K)
+
+    return {"vector": vector, "bm25": bm25, "hybrid": hybrid}
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Script entry-point                                           ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    ap.add_argument("--repeat", type=int, default=5, help="timed passes over the queries")
+    args = ap.parse_args()
+
+    lines = office_lines()
+    queries = labelled_queries(lines)
+    tmp = Path(tempfile.mkdtemp(prefix="bench_search_"))
+    try:
+        coll, embed, lexical = build(lines, args.backend, tmp)
+        embed(["warm-up"])
+        print(f"{len(lines)} lines, {len(queries)} queries "
+              f"({sum(k == 'paraphrase' for _, k, _ in queries)} paraphrases), "
+              f"embedder {embed.name}\n")
+        print(f"{'strategy':<8} {'hit@1':>6} {'recall':>7} {'para@1':>7} {'lines':>6} "
+              f"{'mean ms':>8} {'p95 ms':>7} {'fast path':>10}")
+        for name, run in strategies(coll, embed, lexical).items():
+            top1 = recall = para = para_n = returned = fast = 0
+            times = []
+            for _ in range(args.repeat):
+                for query, kind, right in queries:
+                    start = time.perf_counter()
+                    docs, path = run(query)
+                    times.append(time.perf_counter() - start)
+                    if _ == 0:
+                        hit = [lines.index(d) for d in docs]
+                        top1 += bool(hit) and hit[0] == right
+                        recall += right in hit
+                        returned += len(docs)
+                        fast += path == "lexical"
+                        if kind == "paraphrase":
+                            para_n += 1
+                            para += bool(hit) and hit[0] == right
+            n = len(queries)
+            p95 = statistics.quantiles(times, n=20)[-1] * 1000
+            print(f"{name:<8} {top1 / n:>6.0%} {recall / n:>7.0%} {para / max(para_n, 1):>7.0%} "
+                  f"{returned / n:>6.1f} {statistics.mean(times) * 1000:>8.2f} {p95:>7.2f} "
+                  f"{(f'{fast / n:.0%}' if name == 'hybrid' else '-'):>10}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
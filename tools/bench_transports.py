@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+bench_transports.py
+────────────────────────────────────────────────────────────────────
+Microbenchmark **per-tool-call latency** across the three ways the
+agent can reach the MCP server (see `mcp_runtime.resolve_target`):
+
+* **inprocess** – FastMCP instance mounted in this process
+* **stdio**     – `mcp_stdio_wrapper.py` child process
+* **http**      – a separately started `python mcp_server.py`
+
+Connection set-up is excluded: each transport is connected once, warmed
+with a few calls, then timed over `-n` calls of `convert_c_to_f` (a
+tool with no I/O, so only transport overhead is measured).
+
+The http row is skipped if nothing is listening on `MCP_HTTP_URL`.
+
+Usage
+-----
+    python tools/bench_transports.py
+    python tools/bench_transports.py -n 2000 --transports inprocess stdio
+"""
+
+# ───────────────────── standard-library imports ────────────────────
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Allow `python tools/bench_transports.py` to import top-level modules
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# ───────────────────── 3rd-party / project imports ─────────────────
+from fastmcp import Client
+from mcp_runtime import TRANSPORTS, resolve_target
+
+WARMUP_CALLS = 20
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Time N tool calls over one connected transport               ║
+# ╚════════════════════════════════════════════════════════════════╝
+async def bench_transport(transport: str, n: int) -> list[float] | None:
+    try:
+        target = resolve_target(transport)
+        async with Client(target) as mcp:
+            for _ in range(WARMUP_CALLS):
+                await mcp.call_tool("convert_c_to_f", {"c": 21.0})
+            times = []
+            for i in range(n):
+                start = time.perf_counter()
+                await mcp.call_tool("convert_c_to_f", {"c": float(i)})
+                times.append(time.perf_counter() - start)
+            return times
+    except Exception as e:
+        print(f"{transport:<10} skipped ({type(e).__name__}: {e})")
+        return None
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Report                                                       ║
+# ╚════════════════════════════════════════════════════════════════╝
+def report(transport: str, times: list[float]) -> None:
+    times = sorted(times)
+    us = lambda t: t * 1e6
+    print(
+        f"{transport:<10} n={len(times):<5} "
+        f"mean={us(statistics.mean(times)):9.1f} µs  "
+        f"p50={us(times[len(times)//2]):9.1f} µs  "
+        f"p99={us(times[int(len(times)*0.99) - 1]):9.1f} µs"
+    )
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, default=500, help="timed calls per transport")
+    ap.add_argument("--transports", nargs="+", default=list(TRANSPORTS),
+                    choices=TRANSPORTS)
+    args = ap.parse_args()
+
+    for transport in args.transports:
+        times = await bench_transport(transport, args.n)
+        if times:
+            report(transport, times)
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Script entry-point                                           ║
+# ╚════════════════════════════════════════════════════════════════╝
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+fake_openmeteo.py
+────────────────────────────────────────────────────────────────────
+A local **stand-in for the Open-Meteo forecast and geocoding APIs**, so
+the MCP server can be benchmarked without touching the internet.
+
+Endpoints (same query parameters and JSON shapes as the real API)
+-----------------------------------------------------------------
+* `GET /v1/forecast?latitude=..&longitude=..&current_weather=true`
+  – comma-separated lists return a JSON array, like Open-Meteo.
+  Weather is deterministic per coordinate.
+* `GET /v1/search?name=..&count=1` – cities from the bundled gazetteer
+  (data/world_cities.csv); other names get stable made-up coordinates,
+  except names starting with "nowhere", which return no results.
+* `GET /stats` – request / injected-fault counters.
+
+Fault injection
+---------------
+    --latency 80 --jitter 40   mean extra latency and ± jitter (ms)
+    --error-rate 0.05          fraction of requests answered with 503
+    --rate-429 0.1             fraction answered with 429 Too Many Requests
+    --retry-after 1            Retry-After header (s) sent with 429s
+
+Usage
+-----
+    python tools/fake_openmeteo.py --port 8099 --latency 50 --rate-429 0.05
+
+then start the server against it:
+
+    OPENMETEO_FORECAST_URL=http://127.0.0.1:8099/v1/forecast \\
+    OPENMETEO_GEOCODING_URL=http://127.0.0.1:8099/v1/search \\
+    python mcp_server.py
+"""
+
+# ───────────────────── standard-library imports ────────────────────
+import argparse
+import asyncio
+import random
+import sys
+import zlib
+from collections import Counter
+from pathlib import Path
+
+# Allow `python tools/fake_openmeteo.py` to import top-level modules
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# ───────────────────── 3rd-party / project imports ─────────────────
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from gazetteer import Gazetteer
+
+WEATHER_CODES = [0, 1, 2, 3, 45, 51, 61, 63, 71, 80, 95]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Deterministic fake data                                      ║
+# ╚════════════════════════════════════════════════════════════════╝
+def _stable(text: str) -> int:
+    return zlib.crc32(text.encode())
+
+def fake_weather(lat: float, lon: float) -> dict:
+    """Same coordinates → same weather, roughly colder towards the poles."""
+    h = _stable(f"{lat:.2f},{lon:.2f}")
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current_weather": {
+            "temperature": round(30 - abs(lat) * 0.5 + (h % 100) / 10, 1),
+            "windspeed": round((h >> 8) % 400 / 10, 1),
+            "winddirection": (h >> 16) % 360,
+            "weathercode": WEATHER_CODES[h % len(WEATHER_CODES)],
+            "time": "2025-01-01T12:00",
+        },
+    }
+
+def fake_place(name: str, gazetteer: Gazetteer) -> list[dict]:
+    if name.strip().lower().startswith("nowhere"):
+        return []
+    hit = gazetteer.lookup(name)
+    if hit is None:
+        h = _stable(name.lower())
+        hit = {"latitude": round(h % 18000 / 100 - 90, 4),
+               "longitude": round((h >> 15) % 36000 / 100 - 180, 4),
+               "name": name.strip().title()}
+    return [hit]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  App with latency / fault injection                           ║
+# ╚════════════════════════════════════════════════════════════════╝
+def build_app(args: argparse.Namespace) -> Starlette:
+    rng = random.Random(args.seed)
+    gazetteer = Gazetteer()
+    counts: Counter = Counter()
+
+    async def inject(kind: str):
+        """Sleep, then maybe return an injected error response."""
+        counts[kind] += 1
+        delay = max(0.0, args.latency + rng.uniform(-args.jitter, args.jitter))
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        roll = rng.random()
+        if roll < args.rate_429:
+            counts["429"] += 1
+            headers = {"Retry-After": str(args.retry_after)} if args.retry_after else {}
+            return JSONResponse({"error": True, "reason": "Too many requests"},
+                                status_code=429, headers=headers)
+        if roll < args.rate_429 + args.error_rate:
+            counts["503"] += 1
+            return JSONResponse({"error": True, "reason": "Service unavailable"},
+                                status_code=503)
+        return None
+
+    async def forecast(request: Request):
+        if (fault := await inject("forecast")) is not None:
+            return fault
+        try:
+            lats = [float(x) for x in request.query_params["latitude"].split(",")]
+            lons = [float(x) for x in request.query_params["longitude"].split(",")]
+        except (KeyError, ValueError):
+            return JSONResponse({"error": True, "reason": "Invalid coordinates"},
+                                status_code=400)
+        if len(lats) != len(lons):
+            return JSONResponse({"error": True, "reason": "Length mismatch"},
+                                status_code=400)
+        data = [fake_weather(lat, lon) for lat, lon in zip(lats, lons)]
+        return JSONResponse(data if len(data) > 1 else data[0])
+
+    async def search(request: Request):
+        if (fault := await inject("search")) is not None:
+            return fault
+        results = fake_place(request.query_params.get("name", ""), gazetteer)
+        return JSONResponse({"results": results} if results else {})
+
+    async def stats(request: Request):
+        return JSONResponse(dict(counts))
+
+    return Starlette(routes=[
+        Route("/v1/forecast", forecast),
+        Route("/v1/search", search),
+        Route("/stats", stats),
+    ])
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Script entry-point                                           ║
+# ╚════════════════════════════════════════════════════════════════╝
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--latency", type=float, default=0.0, help="mean latency (ms)")
+    ap.add_argument("--jitter", type=float, default=0.0, help="± latency jitter (ms)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503s")
+    ap.add_argument("--rate-429", type=float, default=0.0, help="fraction of 429s")
+    ap.add_argument("--retry-after", type=float, default=0.0,
+                    help="Retry-After seconds sent with 429s (0 = none)")
+    ap.add_argument("--seed", type=int, default=1234)
+    args = ap.parse_args()
+
+    print(f"Fake Open-Meteo on http://{args.host}:{args.port}  "
+          f"(forecast: /v1/forecast, geocoding: /v1/search)")
+    uvicorn.run(build_app(args), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -2,40 +2,76 @@
 """
 index_code.py
 ────────────────────────────────────────────────────────────────────
-Create a new Chroma DB vector index and index local *.py files
-inside the repository (or whichever directory `ROOT_DIR` points to).
+Create (or incrementally update) a Chroma DB vector index of local
+*.py files inside the repository (or whichever directory `ROOT_DIR`
+points to).
 
 Design goals
 ------------
-1. **Single embedding model** — use Sentence-Transformers
-   *all-MiniLM-L6-v2* for *both* documentation (PDFs) and code so all
-   vectors live in the **same semantic space**.
+1. **Single embedding model** — embed *both* documentation (PDFs) and
+   code with *all-MiniLM-L6-v2* through `embed_cache.default_embedder()`
+   (the EMBED_BACKEND build, int8 ONNX by default, behind the embedding
+   cache and daemon), so all vectors live in the **same semantic
+   space**.  Switching the backend re-embeds everything.
 2. **CPU-friendly** — MiniLM is <100 MB and runs quickly without a GPU
    or Ollama server.
 3. **Line-aware chunking** — never split a line of code; try to break
    on blank lines; guarantee ≤ 500 GPT-3.5 tokens per chunk.
+   `--chunker ast` instead emits function / class-level chunks (small
+   neighbours merged, oversize bodies split at statement boundaries):
+   fewer, denser vectors.
+4. **Incremental re-runs** — `./chroma_db/index_manifest.json` keeps a
+   hash per file and per chunk.  Files whose size + mtime are unchanged
+   are skipped without being read, only new or edited chunks are
+   embedded, and chunks of deleted files are removed.  `--full` (or a
+   DB last built by `index_pdf.py`) wipes the folder and re-embeds
+   everything.
+5. **Repo-scale** — files are listed with `git ls-files` (so
+   `.gitignore` is honoured), sharded across worker processes that each
+   keep one tokenizer and count a whole shard's tokens in one batch,
+   and every new chunk flows into a single batched embed → upsert
+   writer (`index_pipeline.py`).
 
 Output
 ------
-• `./chroma_db/` — on-disk Chroma database (overwritten on each run)  
-• Collection name `"codebase"`  
+• `./chroma_db/` — on-disk Chroma database
+• Collection name `"codebase"`
 • One vector per code chunk, metadata keeps file path + chunk index
+
+Usage
+-----
+    python tools/index_code.py                    # all CPUs
+    python tools/index_code.py --workers 4 --root ../monorepo
+    python tools/index_code.py --full             # wipe and rebuild
+    python tools/index_code.py --chunker ast      # function/class chunks
 """
 
 from __future__ import annotations
 
 # ─── standard library ─────────────────────────────────────────────
+import argparse
+import ast
+import fnmatch
 import os
+import re
 import shutil
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 # ─── third-party ---------------------------------------------------
-from sentence_transformers import SentenceTransformer          # local embeddings
 from tiktoken import encoding_for_model                        # token counter
 from chromadb import PersistentClient                          # Chroma client
 from chromadb.config import Settings, DEFAULT_TENANT, DEFAULT_DATABASE
 
+# ─── project ------------------------------------------------------
+from index_manifest import Manifest, chunk_ids, content_hash, delete_ids
+from index_pipeline import EmbedPipeline
+from embedders import get_embedder                  # top level, on sys.path via index_pipeline
+
 # ╔════════════════════════════════════════════════════════════════╗
 # 1.  Configuration                                                ║
 # ╚════════════════════════════════════════════════════════════════╝
@@ -44,6 +80,8 @@ CHROMA_PATH      = Path("./chroma_db")          # where vectors are stored
 COLLECTION_NAME  = "codebase"                   # logical collection name
 EMBED_MODEL_NAME = "all-MiniLM-L6-v2"           # SBERT model
 MAX_TOKENS       = 500                          # ≤500 GPT-3.5 tokens/chunk
+CHUNKERS         = ("blank-line", "ast")         # see section 2
+SHARD_SIZE       = 64                           # files per worker task
 
 # Folder names we *never* descend into
 SKIP_DIRS = {
@@ -56,31 +94,48 @@ SKIP_DIRS = {
 # ╔════════════════════════════════════════════════════════════════╗
 # 2.  Chunking helper (Python-code aware)                          ║
 # ╚════════════════════════════════════════════════════════════════╝
-def chunk_python_code(code: str, max_tokens: int = MAX_TOKENS) -> Iterable[str]:
-    """
-    Yield contiguous code blocks (≤ `max_tokens`) **without breaking lines.**
+_ENC = None
 
-    Strategy
-    --------
-    1. Count GPT-3.5 tokens for *every* physical line (`tiktoken`).
-    2. Accumulate lines until:
-         • adding the next line would exceed `max_tokens`, OR
-         • we hit a *blank* line and already have content (makes blocks
-           roughly correspond to logical sections).
-    3. Yield the current chunk, reset counters, and continue.
+def _encoder():
+    """One tokenizer per process — building it per file is slow."""
+    global _ENC
+    if _ENC is None:
+        _ENC = encoding_for_model("gpt-3.5-turbo")
+    return _ENC
 
-    Returns
-    -------
-    Iterable[str]
-        Each yielded string is a code chunk ready for embedding.
+# Token counts memoized per line hash for the life of the process, so
+# lines repeated across files (imports, `return`, `else:` …) and across
+# shards handled by the same worker are encoded once.
+_TOKEN_MEMO: Dict[int, int] = {}
+TOKEN_MEMO_MAX = 1_000_000
+
+def count_tokens(lines: Iterable[str]) -> Dict[str, int]:
     """
-    enc = encoding_for_model("gpt-3.5-turbo")
+    GPT-3.5 token count of every *distinct* line (plus its newline).
+    Lines not already memoized are encoded in a single batch call.
+    """
+    counts = {line: _TOKEN_MEMO.get(hash(line)) for line in dict.fromkeys(lines)}
+    misses = [line for line, n in counts.items() if n is None]
+    if misses:
+        encoded = _encoder().encode_ordinary_batch([line + "\n" for line in misses],
+                                                   num_threads=1)
+        for line, tokens in zip(misses, encoded):
+            counts[line] = len(tokens)
+        # Evict only now: this call's hits are already in `counts`
+        if len(_TOKEN_MEMO) + len(misses) > TOKEN_MEMO_MAX:
+            _TOKEN_MEMO.clear()
+        for line in misses:
+            _TOKEN_MEMO[hash(line)] = counts[line]
+    return counts
 
+def chunk_lines(lines: List[str], counts: Dict[str, int],
+                max_tokens: int = MAX_TOKENS) -> Iterator[str]:
+    """Blank-line / token-budget chunking of pre-counted lines."""
     current_lines: List[str] = []
     token_count = 0
 
-    for line in code.splitlines():
-        line_tokens = len(enc.encode(line + "\n"))
+    for line in lines:
+        line_tokens = counts[line]
 
         # Hard break: next line would overflow token budget
         if current_lines and token_count + line_tokens > max_tokens:
@@ -99,85 +154,422 @@ def chunk_python_code(code: str, max_tokens: int = MAX_TOKENS) -> Iterable[str]:
     if current_lines:                     # last chunk (file may not end with \n)
         yield "\n".join(current_lines)
 
-# ╔════════════════════════════════════════════════════════════════╗
-# 3.  Fresh-DB helper                                              ║
-# ╚════════════════════════════════════════════════════════════════╝
-def reset_chroma(db_path: Path) -> None:
+def chunk_python_code(code: str, max_tokens: int = MAX_TOKENS) -> Iterable[str]:
     """
-    Delete any existing Chroma folder so we *always* start from scratch.
-    Avoids mixed embeddings if you tweak chunking rules or the model.
+    Yield contiguous code blocks (≤ `max_tokens`) **without breaking lines.**
+
+    Strategy
+    --------
+    1. Count GPT-3.5 tokens for *every* physical line (`tiktoken`).
+    2. Accumulate lines until:
+         • adding the next line would exceed `max_tokens`, OR
+         • we hit a *blank* line and already have content (makes blocks
+           roughly correspond to logical sections).
+    3. Yield the current chunk, reset counters, and continue.
+
+    Returns
+    -------
+    Iterable[str]
+        Each yielded string is a code chunk ready for embedding.
     """
-    if db_path.exists():
-        shutil.rmtree(db_path)
-    db_path.mkdir(parents=True, exist_ok=True)
+    lines = code.splitlines()
+    yield from chunk_lines(lines, count_tokens(lines), max_tokens)
+
+# ─── AST-aware alternative (`--chunker ast`) ──────────────────────
+#  Function / class-level chunks: one span per top-level statement
+#  (with the comments and decorators above it), oversize spans split at
+#  statement boundaries of their body, small neighbours merged.
+_NEWLINE_RE = re.compile(r"\r\n|\r|\n")          # exactly what `ast` counts
+
+def source_lines(code: str) -> List[str]:
+    """Split like the Python tokenizer does (unlike str.splitlines())."""
+    lines = _NEWLINE_RE.split(code)
+    return lines[:-1] if lines and lines[-1] == "" else lines
+
+def _first_line(node: ast.stmt) -> int:
+    """0-based first line of a statement, decorators included."""
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators]) - 1
+
+class _AstChunker:
+    def __init__(self, lines: List[str], counts: Dict[str, int], max_tokens: int):
+        self.lines = lines
+        self.max_tokens = max_tokens
+        self.prefix = [0]                             # prefix sums of line tokens
+        for line in lines:
+            self.prefix.append(self.prefix[-1] + counts[line])
+
+    def tokens(self, start: int, end: int) -> int:
+        return self.prefix[end] - self.prefix[start]
+
+    def spans(self, body: List[ast.stmt], start: int, end: int) -> List[Tuple[int, int]]:
+        """Cover lines [start, end) with one span per statement of `body`."""
+        out: List[Tuple[int, int]] = []
+        s = start
+        for i, node in enumerate(body):
+            e = end if i == len(body) - 1 else max(s, node.end_lineno)
+            out += self.fit(node, s, e)
+            s = e
+        return out
+
+    def fit(self, node: ast.stmt, start: int, end: int) -> List[Tuple[int, int]]:
+        """[start, end) as is if it fits, else split inside `node`."""
+        if self.tokens(start, end) <= self.max_tokens:
+            return [(start, end)]
+        body = getattr(node, "body", None)
+        if not isinstance(body, list) or not body:
+            return self.by_lines(start, end)          # e.g. one huge literal
+        head_end = max(start, _first_line(body[0]))
+        body_end = max(head_end, body[-1].end_lineno)
+        out = self.by_lines(start, head_end) if head_end > start else []
+        out += self.spans(body, head_end, body_end)
+        if body_end < end:                            # else / except / finally
+            out += self.by_lines(body_end, end)
+        return out
+
+    def by_lines(self, start: int, end: int) -> List[Tuple[int, int]]:
+        out, s = [], start
+        for i in range(start, end):
+            if i > s and self.tokens(s, i + 1) > self.max_tokens:
+                out.append((s, i))
+                s = i
+        return out + [(s, end)]
+
+    def merge(self, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Glue a small span onto its neighbour while the result fits."""
+        small = self.max_tokens // 4
+        out: List[Tuple[int, int]] = []
+        for s, e in spans:
+            if out:
+                ps, pe = out[-1]
+                t_prev, t_cur = self.tokens(ps, pe), self.tokens(s, e)
+                if (t_prev < small or t_cur < small) and t_prev + t_cur <= self.max_tokens:
+                    out[-1] = (ps, e)
+                    continue
+            out.append((s, e))
+        return out
+
+    def text(self, start: int, end: int) -> str:
+        chunk = self.lines[start:end]
+        while chunk and not chunk[0].strip():
+            chunk = chunk[1:]
+        while chunk and not chunk[-1].strip():
+            chunk = chunk[:-1]
+        return "\n".join(chunk)
+
+def chunk_python_ast(lines: List[str], counts: Dict[str, int],
+                     max_tokens: int = MAX_TOKENS) -> List[str]:
+    """
+    Function / class-level chunks of one file (`lines` from
+    source_lines(), `counts` from count_tokens()).
+
+    1. Every top-level statement becomes a span, taking the comments /
+       blank lines above it (and trailing lines at the end of the file).
+    2. A span over `max_tokens` is split into the statement's header
+       and one span per statement of its body, recursively; a single
+       oversize statement without a body falls back to line packing.
+    3. Adjacent spans are merged while one of them is small (< ¼ of
+       `max_tokens`) and the result still fits — tiny helpers, imports
+       and constants end up sharing a vector.
+
+    Files that do not parse fall back to chunk_lines().
+    """
+    try:
+        tree = ast.parse("\n".join(lines))
+    except (SyntaxError, ValueError):
+        return list(chunk_lines(lines, counts, max_tokens))
+    if not tree.body:
+        return [text] if (text := "\n".join(lines).strip()) else []
+    chunker = _AstChunker(lines, counts, max_tokens)
+    spans = chunker.merge(chunker.spans(tree.body, 0, len(lines)))
+    return [text for s, e in spans if (text := chunker.text(s, e))]
 
 # ╔════════════════════════════════════════════════════════════════╗
-# 4.  Main routine                                                 ║
+# 3.  Finding source files                                         ║
 # ╚════════════════════════════════════════════════════════════════╝
-def index_python_sources() -> None:
+def _skipped(parts: Iterable[str]) -> bool:
+    return any(d in SKIP_DIRS or d.startswith(".") for d in parts)
+
+def list_sources(root: Path) -> List[Path]:
     """
-    Walk the directory tree under `ROOT_DIR`, embed every `.py` file,
-    and store vectors + metadata in a fresh Chroma database.
+    Every `.py` file under `root`.  Inside a git checkout this is
+    `git ls-files` (tracked + untracked, minus anything ignored);
+    elsewhere a directory walk that applies the root `.gitignore`.
     """
-    if not ROOT_DIR.exists():
-        print(f"[ERROR] {ROOT_DIR.resolve()} does not exist.")
-        return
+    try:
+        out = subprocess.run(
+            ["git", "-C", str(root), "ls-files", "-z", "--cached", "--others",
+             "--exclude-standard", "--", "*.py"],
+            capture_output=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return _walk_sources(root)
 
-    # ── 1. Fresh on-disk DB ───────────────────────────────────────
-    reset_chroma(CHROMA_PATH)
+    files = []
+    for rel in out.decode("utf-8", "surrogateescape").split("\0"):
+        if rel and not _skipped(Path(rel).parts[:-1]):
+            path = root / rel
+            if path.is_file():                 # tracked but deleted → skip
+                files.append(path)
+    return files
 
-    # ── 2. Connect to persistent Chroma client ────────────────────
-    client = PersistentClient(
-        path=str(CHROMA_PATH),
-        settings=Settings(),                # default Chroma settings
-        tenant=DEFAULT_TENANT,
-        database=DEFAULT_DATABASE,
-    )
-    collection = client.get_or_create_collection(COLLECTION_NAME)
+def _gitignore(root: Path) -> List[Tuple[str, bool]]:
+    """(pattern, directory-only) pairs from `root/.gitignore` (no negation)."""
+    try:
+        raw = (root / ".gitignore").read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return []
+    patterns = []
+    for line in raw.splitlines():
+        line = line.strip()
+        if line and not line.startswith(("#", "!")):
+            patterns.append((line.rstrip("/"), line.endswith("/")))
+    return patterns
 
-    file_counter = 0
+def _ignored(rel: str, is_dir: bool, patterns: List[Tuple[str, bool]]) -> bool:
+    name = rel.rsplit("/", 1)[-1]
+    for pattern, dir_only in patterns:
+        if dir_only and not is_dir:
+            continue
+        if "/" in pattern:                     # anchored to the root
+            if fnmatch.fnmatch(rel, pattern.lstrip("/")):
+                return True
+        elif fnmatch.fnmatch(name, pattern):
+            return True
+    return False
 
-    # ── 3. Recursively scan .py files ─────────────────────────────
-    for root, dirs, files in os.walk(ROOT_DIR):
+def _walk_sources(root: Path) -> List[Path]:
+    patterns = _gitignore(root)
+    files = []
+    for dirpath, dirs, names in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else rel_dir + "/"
         # In-place filter to stop os.walk() descending into skip folders
         dirs[:] = [
             d for d in dirs
-            if d not in SKIP_DIRS and not d.startswith(".")
+            if not _skipped([d]) and not _ignored(prefix + d, True, patterns)
         ]
+        files += [Path(dirpath) / n for n in names
+                  if n.endswith(".py") and not _ignored(prefix + n, False, patterns)]
+    return files
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 4.  Worker side: read, hash, chunk and diff a shard of files     ║
+# ╚════════════════════════════════════════════════════════════════╝
+def diff_chunks(path: str, sha: str, chunks: List[str],
+                old: Optional[dict]) -> dict:
+    """
+    Compare a file's new chunks with its manifest entry.  Only chunks
+    whose content hash is new need embedding; unchanged chunks that
+    merely moved just get a new `chunk_index`.
+    """
+    hashes = [content_hash(chunk) for chunk in chunks]
+    ids = chunk_ids(path, hashes)
+    old_ids = {cid: idx for idx, cid in
+               enumerate(chunk_ids(path, old["chunks"]) if old else [])}
+    new, moved = [], []
+    for idx, (cid, chunk) in enumerate(zip(ids, chunks)):
+        old_idx = old_ids.pop(cid, None)
+        if old_idx is None:
+            new.append((cid, idx, chunk))
+        elif old_idx != idx:
+            moved.append((cid, idx))
+    return {"path": path, "sha": sha, "hashes": hashes,
+            "new": new, "moved": moved, "stale": list(old_ids)}
+
+def chunk_shard(tasks: List[Tuple[str, Optional[dict]]],
+                chunker: str = "blank-line") -> List[dict]:
+    """
+    Runs in a worker process.  `tasks` are (path, manifest entry) pairs
+    whose stat changed; files whose bytes still hash the same come back
+    as {"same": True}.  Token counting is batched over the whole shard.
+    """
+    results, todo = [], []
+    for path, old in tasks:
+        try:
+            data = Path(path).read_bytes()
+        except OSError as err:
+            results.append({"path": path, "error": str(err)})
+            continue
+        sha = content_hash(data)
+        if old and old["sha"] == sha:                 # touched, not edited
+            results.append({"path": path, "same": True})
+            continue
+        text = data.decode("utf-8", errors="ignore")
+        lines = source_lines(text) if chunker == "ast" else text.splitlines()
+        todo.append((path, sha, lines, old))
+
+    counts = count_tokens(line for _, _, lines, _ in todo for line in lines)
+    for path, sha, lines, old in todo:
+        if chunker == "ast":
+            chunks = chunk_python_ast(lines, counts)
+        else:
+            chunks = list(chunk_lines(lines, counts))
+        results.append(diff_chunks(path, sha, chunks, old))
+    return results
+
+def _bounded_map(pool, fn, items, window: int) -> Iterator:
+    """
+    pool.map that keeps at most `window` tasks in flight, unordered.
+    If a task raises (or the caller stops early) the tasks not started
+    yet are cancelled.
+    """
+    pending = set()
+    try:
+        for item in items:
+            pending.add(pool.submit(fn, item))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (f.result() for f in done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (f.result() for f in done)
+    finally:
+        for f in pending:
+            f.cancel()
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 5.  Fresh-DB helper                                              ║
+# ╚════════════════════════════════════════════════════════════════╝
+def reset_chroma(db_path: Path) -> None:
+    """
+    Delete any existing Chroma folder so we *always* start from scratch.
+    Avoids mixed embeddings if you tweak chunking rules or the model.
+    """
+    if db_path.exists():
+        shutil.rmtree(db_path)
+    db_path.mkdir(parents=True, exist_ok=True)
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 6.  Main routine                                                 ║
+# ╚════════════════════════════════════════════════════════════════╝
+def index_python_sources(full: bool = False, workers: int = os.cpu_count() or 1,
+                         root: Optional[Path] = None,
+                         db_path: Optional[Path] = None,
+                         dry_run: bool = False,
+                         chunker: str = "blank-line") -> dict:
+    """
+    Walk the directory tree under `root` (default `ROOT_DIR`), embed every
+    new or changed `.py` file, and store vectors + metadata in the Chroma
+    database at `db_path` (default `CHROMA_PATH`).
+
+    `dry_run` lists, reads and chunks everything but writes nothing —
+    handy for measuring the chunking side on its own.  Returns counters.
+    """
+    root = root or ROOT_DIR
+    db_path = db_path or CHROMA_PATH
+    params = {"chunking": chunker, "max_tokens": MAX_TOKENS,  # change → rebuild
+              "embedder": get_embedder().name}
+    if not root.exists():
+        print(f"[ERROR] {root.resolve()} does not exist.")
+        return {}
+    start = time.perf_counter()
 
-        for name in files:
-            if not name.endswith(".py"):
-                continue
+    # ── 1. Previous manifest, or a fresh on-disk DB ───────────────
+    manifest = None if full else Manifest.load(db_path, "code", params)
+    if manifest is None:
+        if not dry_run:
+            reset_chroma(db_path)
+        manifest = Manifest(db_path, "code", params)
 
-            file_path = Path(root) / name
+    # ── 2. List sources; only files whose stat changed go to workers
+    sources = list_sources(root)
+    todo = []
+    for path in sources:
+        try:
+            if not manifest.stat_matches(path):
+                todo.append((str(path), manifest.entry(path)))
+        except OSError:
+            continue                                  # vanished meanwhile
+    stale = manifest.forget_missing({str(p) for p in sources})
+    stats = {"files": len(sources), "changed": 0, "unchanged": len(sources) - len(todo),
+             "chunks": 0, "embedded": 0, "moved": 0}
+    if not todo and not stale:
+        if not dry_run:
+            manifest.save()
+        print(f"Nothing changed — {len(sources)} Python files already indexed")
+        stats.update(removed=0, seconds=time.perf_counter() - start)
+        return stats
 
-            # Read file
-            try:
-                code_text = file_path.read_text(encoding="utf-8", errors="ignore")
-            except Exception as err:
-                print(f"[WARN] Could not read {file_path}: {err}")
-                continue
+    # ── 3. Connect to persistent Chroma client ────────────────────
+    pipe = None
+    if not dry_run:
+        client = PersistentClient(
+            path=str(db_path),
+            settings=Settings(),                # default Chroma settings
+            tenant=DEFAULT_TENANT,
+            database=DEFAULT_DATABASE,
+        )
+        collection = client.get_or_create_collection(COLLECTION_NAME)
+        pipe = EmbedPipeline(collection)
 
-            # Chunk → embed → add to collection
-            for idx, chunk in enumerate(chunk_python_code(code_text)):
-            
-                collection.add(
-                    ids        =[f"{file_path}-{idx}"],
-                    documents  =[chunk],
-                    metadatas  =[{"path": str(file_path), "chunk_index": idx}],
-                )
+    # ── 4. Chunk shards in parallel → one batched writer ──────────
+    shards = [todo[i:i + SHARD_SIZE] for i in range(0, len(todo), SHARD_SIZE)]
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_encoder)
+    try:
+        work = partial(chunk_shard, chunker=chunker)
+        for results in _bounded_map(pool, work, shards, 2 * workers):
+            for res in results:
+                file_path = Path(res["path"])
+                if "error" in res:
+                    print(f"[WARN] Could not read {file_path}: {res['error']}")
+                    continue
+                if res.get("same"):
+                    stats["unchanged"] += 1
+                    if not dry_run:
+                        manifest.touch(file_path)
+                    continue
+                stats["changed"] += 1
+                stats["chunks"] += len(res["hashes"])
+                stale += res["stale"]
+                if pipe is not None:
+                    for cid, idx, chunk in res["new"]:
+                        pipe.add(cid, chunk, {"path": str(file_path), "chunk_index": idx})
+                    for cid, idx in res["moved"]:
+                        pipe.move(cid, {"path": str(file_path), "chunk_index": idx})
+                    manifest.record(file_path, res["sha"], res["hashes"])
+                print(f"Indexed {file_path}")
+    except BaseException:
+        # A worker failed: stop the embed / write threads without
+        # writing a partial run (the manifest is not saved either)
+        if pipe is not None:
+            pipe.abort()
+        raise
+    finally:
+        pool.shutdown(cancel_futures=True)
 
-            file_counter += 1
-            print(f"Indexed {file_path}")
+    # ── 5. Remove chunks of deleted files / vanished chunks ───────
+    if pipe is not None:
+        stats.update(pipe.close())
+        delete_ids(collection, stale)
+        manifest.save()
+    stats.update(removed=len(stale), seconds=time.perf_counter() - start)
 
-    # ── 4. Done ───────────────────────────────────────────────────
+    # ── 6. Done ───────────────────────────────────────────────────
     print(
-        f"Indexing complete: {file_counter} Python files processed.\n"
-        "New vector DB saved to ./chroma_db"
+        f"Indexing complete: {stats['changed']} Python files processed, "
+        f"{stats['unchanged']} unchanged, {stats['embedded']} chunks embedded, "
+        f"{len(stale)} stale chunks removed in {stats['seconds']:.1f}s"
+        f" ({stats.get('cache', {}).get('hits', 0)} from the embedding cache).\n"
+        + ("Dry run — nothing written" if dry_run else f"Vector DB saved to {db_path}")
     )
+    return stats
 
 # ╔════════════════════════════════════════════════════════════════╗
-# 5.  Entry point                                                  ║
+# 7.  Entry point                                                  ║
 # ╚════════════════════════════════════════════════════════════════╝
 if __name__ == "__main__":
-    index_python_sources()
+    ap = argparse.ArgumentParser(description="Index *.py files into ChromaDB.")
+    ap.add_argument("--full", action="store_true",
+                    help="ignore the manifest: wipe the DB and re-embed everything")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="chunking processes (default: all CPUs)")
+    ap.add_argument("--root", type=Path, default=ROOT_DIR,
+                    help="directory tree to scan")
+    ap.add_argument("--dry-run", action="store_true",
+                    help="list and chunk files, but write nothing")
+    ap.add_argument("--chunker", choices=CHUNKERS, default="blank-line",
+                    help="blank-line blocks (default) or function/class-level AST chunks")
+    args = ap.parse_args()
+    index_python_sources(full=args.full, workers=args.workers, root=args.root,
+                         dry_run=args.dry_run, chunker=args.chunker)
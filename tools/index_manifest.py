@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+index_manifest.py
+────────────────────────────────────────────────────────────────────
+Shared bookkeeping for **incremental** runs of `index_code.py` and
+`index_pdf.py`.
+
+The manifest (`chroma_db/index_manifest.json`) remembers, per source
+file, its size / mtime, a content hash and the hash of every chunk it
+produced.  On the next run:
+
+* files whose size + mtime (or, failing that, content hash) match are
+  skipped without being read or chunked;
+* changed files are re-chunked, but only chunks whose hash is new get
+  embedded — chunk ids are derived from the chunk hash, so unchanged
+  chunks keep their vectors even if they moved (only `chunk_index`
+  metadata is updated);
+* chunks of changed files that disappeared, and all chunks of deleted
+  files, are removed from the collection.
+
+A manifest written by the *other* indexer, or with different chunking
+parameters, is not reused: the caller falls back to a full rebuild,
+exactly like `--full`.
+"""
+
+from __future__ import annotations
+
+# ─── standard library ─────────────────────────────────────────────
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_NAME = "index_manifest.json"
+VERSION       = 1
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Hashing helpers                                              ║
+# ╚════════════════════════════════════════════════════════════════╝
+def content_hash(data: str | bytes) -> str:
+    """Short, stable hash of a chunk's text (or a file's bytes)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def file_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class ChunkIds:
+    """
+    Turn a file's chunk hashes into ids: `<path>-<hash>` plus `-<n>` for
+    the n-th repeat of identical text within the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seen: Dict[str, int] = {}
+
+    def __call__(self, chunk_sha: str) -> str:
+        n = self.seen.get(chunk_sha, 0)
+        self.seen[chunk_sha] = n + 1
+        return f"{self.path}-{chunk_sha}" + (f"-{n}" if n else "")
+
+def chunk_ids(path: str, hashes: List[str]) -> List[str]:
+    ids = ChunkIds(path)
+    return [ids(h) for h in hashes]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Manifest                                                     ║
+# ╚════════════════════════════════════════════════════════════════╝
+class Manifest:
+    """Per-file records for one indexer (`source`) and its parameters."""
+
+    def __init__(self, db_path: Path, source: str, params: dict):
+        self.path = Path(db_path) / MANIFEST_NAME
+        self.source = source
+        self.params = params
+        self.files: Dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, db_path: Path, source: str, params: dict) -> Optional["Manifest"]:
+        """The stored manifest, or None if missing / from another indexer."""
+        manifest = cls(db_path, source, params)
+        try:
+            data = json.loads(manifest.path.read_text())
+        except (OSError, ValueError):
+            return None
+        if (data.get("version"), data.get("source"), data.get("params")) != \
+                (VERSION, source, params):
+            return None
+        manifest.files = data.get("files", {})
+        return manifest
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": VERSION, "source": self.source,
+                                   "params": self.params, "files": self.files}))
+        os.replace(tmp, self.path)
+
+    # ─── per-file checks ──────────────────────────────────────────
+    def entry(self, path: Path) -> Optional[dict]:
+        return self.files.get(str(path))
+
+    def stat_matches(self, path: Path) -> bool:
+        """Known file with the same size and mtime as last time."""
+        entry = self.files.get(str(path))
+        st = path.stat()
+        return bool(entry) and (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns)
+
+    def touch(self, path: Path) -> None:
+        """Same content, new mtime: refresh the stat so the next run skips it."""
+        st = path.stat()
+        self.files[str(path)].update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+    def unchanged(self, path: Path) -> Tuple[bool, Optional[str]]:
+        """
+        (True, None) if `path` is known and unchanged — cheap stat check
+        first, content hash only when the stat differs.  Otherwise
+        (False, file_hash) for the caller to pass to record().
+        """
+        if self.stat_matches(path):
+            return True, None
+        sha = file_hash(path)
+        entry = self.files.get(str(path))
+        if entry and entry["sha"] == sha:                 # touched, not edited
+            self.touch(path)
+            return True, None
+        return False, sha
+
+    def old_ids(self, path: Path) -> List[str]:
+        entry = self.files.get(str(path))
+        return chunk_ids(str(path), entry["chunks"]) if entry else []
+
+    def record(self, path: Path, sha: str, chunk_hashes: List[str]) -> None:
+        st = path.stat()
+        self.files[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                                 "sha": sha, "chunks": chunk_hashes}
+
+    def forget_missing(self, present: set) -> List[str]:
+        """Drop files not in `present`; return the chunk ids they owned."""
+        stale: List[str] = []
+        for name in [n for n in self.files if n not in present]:
+            stale += chunk_ids(name, self.files.pop(name)["chunks"])
+        return stale
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Collection helper                                            ║
+# ╚════════════════════════════════════════════════════════════════╝
+def delete_ids(coll, ids: List[str], batch: int = 5000) -> None:
+    for i in range(0, len(ids), batch):
+        coll.delete(ids=ids[i:i + batch])
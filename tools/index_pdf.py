@@ -1,78 +1,171 @@
-
 #!/usr/bin/env python3
 """
 index_pdfs.py
 ────────────────────────────────────────────────────────────────────
-Create a **fresh** ChromaDB vector-index from the contents of every PDF
-inside `./data/`, embedding **each non-blank line** with the
-*all-MiniLM-L6-v2* Sentence-BERT model.
+Build (or incrementally update) a ChromaDB vector-index from the
+contents of every PDF inside `./data/`, embedding **each record** —
+the lines of one table row or block, grouped by layout — with the
+*all-MiniLM-L6-v2* model (the same embedder the MCP server uses for
+queries).  With `--children`, records spanning several lines also
+index each line as a child chunk pointing at its record; see
+`record_chunker.py`.
 
 High-level flow
 ---------------
-1. **Reset DB** – delete any existing `./chroma_db/` folder so we never mix
-   embeddings from previous runs.
+1. **Check the manifest** – `./chroma_db/index_manifest.json` records
+   each PDF's hash and per-chunk hashes from the last run.  Unchanged
+   PDFs are skipped, deleted PDFs have their chunks removed.  Without a
+   usable manifest (first run, the DB was built by `index_code.py`, or
+   `--full`) the `./chroma_db/` folder is wiped and rebuilt.
 2. **Collect PDFs** – scan `./data/*.pdf`.
-3. **Extract lines** – use *pdfplumber* to pull plain text from each page,
-   split on newlines, drop blank lines.
-4. **Embed** – convert each line to a 384-dimensional vector
-   (MiniLM-L6-v2).
-5. **Store** – write `(vector, raw line, metadata)` into a persistent
-   Chroma collection called `"codebase"`.
+3. **Stream changed PDFs through a pipeline** – three stages connected
+   by bounded queues, so memory stays flat however large the PDFs are:
+
+       pages ──► [process pool]  extract positioned lines of one page
+             ──► [chunker]       group lines into records (in order)
+             ──► [embedder]      embed chunks in batches of --batch-size
+             ──► [writer]        bulk-upsert (vector, chunk, metadata)
+
+   Only a few pages and a few batches are ever in flight at once (the
+   embedder / writer stages live in `index_pipeline.py`).
+   Chunks whose text was already indexed keep their vector (ids are
+   content hashes); only new or edited records are embedded, and even
+   those skip the model if `embed_cache.py` has seen the text before
+   (e.g. after `--full`, or when the MCP server built the same index).
+4. **Store** – write into a persistent Chroma collection called
+   `"codebase"`, then report pages/sec, chunks/sec and peak RSS.
 
 After it finishes you can query the vectors with any Chroma-compatible
 client or the companion RAG script.
+
+Usage
+-----
+    python tools/index_pdf.py                       # all CPUs
+    python tools/index_pdf.py --workers 4 --batch-size 512
+    python tools/index_pdf.py --full                # wipe and rebuild
+    python tools/index_pdf.py --children            # + line-level children
 """
 
 # ───────────────────── standard-library imports ────────────────────
+import argparse
+import os
+import resource
 import shutil
-import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Tuple
+
+# Allow `python tools/index_pdf.py` to import top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-# ───────────────────── 3rd-party imports ───────────────────────────
+# ───────────────────── 3rd-party / project imports ─────────────────
 import pdfplumber                               # PDF text extractor
-from sentence_transformers import SentenceTransformer
 from chromadb import PersistentClient
 from chromadb.config import Settings, DEFAULT_TENANT, DEFAULT_DATABASE
 
+from index_manifest import ChunkIds, Manifest, content_hash, delete_ids
+from index_pipeline import BATCH_SIZE, EmbedPipeline
+from record_chunker import (RECORD_CHILDREN, Line, Record, RecordChunker, chunking_params,
+                            page_lines)
+
 # ╔════════════════════════════════════════════════════════════════╗
 # 1.  Configuration / constants                                    ║
 # ╚════════════════════════════════════════════════════════════════╝
 PDF_DIR          = Path("./data")              # where to look for *.pdf
-CHROMA_PATH      = Path("./chroma_db")         # output folder (wiped each run)
+CHROMA_PATH      = Path("./chroma_db")         # output folder
 COLLECTION_NAME  = "codebase"                  # logical collection inside DB
 
+PAGES_IN_FLIGHT  = 2       # extraction tasks queued per worker
+
 # ╔════════════════════════════════════════════════════════════════╗
-# 2.  Regex helper: split lines & trim whitespace                  ║
+# 2.  Stage 1: page-level extraction (runs in worker processes)    ║
 # ╚════════════════════════════════════════════════════════════════╝
-#   • `\r?\n`  = Windows or Unix newline
-#   • `[^\S\r\n]*` = optional leading/trailing spaces or tabs
-LINE_RE = re.compile(r"[^\S\r\n]*\r?\n[^\S\r\n]*")
+# Each worker keeps its most recent PDF open, so consecutive pages of
+# one document don't re-parse the file.
+_open_pdf: dict = {}
 
-def extract_lines(path: Path) -> List[str]:
-    """
-    Read a PDF and return *every* non-blank line, preserving order.
+def _page_count(path: Path) -> int:
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
 
-    Parameters
-    ----------
-    path : Path
-        Full path to a .pdf file.
+def extract_page(path: str, page_no: int) -> List[Line]:
+    """
+    Return every non-blank line of one PDF page with its position,
+    preserving order (the chunker needs the layout).
 
-    Returns
-    -------
-    List[str]
-        One entry per non-empty line (page order kept).
+    Runs in a worker process; only this page's text is held in memory.
     """
-    lines: List[str] = []
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            for raw_line in LINE_RE.split(text):
-                line = raw_line.strip()
-                if line:                      # skip blanks
-                    lines.append(line)
+    pdf = _open_pdf.get(path)
+    if pdf is None:
+        for old in _open_pdf.values():
+            old.close()
+        _open_pdf.clear()
+        pdf = _open_pdf[path] = pdfplumber.open(path)
+    page = pdf.pages[page_no]
+    lines = page_lines(page)
+    page.flush_cache()                        # drop parsed layout objects
     return lines
 
+def iter_records(pdf_files: List[Path], workers: int,
+                 stats: dict) -> Iterator[Tuple[Path, int, Record]]:
+    """
+    Yield (pdf_path, record_index, record) for every record of every PDF.
+
+    Pages are extracted in parallel but consumed in order (a record may
+    continue on the next page, and indices stay stable between runs);
+    at most workers × PAGES_IN_FLIGHT pages are pending at any time.
+    """
+    def page_jobs():
+        for pdf_path in pdf_files:
+            try:
+                pages = _page_count(pdf_path)
+            except Exception as err:
+                print(f"[WARN] Could not read {pdf_path}: {err}")
+                stats["failed"].add(pdf_path)
+                continue
+            print(f"→ Indexing {pdf_path.name} ({pages} pages)")
+            for page_no in range(pages):
+                yield pdf_path, page_no
+
+    def pages():
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: deque = deque()
+            for pdf_path, page_no in page_jobs():
+                pending.append((pdf_path, pool.submit(extract_page, str(pdf_path), page_no)))
+                if len(pending) >= workers * PAGES_IN_FLIGHT:
+                    yield _drain_one(pending, stats)
+            while pending:
+                yield _drain_one(pending, stats)
+
+    current, chunker, idx = None, RecordChunker(), 0
+    for pdf_path, lines in pages():
+        if pdf_path != current:
+            for record in chunker.close():
+                yield current, idx, record
+            current, idx = pdf_path, 0
+        for record in chunker.feed(lines):
+            yield pdf_path, idx, record
+            idx += 1
+    for record in chunker.close():
+        yield current, idx, record
+
+def _drain_one(pending: deque, stats: dict) -> Tuple[Path, List[Line]]:
+    pdf_path, future = pending.popleft()
+    try:
+        lines = future.result()
+    except Exception as err:
+        print(f"[WARN] Could not extract a page of {pdf_path}: {err}")
+        stats["failed"].add(pdf_path)
+        lines = []
+    stats["pages"] += 1
+    return pdf_path, lines
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Main routine                                                 ║
+# ╚════════════════════════════════════════════════════════════════╝
 def reset_chroma(db_path: Path) -> None:
     """
     Delete any existing `db_path` directory so we always start clean.
@@ -81,21 +174,66 @@ def reset_chroma(db_path: Path) -> None:
         shutil.rmtree(db_path)
     db_path.mkdir(parents=True, exist_ok=True)
 
-# ╔════════════════════════════════════════════════════════════════╗
-# 3.  Main routine                                                 ║
-# ╚════════════════════════════════════════════════════════════════╝
-def index_pdfs() -> None:
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+class _ChunkDiff:
+    """Compare one PDF's freshly extracted chunks with its manifest entry."""
+
+    def __init__(self, path: Path, old_ids: List[str]):
+        self.ids = ChunkIds(str(path))
+        self.hashes: List[str] = []
+        self.old = {cid: idx for idx, cid in enumerate(old_ids)}
+
+    def add(self, idx: int, text: str, parent: str = "") -> Tuple[str, str]:
+        """
+        Return (chunk id, "new" | "moved" | "same").  A child's hash
+        includes its parent's, so editing any line of a record gives
+        all its children new ids (and the right `parent` metadata).
+        """
+        sha = content_hash(f"{parent}\n{text}" if parent else text)
+        self.hashes.append(sha)
+        cid = self.ids(sha)
+        old_idx = self.old.pop(cid, None)
+        if old_idx is None:
+            return cid, "new"
+        return cid, "same" if old_idx == idx else "moved"
+
+def _queue(pipe: EmbedPipeline, cid: str, action: str, text: str, meta: dict) -> None:
+    if action == "new":
+        pipe.add(cid, text, meta)
+    elif action == "moved":
+        pipe.move(cid, meta)
+
+def index_pdfs(workers: int = os.cpu_count() or 1, batch_size: int = BATCH_SIZE,
+               full: bool = False, children: bool = RECORD_CHILDREN) -> None:
     """
-    Walk `PDF_DIR`, embed every line of every PDF, and store everything
-    into a *new* ChromaDB at `CHROMA_PATH`.
+    Walk `PDF_DIR` and bring the ChromaDB at `CHROMA_PATH` up to date:
+    embed records of new / changed PDFs, drop chunks that no longer exist.
     """
     pdf_files = sorted(PDF_DIR.glob("*.pdf"))
     if not pdf_files:
         print(f"No PDF files found in {PDF_DIR.resolve()}")
         return
 
-    # ── 1. Fresh DB on disk ───────────────────────────────────────
-    reset_chroma(CHROMA_PATH)
+    # ── 1. Previous manifest, or a fresh DB on disk ───────────────
+    params = chunking_params(children)            # change → full rebuild
+    manifest = None if full else Manifest.load(CHROMA_PATH, "pdf", params)
+    if manifest is None:
+        reset_chroma(CHROMA_PATH)
+        manifest = Manifest(CHROMA_PATH, "pdf", params)
+
+    changed = {}                                  # path -> file hash
+    for pdf_path in pdf_files:
+        same, sha = manifest.unchanged(pdf_path)
+        if not same:
+            changed[pdf_path] = sha
+    stale = manifest.forget_missing({str(p) for p in pdf_files})
+    if not changed and not stale:
+        manifest.save()
+        print(f"Nothing changed — {len(pdf_files)} PDFs already indexed")
+        return
 
     # ── 2. Connect to persistent Chroma client ────────────────────
     client = PersistentClient(
@@ -105,30 +243,61 @@ def index_pdfs() -> None:
         database=DEFAULT_DATABASE,
     )
     coll = client.get_or_create_collection(COLLECTION_NAME)
+    if coll.metadata != params:
+        coll.modify(metadata=params)          # the MCP server checks this before reuse
 
-    # ── 3. Iterate over every PDF ─────────────────────────────────
-    for pdf_path in pdf_files:
-        print(f"→ Indexing {pdf_path.name}")
-        try:
-            lines = extract_lines(pdf_path)
-        except Exception as err:
-            print(f"[WARN] Could not read {pdf_path}: {err}")
-            continue
-
-        # Embed and write each line
-        for idx, line in enumerate(lines):
+    # ── 3. Feed new / moved records from the extraction pool ──────
+    start = time.perf_counter()
+    stats = {"pages": 0, "records": 0, "failed": set()}
+    pipe = EmbedPipeline(coll, batch_size)
+    diffs = {p: _ChunkDiff(p, manifest.old_ids(p)) for p in changed}
+    for pdf_path, idx, record in iter_records(list(changed), workers, stats):
+        diff = diffs[pdf_path]
+        stats["records"] += 1
+        meta = {"path": str(pdf_path), "chunk_index": idx}
+        parent, action = diff.add(idx, record.text)          # content-hash ID
+        _queue(pipe, parent, action, record.text, meta)
+        parent_sha = diff.hashes[-1]
+        for line in record.children(children):
+            cid, action = diff.add(idx, line, parent_sha)
+            _queue(pipe, cid, action, line, {**meta, "parent": parent})
+    stats.update(pipe.close())
 
-            coll.add(
-                ids        =[f"{pdf_path}-{idx}"],            # unique ID
-                documents  =[line],                           # raw text
-                metadatas  =[{"path": str(pdf_path),
-                              "chunk_index": idx}],           # extra info
-            )
+    # ── 4. Drop vanished chunks, remember what was indexed ────────
+    for pdf_path, diff in diffs.items():
+        if pdf_path in stats["failed"]:
+            continue                          # keep old entry; retried next run
+        stale += list(diff.old)
+        manifest.record(pdf_path, changed[pdf_path], diff.hashes)
+    delete_ids(coll, stale)
+    manifest.save()
 
-    print("Indexing complete — new DB stored in ./chroma_db")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"Embedded {stats['embedded']} new chunks ({stats['moved']} moved, "
+          f"{len(stale)} removed) from {stats['records']} records on {stats['pages']} "
+          f"pages of {len(changed)} changed PDF(s); {len(pdf_files) - len(changed)} unchanged")
+    print(f"{elapsed:.1f}s — {stats['pages'] / elapsed:.1f} pages/s, "
+          f"{stats['embedded'] / elapsed:.0f} chunks/s, peak RSS {_peak_rss_mb():.0f} MB")
+    if stats["cache"].get("hits"):
+        print(f"Embedding cache: {stats['cache']['hits']} of {stats['embedded']} chunks "
+              f"reused without running the model")
+    print("Indexing complete — DB stored in ./chroma_db")
 
 # ╔════════════════════════════════════════════════════════════════╗
 # 4.  Script entry-point                                           ║
 # ╚════════════════════════════════════════════════════════════════╝
 if __name__ == "__main__":
-    index_pdfs()
+    ap = argparse.ArgumentParser(description="Index ./data/*.pdf into ChromaDB.")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="extraction processes (default: all CPUs)")
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                    help="chunks per embedding call")
+    ap.add_argument("--full", action="store_true",
+                    help="ignore the manifest: wipe the DB and re-embed everything")
+    ap.add_argument("--children", action=argparse.BooleanOptionalAction,
+                    default=RECORD_CHILDREN,
+                    help="also index each line of a multi-line record as a child "
+                         "chunk (default: RECORD_CHILDREN env)")
+    args = ap.parse_args()
+    index_pdfs(workers=args.workers, batch_size=args.batch_size, full=args.full,
+               children=args.children)
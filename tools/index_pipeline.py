@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+index_pipeline.py
+────────────────────────────────────────────────────────────────────
+The **embed → write** half of the indexing pipeline, shared by
+`index_pdf.py` and `index_code.py`.
+
+    add() / move() ──► [embedder thread]  one model call per batch
+                   ──► [writer thread]    bulk upserts into Chroma
+
+Both hand-offs are bounded queues, so a producer that outruns the
+embedding model blocks instead of piling chunks up in memory.  If a
+stage fails it keeps draining its queue (so the producer never hangs)
+and close() re-raises the error.
+
+Usage
+-----
+    pipe = EmbedPipeline(collection)
+    pipe.add(chunk_id, text, metadata)     # embed + upsert
+    pipe.move(chunk_id, metadata)          # metadata-only update
+    pipe.close()                           # flush, wait for the writer
+    pipe.abort()                           # or: give up, write nothing more
+    pipe.stats                             # {"embedded": …, "moved": …, "cache": …}
+"""
+
+from __future__ import annotations
+
+# ─── standard library ─────────────────────────────────────────────
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import Tuple
+
+# Allow `python tools/index_*.py` to import the shared embedding cache
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# ─── project ------------------------------------------------------
+from embed_cache import default_embedder
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Configuration                                                ║
+# ╚════════════════════════════════════════════════════════════════╝
+BATCH_SIZE   = 256      # chunks per embedding call
+UPSERT_SIZE  = 2048     # rows per Chroma upsert (capped by the client)
+QUEUE_DEPTH  = 4        # batches buffered between stages
+
+_DONE = object()        # end-of-stream marker passed down the queues
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Stages                                                       ║
+# ╚════════════════════════════════════════════════════════════════╝
+def embedder(inbox: queue.Queue, outbox: queue.Queue, stats: dict) -> None:
+    """
+    Embed each batch of chunks in one model call — only the texts the
+    embedding cache has not seen reach the model.  Batches without
+    documents are metadata-only updates and pass straight through.
+    """
+    embed_fn = default_embedder()
+    while (batch := inbox.get()) is not _DONE:
+        if "error" in stats:
+            continue                              # drain after a failure
+        ids, docs, metas = batch
+        try:
+            outbox.put((ids, docs, metas, embed_fn(docs) if docs else None))
+        except Exception as err:
+            stats["error"] = err
+    stats["cache"] = embed_fn.stats()
+    outbox.put(_DONE)
+
+def writer(inbox: queue.Queue, coll, stats: dict) -> None:
+    """Group embedded batches into large upserts."""
+    limit = min(UPSERT_SIZE, coll._client.get_max_batch_size())
+    buf: Tuple[list, list, list, list] = ([], [], [], [])
+
+    def flush():
+        if buf[0]:
+            coll.upsert(ids=buf[0], documents=buf[1], metadatas=buf[2],
+                        embeddings=buf[3])
+            stats["embedded"] += len(buf[0])
+            for part in buf:
+                part.clear()
+
+    while (batch := inbox.get()) is not _DONE:
+        if "error" in stats:
+            continue                              # drain after a failure
+        try:
+            if batch[3] is None:                  # moved chunks: new chunk_index
+                coll.update(ids=batch[0], metadatas=batch[2])
+                stats["moved"] += len(batch[0])
+                continue
+            for part, values in zip(buf, batch):
+                part.extend(values)
+            if len(buf[0]) >= limit:
+                flush()
+        except Exception as err:
+            stats["error"] = err
+    if "error" not in stats:
+        try:
+            flush()
+        except Exception as err:
+            stats["error"] = err
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Front end                                                    ║
+# ╚════════════════════════════════════════════════════════════════╝
+class EmbedPipeline:
+    """Batch chunks on the caller's thread; embed and write on two others."""
+
+    def __init__(self, coll, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self.stats = {"embedded": 0, "moved": 0}
+        self._new: Tuple[list, list, list] = ([], [], [])
+        self._moved: Tuple[list, list] = ([], [])
+        self._to_embed: queue.Queue = queue.Queue(maxsize=QUEUE_DEPTH)
+        to_write: queue.Queue = queue.Queue(maxsize=QUEUE_DEPTH)
+        self._stages = [
+            threading.Thread(target=embedder, args=(self._to_embed, to_write, self.stats),
+                             daemon=True),
+            threading.Thread(target=writer, args=(to_write, coll, self.stats), daemon=True),
+        ]
+        for stage in self._stages:
+            stage.start()
+
+    def add(self, chunk_id: str, text: str, meta: dict) -> None:
+        self._new[0].append(chunk_id)
+        self._new[1].append(text)
+        self._new[2].append(meta)
+        if len(self._new[0]) >= self.batch_size:
+            self._send_new()
+
+    def move(self, chunk_id: str, meta: dict) -> None:
+        self._moved[0].append(chunk_id)
+        self._moved[1].append(meta)
+        if len(self._moved[0]) >= self.batch_size:
+            self._send_moved()
+
+    def close(self) -> dict:
+        """Flush what is buffered and wait until everything is written."""
+        self._send_new()
+        self._send_moved()
+        self._to_embed.put(_DONE)
+        for stage in self._stages:
+            stage.join()
+        if "error" in self.stats:
+            raise self.stats.pop("error")
+        return self.stats
+
+    def abort(self) -> None:
+        """Drop everything not written yet and stop both stages."""
+        self._new, self._moved = ([], [], []), ([], [])
+        self.stats.setdefault("error", RuntimeError("pipeline aborted"))
+        self._to_embed.put(_DONE)
+        for stage in self._stages:
+            stage.join()
+        self.stats.pop("error")
+
+    def _send_new(self) -> None:
+        if self._new[0]:
+            self._to_embed.put(self._new)                     # blocks if full
+            self._new = ([], [], [])
+
+    def _send_moved(self) -> None:
+        if self._moved[0]:
+            self._to_embed.put((self._moved[0], None, self._moved[1]))
+            self._moved = ([], [])
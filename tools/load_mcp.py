@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+load_mcp.py
+────────────────────────────────────────────────────────────────────
+**Load generator for the MCP server's tools.**  Drives a weighted mix of
+tool calls at a fixed concurrency over http, stdio or in-process, then
+reports throughput and p50 / p95 / p99 latency per tool, plus the
+server's own cache / upstream counters (`cache_stats`).
+
+Pair it with `tools/fake_openmeteo.py` so results do not depend on the
+internet: `--fake URL` points stdio / in-process servers at the stand-in
+(an http server must be started with the OPENMETEO_*_URL variables
+itself — see fake_openmeteo.py).
+
+Workload
+--------
+* `--mix` – tool weights, e.g. `get_weather=4,geocode_location=3,
+  search_offices=1,convert_c_to_f=1` (batch tools allowed too).
+* `--keys` – distinct argument values per tool.  Few keys → mostly
+  cache hits; many keys → mostly upstream calls.
+
+Usage
+-----
+    python tools/fake_openmeteo.py --latency 60 --rate-429 0.05 &
+    python tools/load_mcp.py --transport stdio --fake http://127.0.0.1:8099 -c 32 -d 20
+    python tools/load_mcp.py --transport http -c 64 --keys 2000
+"""
+
+# ───────────────────── standard-library imports ────────────────────
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Allow `python tools/load_mcp.py` to import top-level modules
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# ───────────────────── 3rd-party / project imports ─────────────────
+import httpx
+from fastmcp import Client
+
+from gazetteer import Gazetteer
+from mcp_runtime import TRANSPORTS, resolve_target
+
+DEFAULT_MIX = "get_weather=4,geocode_location=3,search_offices=1,convert_c_to_f=1"
+BATCH_SIZE  = 5
+SEARCH_QUERIES = [
+    "HQ", "Southern office", "largest office", "offices in Europe",
+    "engineering", "sales office", "Asia Pacific", "newest office",
+]
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 1.  Argument generators                                          ║
+# ╚════════════════════════════════════════════════════════════════╝
+def make_workload(keys: int, seed: int):
+    """Return {tool: () -> arguments} drawing from `keys` values per tool."""
+    rng = random.Random(seed)
+    gz = Gazetteer()
+    cities = [(gz.names[i], gz.latitudes[i], gz.longitudes[i]) for i in range(len(gz))]
+
+    # Real cities first, then made-up coordinates / names the gazetteer misses
+    coords = [(lat, lon) for _, lat, lon in cities][:keys]
+    coords += [(round(rng.uniform(-60, 70), 3), round(rng.uniform(-180, 180), 3))
+               for _ in range(keys - len(coords))]
+    names = [name for name, _, _ in cities][:keys // 2]
+    names += [f"Testville {i}" for i in range(keys - len(names))]
+
+    def weather():
+        lat, lon = rng.choice(coords)
+        return {"lat": lat, "lon": lon}
+
+    def weather_many():
+        picked = [rng.choice(coords) for _ in range(BATCH_SIZE)]
+        return {"lats": [p[0] for p in picked], "lons": [p[1] for p in picked]}
+
+    return {
+        "get_weather":      weather,
+        "get_weather_many": weather_many,
+        "geocode_location": lambda: {"name": rng.choice(names)},
+        "geocode_many":     lambda: {"names": [rng.choice(names) for _ in range(BATCH_SIZE)]},
+        "search_offices":   lambda: {"query": rng.choice(SEARCH_QUERIES)},
+        "convert_c_to_f":   lambda: {"c": round(rng.uniform(-30, 45), 1)},
+    }
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        tool, _, weight = part.partition("=")
+        mix[tool.strip()] = float(weight or 1)
+    return mix
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 2.  Connect and drive the load                                   ║
+# ╚════════════════════════════════════════════════════════════════╝
+async def run_load(mcp: Client, workload, mix: dict[str, float],
+                   concurrency: int, duration: float, seed: int):
+    """Return {tool: [(latency_s, ok), ...]} and the wall time taken."""
+    results: dict[str, list[tuple[float, bool]]] = defaultdict(list)
+    tools, weights = list(mix), list(mix.values())
+    stop_at = time.perf_counter() + duration
+
+    async def worker(n: int):
+        rng = random.Random(seed + n)
+        while time.perf_counter() < stop_at:
+            tool = rng.choices(tools, weights)[0]
+            args = workload[tool]()
+            start = time.perf_counter()
+            try:
+                res = await mcp.call_tool(tool, args, raise_on_error=False)
+                data = res.data if not res.is_error else None
+                ok = not res.is_error and not (isinstance(data, dict) and "error" in data)
+            except Exception:
+                ok = False
+            results[tool].append((time.perf_counter() - start, ok))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return results, time.perf_counter() - start
+
+# ╔════════════════════════════════════════════════════════════════╗
+# 3.  Report                                                       ║
+# ╚════════════════════════════════════════════════════════════════╝
+def pct(sorted_times: list[float], q: float) -> float:
+    return sorted_times[min(len(sorted_times) - 1, int(q * len(sorted_times)))]
+
+def report(results, wall: float) -> None:
+    print(f"{'tool':<18} {'calls':>7} {'errors':>7} {'rps':>8} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    everything = []
+    for tool in sorted(results):
+        rows = results[tool]
+        everything += rows
+        _print_row(tool, rows, wall)
+    _print_row("ALL", everything, wall)
+
+def _print_row(label: str, rows, wall: float) -> None:
+    times = sorted(t for t, _ in rows)
+    errors = sum(1 for _, ok in rows if not ok)
+    ms = lambda t: t * 1000
+    print(f"{label:<18} {len(rows):>7} {errors:>7} {len(rows) / wall:>8.1f} "
+          f"{ms(pct(times, .50)):>9.1f} {ms(pct(times, .95)):>9.1f} "
+          f"{ms(pct(times, .99)):>9.1f}")
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--transport", choices=TRANSPORTS, default="http")
+    ap.add_argument("-c", "--concurrency", type=int, default=16)
+    ap.add_argument("-d", "--duration", type=float, default=15.0, help="seconds")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="tool=weight,...")
+    ap.add_argument("--keys", type=int, default=50,
+                    help="distinct argument values per tool")
+    ap.add_argument("--fake", metavar="URL",
+                    help="fake_openmeteo.py base URL for stdio/inprocess servers")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    if args.fake:
+        base = args.fake.rstrip("/")
+        os.environ["OPENMETEO_FORECAST_URL"] = f"{base}/v1/forecast"
+        os.environ["OPENMETEO_GEOCODING_URL"] = f"{base}/v1/search"
+
+    mix = parse_mix(args.mix)
+    workload = make_workload(args.keys, args.seed)
+    unknown = set(mix) - set(workload)
+    if unknown:
+        sys.exit(f"Unknown tool(s) in --mix: {', '.join(sorted(unknown))}")
+
+    async with Client(resolve_target(args.transport)) as mcp:
+        print(f"{args.transport}: {args.concurrency} concurrent callers for "
+              f"{args.duration:g}s, {args.keys} keys, mix {args.mix}\n")
+        results, wall = await run_load(mcp, workload, mix, args.concurrency,
+                                       args.duration, args.seed)
+        report(results, wall)
+
+        stats = await mcp.call_tool("cache_stats", {}, raise_on_error=False)
+        if not stats.is_error:
+            print("\nserver cache_stats:")
+            print(json.dumps(stats.data, indent=2))
+
+    if args.fake:
+        try:
+            fake = httpx.get(f"{args.fake.rstrip('/')}/stats", timeout=2).json()
+            print(f"\nfake Open-Meteo requests: {fake}")
+        except httpx.HTTPError:
+            pass
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,10 +2,16 @@
 # search.py — colourised, similarity-aware search with numbered, clearly-
 #             separated results and explicit cosine-similarity labels.
 
+import sys
+from pathlib import Path
+
 import numpy as np
 from chromadb import PersistentClient
 from chromadb.config import Settings, DEFAULT_TENANT, DEFAULT_DATABASE
-from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+# ── Shared embedding cache lives at the repo root ────────────────────────
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from embed_cache import default_embedder
 
 
 # ── ANSI colours (works on most POSIX terminals) ─────────────────────────
@@ -14,7 +20,7 @@ BLUE  = "\033[94m"   # other matches
 RED   = "\033[91m"   # similarity label / value
 RESET = "\033[0m"
 
-embed_fn = DefaultEmbeddingFunction()
+embed_fn = default_embedder()      # repeated queries skip the model
 
 # ── Connect to on-disk Chroma database ───────────────────────────────────
 db_client = PersistentClient(
@@ -50,6 +56,13 @@ def search(query: str, top_k: int = 3) -> None:
     metas  = results["metadatas"][0]
     embeds = results["embeddings"][0]
 
+    # Line-level children (index_pdf.py --children) show their whole record
+    parent_ids = [m["parent"] for m in metas if m.get("parent")]
+    if parent_ids:
+        got = coll.get(ids=parent_ids, include=["documents"])
+        parents = dict(zip(got["ids"], got["documents"]))
+        docs = [parents.get(m.get("parent"), doc) for doc, m in zip(docs, metas)]
+
     if not docs:
         print("No matches found.")
         return
@@ -17,7 +17,8 @@ This significantly reduces the first-run latency for labs 3, 5, 7, etc.
 
 ⚡ WHAT IT DOES:
    1. Loads llama3.2 LLM into Ollama's memory
-   2. Downloads and loads the sentence transformer embedding model
+   2. Downloads and loads the embedding model (EMBED_BACKEND, see
+      embedders.py — int8 ONNX by default, quantized on first run)
    3. Verifies ChromaDB is available for vector storage
    4. Pre-populates MCP server's vector database (for Labs 6-7)
 
@@ -84,33 +85,33 @@ except Exception as e:
     sys.exit(1)
 
 # ═══════════════════════════════════════════════════════════════════
-# 2. Warm up Sentence Transformer (all-MiniLM-L6-v2)
+# 2. Warm up the embedding model (all-MiniLM-L6-v2)
 # ═══════════════════════════════════════════════════════════════════
-print("\n[2/3] Warming up Sentence Transformer (all-MiniLM-L6-v2)...")
+print("\n[2/3] Warming up embedding model (all-MiniLM-L6-v2)...")
 start = time.time()
 
 try:
-    from sentence_transformers import SentenceTransformer
+    from embed_cache import default_embedder
 
-    # Initialize the embedding model (this downloads and loads it)
-    print("   • Loading embedding model into memory...")
-    embed_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-    # Make a test encoding to fully load the model
-    test_embedding = embed_model.encode("test")
+    # Same backend the MCP server and indexers use (downloads, quantizes
+    # and loads it — or uses embed_daemon.py if that is running)
+    embed = default_embedder()
+    print(f"   • Loading {embed.model} into memory...")
+    embed.embed_fn.load()
+    test_embedding = embed(["test"])[0]
 
     elapsed = time.time() - start
-    print(f"   ✓ Sentence Transformer loaded successfully ({elapsed:.1f}s)")
-    print(f"   • Model: all-MiniLM-L6-v2")
+    print(f"   ✓ Embedding model loaded successfully ({elapsed:.1f}s)")
+    print(f"   • Model: {embed.model}")
     print(f"   • Embedding dimension: {len(test_embedding)}")
 
-except ImportError:
-    print(f"   ✗ Error: sentence-transformers not installed")
-    print(f"   • Install with: pip install sentence-transformers")
+except ImportError as e:
+    print(f"   ✗ Error: {e}")
+    print(f"   • Install with: pip install -r requirements.txt")
     sys.exit(1)
 
 except Exception as e:
-    print(f"   ✗ Error loading Sentence Transformer: {e}")
+    print(f"   ✗ Error loading embedding model: {e}")
     sys.exit(1)
 
 # ═══════════════════════════════════════════════════════════════════
@@ -148,7 +149,6 @@ try:
     import pandas as pd
     import chromadb
     from chromadb.config import Settings, DEFAULT_TENANT, DEFAULT_DATABASE
-    from sentence_transformers import SentenceTransformer
 
     try:
         import pdfplumber
@@ -236,6 +236,7 @@ try:
         # Only continue if client was created successfully
         if populate_needed:
             # Use already-loaded embedding model
+            # Vectors from earlier runs are reused from ./embed_cache
             print(f"   • Using pre-loaded embedding model...")
 
             # Populate locations from PDF
@@ -251,13 +252,13 @@ try:
                                 lines.append(line)
     
                 print(f"   • Embedding {len(lines)} location documents...")
-                for idx, line in enumerate(lines):
-                    vector = embed_model.encode(line).tolist()
+                if lines:
                     locations_coll.add(
-                        ids=[f"pdf-{idx}"],
-                        embeddings=[vector],
-                        documents=[line],
-                        metadatas=[{"source": "offices.pdf", "line": idx}],
+                        ids=[f"pdf-{idx}" for idx in range(len(lines))],
+                        embeddings=embed(lines),
+                        documents=lines,
+                        metadatas=[{"source": "offices.pdf", "line": idx}
+                                   for idx in range(len(lines))],
                     )
                 print(f"   ✓ Populated {len(lines)} location documents")
             else:
@@ -272,21 +273,21 @@ try:
                 df = pd.read_csv(OFFICE_CSV)
     
                 print(f"   • Embedding {len(df)} analytics documents...")
-                for idx, row in df.iterrows():
-                    text = (f"{row['city']} office with {row['employees']} employees "
-                           f"and ${row['revenue_million']}M revenue, opened in {row['opened_year']}")
-                    vector = embed_model.encode(text).tolist()
+                texts = [f"{row['city']} office with {row['employees']} employees "
+                         f"and ${row['revenue_million']}M revenue, opened in {row['opened_year']}"
+                         for _, row in df.iterrows()]
+                if texts:
                     analytics_coll.add(
-                        ids=[f"csv-{idx}"],
-                        embeddings=[vector],
-                        documents=[text],
-                        metadatas={
+                        ids=[f"csv-{idx}" for idx in df.index],
+                        embeddings=embed(texts),
+                        documents=texts,
+                        metadatas=[{
                             "source": "offices.csv",
                             "city": row['city'],
                             "employees": int(row['employees']),
                             "revenue_million": float(row['revenue_million']),
                             "opened_year": int(row['opened_year'])
-                        },
+                        } for _, row in df.iterrows()],
                     )
                 print(f"   ✓ Populated {len(df)} analytics documents")
             else:
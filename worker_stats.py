@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Per-worker statistics for the multi-worker MCP server
+═══════════════════════════════════════════════════════════════════════
+With `python mcp_server.py --workers N` every request lands on one of N
+processes, so a status call only sees that worker's counters.  Each
+worker therefore publishes a JSON snapshot of its stats to a directory
+shared by the worker group, and collect() reads them all back — any
+worker can answer for the whole server.
+
+* The supervisor sets MCP_WORKER_DIR before starting workers; when it is
+  unset (single-process / stdio) publishing is disabled.
+* Snapshots are written atomically (temp file + rename) every
+  MCP_WORKER_STATS_INTERVAL seconds (default 5).
+* Snapshots not refreshed for 3 intervals belong to workers that have
+  exited (e.g. after a reload) and are ignored and removed.
+"""
+
+from __future__ import annotations
+
+# ── stdlib ──────────────────────────────────────────────────────────
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 1.  Configuration                                                ║
+# ╚══════════════════════════════════════════════════════════════════╝
+WORKER_DIR = os.getenv("MCP_WORKER_DIR")
+INTERVAL   = float(os.getenv("MCP_WORKER_STATS_INTERVAL", "5"))
+
+
+def enabled() -> bool:
+    return bool(WORKER_DIR)
+
+def _path(pid: int) -> Path:
+    return Path(WORKER_DIR) / f"worker-{pid}.json"
+
+
+# ╔══════════════════════════════════════════════════════════════════╗
+# ║ 2.  Publish / collect                                            ║
+# ╚══════════════════════════════════════════════════════════════════╝
+def publish(snapshot: dict) -> None:
+    """Write this worker's snapshot (atomically) to the shared directory."""
+    path = _path(os.getpid())
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"pid": os.getpid(), "published_at": time.time(),
+                               **snapshot}))
+    os.replace(tmp, path)
+
+async def publish_loop(snapshot: Callable[[], dict]) -> None:
+    """Publish `snapshot()` every INTERVAL seconds; remove it on shutdown."""
+    try:
+        while True:
+            try:
+                publish(snapshot())
+            except OSError as e:
+                print(f"worker stats: {e}", file=sys.stderr)
+            await asyncio.sleep(INTERVAL)
+    finally:
+        _path(os.getpid()).unlink(missing_ok=True)
+
+def collect(max_age: Optional[float] = None) -> list[dict]:
+    """Snapshots of every live worker, ordered by pid."""
+    if not enabled():
+        return []
+    max_age = 3 * INTERVAL if max_age is None else max_age
+    workers = []
+    for path in Path(WORKER_DIR).glob("worker-*.json"):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue                      # being replaced right now
+        if time.time() - data.get("published_at", 0) > max_age:
+            path.unlink(missing_ok=True)  # worker is gone
+            continue
+        workers.append(data)
+    return sorted(workers, key=lambda w: w["pid"])